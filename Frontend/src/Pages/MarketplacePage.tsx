@@ -7,6 +7,9 @@ import MakeOfferModal from '../components/MakeOfferModal';
 import Toast from '../components/Toast';
 import { useRealtimeItems } from '../hooks/useRealtimeData';
 
+// The card grid, the detail modal and the search box between them use these
+const FEED_FIELDS = 'title,description,price,category,subcategory,condition,size,status,images,thumbnail';
+
 // Custom Peso Icon
 const PesoIcon = ({ className }: { className?: string }) => (
     <svg
@@ -74,7 +77,7 @@ const MarketplacePage = () => {
             setError(null);
 
             try {
-                const response = await fetch(`${import.meta.env.VITE_API_URL || 'http://localhost:5000'}/api/marketplace/items`);
+                const response = await fetch(`${import.meta.env.VITE_API_URL || 'http://localhost:5000'}/api/marketplace/items?fields=${FEED_FIELDS}`);
                 const result = await response.json();
 
                 if (result.success && result.data) {
@@ -142,7 +145,7 @@ const MarketplacePage = () => {
                 setShowItemModal(false);
                 setSelectedItem(null);
                 // Refresh the items list
-                const refreshResponse = await fetch(`${import.meta.env.VITE_API_URL || 'http://localhost:5000'}/api/marketplace/items`);
+                const refreshResponse = await fetch(`${import.meta.env.VITE_API_URL || 'http://localhost:5000'}/api/marketplace/items?fields=${FEED_FIELDS}`);
                 const refreshResult = await refreshResponse.json();
                 if (refreshResult.success && refreshResult.data) {
                     setItems(refreshResult.data);
@@ -497,7 +500,7 @@ const MarketplacePage = () => {
                                 <div className="relative w-full h-56 bg-gradient-to-br from-slate-800 to-slate-900 flex items-center justify-center overflow-hidden">
                                     {item.images && item.images.length > 0 ? (
                                         <img
-                                            src={item.images[0]}
+                                            src={item.thumbnail || item.images[0]}
                                             alt={item.title}
                                             className="w-full h-full object-cover"
                                         />
@@ -32,6 +32,7 @@ interface Meetup {
     item_title: string;
     item_price: number;
     item_images: string[];
+    item_thumbnail?: string | null;
 }
 
 const MeetupSchedulerPage = () => {
@@ -5,6 +5,9 @@ import NavigationMenu from '../components/NavigationMenu';
 // IMPORTANT: Ensure this path is correct for your project
 import { supabase } from '../lib/supabaseClient';
 
+// Cards plus what the edit form pre-fills (description, notes, images)
+const LISTING_FIELDS = 'title,price,category,condition,status,view_count,description,notes,images,thumbnail';
+
 interface Listing {
     id: string;
     title: string;
@@ -16,6 +19,7 @@ interface Listing {
     description: string;
     notes?: string;
     images: string[];
+    thumbnail?: string | null;
     created_at: string;
     seller_id: string;
 }
@@ -70,7 +74,7 @@ const MyListingsPage = () => {
             const token = localStorage.getItem('sb-access-token') || localStorage.getItem('access_token');
             if (!token) return;
 
-            const response = await fetch(`${import.meta.env.VITE_API_URL || 'http://localhost:5000'}/items/user/me`, {
+            const response = await fetch(`${import.meta.env.VITE_API_URL || 'http://localhost:5000'}/items/user/me?fields=${LISTING_FIELDS}`, {
                 method: 'GET',
                 headers: { 'Authorization': `Bearer ${token}` }
             });
@@ -336,7 +340,7 @@ const MyListingsPage = () => {
                             <div key={listing.id} className="bg-slate-900/50 backdrop-blur-xl border border-blue-500/20 rounded-2xl overflow-hidden hover:border-blue-500/50 transition-all">
                                 <div className="w-full h-48 bg-gradient-to-br from-slate-800 to-slate-900 flex items-center justify-center relative overflow-hidden">
                                     {listing.images && listing.images.length > 0 ? (
-                                        <img src={listing.images[0]} alt={listing.title} className="w-full h-full object-cover" />
+                                        <img src={listing.thumbnail || listing.images[0]} alt={listing.title} className="w-full h-full object-cover" />
                                     ) : (
                                         <ShoppingBag className="w-16 h-16 text-gray-600" />
                                     )}
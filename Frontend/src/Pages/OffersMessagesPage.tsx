@@ -4,6 +4,7 @@ import { MessageCircle, Clock, Check, X, Send, ArrowLeft, Package } from 'lucide
 import NavigationMenu from '../components/NavigationMenu';
 import ProfileAvatar from '../components/ProfileAvatar';
 import Toast from '../components/Toast';
+import { useNotificationStream } from '../hooks/useNotificationStream';
 import { API_BASE as API_URL } from '../config/constants';
 
 // Custom Peso Icon Component
@@ -82,6 +83,8 @@ const OffersMessagesPage = () => {
     const [toast, setToast] = useState<{ message: string; type: 'success' | 'error' } | null>(null);
     const [scrolled, setScrolled] = useState(false);
     const messagesEndRef = useRef<HTMLDivElement>(null);
+    // Newest message we hold for the open conversation; polls only ask for what came after it
+    const syncRef = useRef<{ otherUserId: string; cursor: string | null } | null>(null);
     // const pollingIntervalRef = useRef<NodeJS.Timeout | null>(null);
 
     // Auto-scroll to bottom of messages
@@ -123,14 +126,23 @@ const OffersMessagesPage = () => {
         }
     }, [messages.length]);
 
-    // Polling ONLY for active conversation messages (reduced frequency)
+    // New messages arrive over the notification stream
+    useNotificationStream(!!user, {
+        onMessage: (message) => {
+            if (selectedConversation && message.sender_id === selectedConversation.other_user_id) {
+                syncMessages(selectedConversation.other_user_id);
+            }
+        }
+    });
+
+    // Slow fallback sync in case a stream event was missed while reconnecting
     useEffect(() => {
         if (!selectedConversation) return;
 
-        // Poll every 5 seconds (less aggressive)
+        // An idle chat gets an empty 204 back
         const messageInterval = setInterval(() => {
-            fetchMessages(selectedConversation.other_user_id);
-        }, 5000);
+            syncMessages(selectedConversation.other_user_id);
+        }, 30000);
 
         return () => clearInterval(messageInterval);
     }, [selectedConversation?.other_user_id]);
@@ -255,12 +267,43 @@ const OffersMessagesPage = () => {
             const data = await response.json();
             if (data.success) {
                 setMessages(data.messages);
+                syncRef.current = { otherUserId, cursor: data.sync_cursor };
             }
         } catch (error) {
             console.error('Error fetching messages:', error);
         }
     }, []);
 
+    const syncMessages = useCallback(async (otherUserId: string) => {
+        const sync = syncRef.current;
+        if (!sync || sync.otherUserId !== otherUserId || !sync.cursor) {
+            return fetchMessages(otherUserId);
+        }
+        const token = localStorage.getItem('access_token');
+
+        try {
+            const response = await fetch(
+                `${API_URL}/offer/messages/${otherUserId}?after=${encodeURIComponent(sync.cursor)}`,
+                { headers: { Authorization: `Bearer ${token}` } }
+            );
+            if (response.status === 204) return;
+            const data = await response.json();
+            // Ignore a late answer for a conversation the user already left
+            if (!data.success || syncRef.current?.otherUserId !== otherUserId) return;
+
+            const fresh: Message[] = data.messages;
+            syncRef.current = { otherUserId, cursor: data.sync_cursor };
+            setMessages(prev => [
+                // Optimistic copies are replaced by the stored messages
+                ...prev.filter(m => !(m.id.startsWith('temp-') &&
+                    fresh.some(f => f.sender_id === m.sender_id && f.message === m.message))),
+                ...fresh.filter(f => !prev.some(m => m.id === f.id))
+            ]);
+        } catch (error) {
+            console.error('Error syncing messages:', error);
+        }
+    }, [fetchMessages]);
+
     const handleOfferAction = async (offerId: string, status: string) => {
         const token = localStorage.getItem('access_token');
 
@@ -322,8 +365,8 @@ const OffersMessagesPage = () => {
 
             const data = await response.json();
             if (data.success) {
-                // Refresh to get the real message with proper ID
-                fetchMessages(selectedConversation.other_user_id);
+                // Pull in the stored message (and anything else new) with its real ID
+                syncMessages(selectedConversation.other_user_id);
             } else {
                 // Remove temp message on error
                 setMessages(prev => prev.filter(m => m.id !== tempMessage.id));
@@ -5,6 +5,8 @@ import NavigationMenu from '../components/NavigationMenu';
 import Toast from '../components/Toast';
 import { API_BASE as API_URL } from '../config/constants';
 
+const PROFILE_FIELDS = 'email,first_name,last_name,course,current_year,block_section,phone_number,address,profile_picture,profile_completed,reputation_score,referral_code';
+
 const ProfilePage = () => {
     const navigate = useNavigate();
     const [user, setUser] = useState<any>(null);
@@ -79,7 +81,8 @@ const ProfilePage = () => {
         }
 
         try {
-            const response = await fetch(`${API_URL}/user/profile`, {
+            // The default leaves out the address, which this page shows and edits
+            const response = await fetch(`${API_URL}/user/profile?fields=${PROFILE_FIELDS}`, {
                 headers: { Authorization: `Bearer ${token}` }
             });
 
@@ -22,7 +22,7 @@ interface Item {
     id: string;
     title: string;
     price: number;
-    images: string[];
+    thumbnail?: string | null;
 }
 
 interface User {
@@ -246,8 +246,8 @@ const CreateMeetupModal = ({ user, onClose, onSuccess }: CreateMeetupModalProps)
                                                 }`}
                                         >
                                             <div className="flex items-center gap-4">
-                                                {item.images && item.images.length > 0 ? (
-                                                    <img src={item.images[0]} alt={item.title} className="w-16 h-16 object-cover rounded-lg" />
+                                                {item.thumbnail ? (
+                                                    <img src={item.thumbnail} alt={item.title} className="w-16 h-16 object-cover rounded-lg" />
                                                 ) : (
                                                     <div className="w-16 h-16 bg-slate-800 rounded-lg flex items-center justify-center">
                                                         <Package className="w-8 h-8 text-gray-600" />
@@ -192,7 +192,7 @@ const MeetupDetailModal = ({ meetup, user, onClose, onUpdate }: MeetupDetailModa
                                     <div className="p-4 bg-slate-800/50 rounded-xl">
                                         <div className="flex items-center gap-4">
                                             {meetup.item_images && meetup.item_images.length > 0 ? (
-                                                <img src={meetup.item_images[0]} alt={meetup.item_title} className="w-20 h-20 object-cover rounded-lg" />
+                                                <img src={meetup.item_thumbnail || meetup.item_images[0]} alt={meetup.item_title} className="w-20 h-20 object-cover rounded-lg" />
                                             ) : (
                                                 <div className="w-20 h-20 bg-slate-700 rounded-lg" />
                                             )}
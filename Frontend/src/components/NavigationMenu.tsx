@@ -22,7 +22,7 @@ import {
     AlertCircle
 } from 'lucide-react';
 import UserSearchModal from './UserSearchModal';
-import { useRealtimeNotifications } from '../hooks/useRealtimeData';
+import { useNotificationStream } from '../hooks/useNotificationStream';
 
 interface NavigationMenuProps {
     user: any;
@@ -76,10 +76,11 @@ const NavigationMenu = ({ user, onLogout }: NavigationMenuProps) => {
         }
     }, [user]);
 
-    // Real-time notifications - no more polling!
-    useRealtimeNotifications(user?.id || '', (newNotification) => {
-        console.log('New notification received:', newNotification);
-        setNotifications(prev => [newNotification, ...prev]);
+    // Live notifications pushed by the backend stream - no more polling!
+    useNotificationStream(!!user, {
+        onNotification: (newNotification) => {
+            setNotifications(prev => [newNotification, ...prev.filter(n => n.id !== newNotification.id)]);
+        }
     });
 
     // Fetch notifications
@@ -0,0 +1,121 @@
+import { useEffect, useRef } from 'react';
+import { API_BASE } from '../config/constants';
+
+interface NotificationStreamHandlers {
+    onNotification?: (notification: any) => void;
+    onMessage?: (message: any) => void;
+    onUnread?: (counts: { notifications: number; messages: number }) => void;
+}
+
+type Listener = (type: string, data: any) => void;
+
+const EVENT_TYPES = ['notification', 'message', 'unread'];
+const MIN_RETRY_MS = 1000;
+const MAX_RETRY_MS = 30000;
+
+// One stream per tab, shared by every component that subscribes
+let source: EventSource | null = null;
+let retryTimer: ReturnType<typeof setTimeout> | null = null;
+let retryMs = MIN_RETRY_MS;
+const listeners = new Set<Listener>();
+
+const scheduleReconnect = () => {
+    if (retryTimer || listeners.size === 0) return;
+    retryTimer = setTimeout(() => {
+        retryTimer = null;
+        openStream();
+    }, retryMs);
+    retryMs = Math.min(retryMs * 2, MAX_RETRY_MS);
+};
+
+const closeStream = () => {
+    if (retryTimer) {
+        clearTimeout(retryTimer);
+        retryTimer = null;
+    }
+    if (source) {
+        source.close();
+        source = null;
+    }
+};
+
+// EventSource can't send an Authorization header, and the access token must
+// not end up in URLs (proxy and access logs), so every (re)connect trades
+// the current token for a short-lived stream ticket
+const openStream = async () => {
+    const token = localStorage.getItem('access_token');
+    if (!token || listeners.size === 0) return;
+
+    let ticket: string;
+    try {
+        const response = await fetch(`${API_BASE}/notifications/stream-ticket`, {
+            method: 'POST',
+            headers: { Authorization: `Bearer ${token}` }
+        });
+        const data = await response.json();
+        if (!data.success) throw new Error(data.message);
+        ticket = data.ticket;
+    } catch (error) {
+        console.error('Error getting a notification stream ticket:', error);
+        scheduleReconnect();
+        return;
+    }
+    // Everyone unsubscribed, or another attempt won, while the ticket loaded
+    if (listeners.size === 0 || source) return;
+
+    const stream = new EventSource(`${API_BASE}/notifications/stream?ticket=${encodeURIComponent(ticket)}`);
+    stream.onopen = () => {
+        retryMs = MIN_RETRY_MS;
+    };
+    // The server ends every stream after a few minutes and the ticket is
+    // expired by then, so reopen with a fresh one instead of letting
+    // EventSource retry the old URL
+    stream.onerror = () => {
+        if (source !== stream) return;
+        stream.close();
+        source = null;
+        scheduleReconnect();
+    };
+    EVENT_TYPES.forEach(type => {
+        stream.addEventListener(type, (event) => {
+            let data: any;
+            try {
+                data = JSON.parse((event as MessageEvent).data);
+            } catch (error) {
+                console.error(`Error parsing ${type} event:`, error);
+                return;
+            }
+            listeners.forEach(listener => listener(type, data));
+        });
+    });
+    source = stream;
+};
+
+// Subscribes to GET /api/notifications/stream (server-sent events).
+export const useNotificationStream = (enabled: boolean, handlers: NotificationStreamHandlers) => {
+    // Keep the latest handlers without resubscribing on every render
+    const handlersRef = useRef(handlers);
+    handlersRef.current = handlers;
+
+    useEffect(() => {
+        if (!enabled || !localStorage.getItem('access_token')) return;
+
+        const listener: Listener = (type, data) => {
+            const current = handlersRef.current;
+            if (type === 'notification') current.onNotification?.(data);
+            else if (type === 'message') current.onMessage?.(data);
+            else if (type === 'unread') current.onUnread?.(data);
+        };
+
+        listeners.add(listener);
+        if (!source && !retryTimer) {
+            retryMs = MIN_RETRY_MS;
+            openStream();
+        }
+
+        return () => {
+            listeners.delete(listener);
+            if (listeners.size === 0) closeStream();
+        };
+    }, [enabled]);
+};
@@ -1,13 +1,25 @@
+import logging
+
 from flask import Flask
 from flask_cors import CORS
 from app.config import Config
 
 def create_app():
+    logging.basicConfig(
+        level=Config.LOG_LEVEL,
+        format='%(asctime)s %(levelname)s [%(name)s] %(message)s'
+    )
+    
+    from app.extensions import check_supabase_key
+    from app.utils.media_storage import check_media_config
+    check_supabase_key()
+    check_media_config()
+    
     app = Flask(__name__)
     app.config.from_object(Config)
     
     # 1. Allow React (port 5173) to talk to this backend
-    CORS(app, resources={r"/*": {"origins": "*"}}) 
+    CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=["ETag", "Last-Modified"]) 
     
     # Register blueprints
     from app.routes.auth import auth_bp
@@ -21,40 +33,54 @@ def create_app():
     from app.routes.notifications import notifications_bp
     from app.routes.friends import friends_bp
     from app.routes.feedback import feedback_bp
+    from app.routes.media import media_bp
     
     
-    print("Registering blueprints...")
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    print("✓ Auth blueprint registered")
     app.register_blueprint(user_bp, url_prefix='/api/user')
-    print("✓ User blueprint registered")
     app.register_blueprint(market_bp, url_prefix='/api/marketplace')
-    print("✓ Marketplace blueprint registered")
     app.register_blueprint(board_bp, url_prefix='/api/board')
-    print("✓ Board blueprint registered")
     
     # --- REGISTER THE ITEM BLUEPRINT ---
     # We don't add a prefix here because your route is already named '/items'
     app.register_blueprint(item_bp)
-    print("✓ Item blueprint registered")
     
     app.register_blueprint(meetup_bp, url_prefix='/api/meetup')
-    print("✓ Meetup blueprint registered")
     
     app.register_blueprint(referral_bp, url_prefix='/api/referral')
-    print("✓ Referral blueprint registered")
     
     app.register_blueprint(offer_bp, url_prefix='/api/offer')
-    print("✓ Offer blueprint registered")
     
     app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
-    print("✓ Notifications blueprint registered")
     
     app.register_blueprint(friends_bp, url_prefix='/api/friends')
-    print("✓ Friends blueprint registered")
 
     app.register_blueprint(feedback_bp, url_prefix='/api/feedback')
-    print("✓ Feedback blueprint registered")
+
+    # Uploaded images (MEDIA_BACKEND=local, development only)
+    app.register_blueprint(media_bp, url_prefix='/media')
+    logging.getLogger(__name__).debug("Registered blueprints: %s", ', '.join(app.blueprints))
+    
+    # Request timing, per-request DB round trips and GET /metrics
+    from app.utils.instrumentation import init_instrumentation, register_collector
+    from app.middlewares.auth_middleware import auth_cache_stats
+    from app.services.notification_service import NotificationService
+    from app.utils.events import get_broker
+    from app.utils.feed_cache import get_feed_cache
+    from app.services.profile_card_service import profile_card_stats
+    init_instrumentation(app)
+    register_collector('profile_cache', profile_card_stats)
+    register_collector('auth_cache', auth_cache_stats)
+    register_collector('feed_cache', lambda: get_feed_cache().stats())
+    register_collector('notification_queue', NotificationService.dispatcher_stats)
+    register_collector('event_broker', lambda: get_broker().stats())
+    
+    # ETag / 304 handling for routes marked with @cache_policy
+    from app.utils.http_cache import init_http_cache
+    init_http_cache(app)
+    
+    from app.commands import register_commands
+    register_commands(app)
     
     @app.route('/')
     def index():
@@ -0,0 +1,134 @@
+import click
+from flask.cli import with_appcontext
+
+from app.extensions import get_supabase
+from app.services.image_service import ImageService, is_data_url, variants_enabled
+from app.utils.feed_cache import invalidate_feeds
+from app.utils.media_storage import get_media_storage
+
+
+@click.command('rebuild-counters')
+@with_appcontext
+def rebuild_counters():
+    """Recompute requests.reply_count / like_count from the source tables."""
+    supabase = get_supabase()
+    result = supabase.rpc('reconcile_request_counters').execute()
+    click.echo(f"✓ Request counters reconciled ({result.data or 0} requests corrected)")
+
+
+@click.command('rebuild-user-stats')
+@click.option('--user-id', default=None, help='Only rebuild this user (default: everyone).')
+@with_appcontext
+def rebuild_user_stats(user_id):
+    """Recompute the materialized dashboard stats in user_stats."""
+    supabase = get_supabase()
+    result = supabase.rpc('rebuild_user_stats', {'p_user_id': user_id}).execute()
+    click.echo(f"✓ User stats rebuilt ({result.data or 0} users)")
+
+
+def _keyset_batches(table, columns, batch_size):
+    """Yield every row of `table` in primary key order, one batch at a time."""
+    supabase = get_supabase()
+    last_id = None
+    while True:
+        # Keyset over the primary key: rows already converted are never re-read
+        query = supabase.table(table).select(columns).order('id').limit(batch_size)
+        if last_id:
+            query = query.gt('id', last_id)
+        rows = query.execute().data or []
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1]['id']
+
+
+@click.command('migrate-images')
+@click.option('--batch-size', default=50, show_default=True,
+              help='Items read per query (rows with inline images are large).')
+@click.option('--dry-run', is_flag=True, help='Only count the items that would be converted.')
+@click.option('--variants', is_flag=True,
+              help='Also render missing resized variants for images already in storage.')
+@with_appcontext
+def migrate_images(batch_size, dry_run, variants):
+    """Move base64 data URLs out of items.images into media storage."""
+    if variants and not variants_enabled():
+        raise click.UsageError("Variants are off: install Pillow and leave MEDIA_VARIANTS=true")
+
+    supabase = get_supabase()
+    storage = get_media_storage()
+    scanned = converted = failed = rendered = 0
+    for rows in _keyset_batches('items', 'id, images', batch_size):
+        for row in rows:
+            scanned += 1
+            images = row.get('images') or []
+            if variants and not dry_run:
+                # Converted rows below get theirs from store_images()
+                for key in filter(None, map(ImageService.stored_key, images)):
+                    try:
+                        rendered += ImageService.render_variants(key, storage.read(key))
+                    except Exception as e:
+                        click.echo(f"✗ Variants for {key}: {e}", err=True)
+            if not any(is_data_url(image) for image in images):
+                continue
+            if dry_run:
+                converted += 1
+                continue
+            try:
+                urls = ImageService.store_images(images)
+                supabase.table('items').update({'images': urls}).eq('id', row['id']).execute()
+                converted += 1
+            except Exception as e:
+                failed += 1
+                click.echo(f"✗ Item {row['id']}: {e}", err=True)
+
+        click.echo(f"  ...{scanned} items scanned")
+
+    if converted and not dry_run:
+        invalidate_feeds('marketplace')
+    verb = "would be converted" if dry_run else "converted"
+    click.echo(f"✓ {converted} of {scanned} items {verb}" + (f", {failed} failed" if failed else ""))
+    if variants and not dry_run:
+        click.echo(f"✓ {rendered} image variants rendered")
+
+
+@click.command('migrate-avatars')
+@click.option('--batch-size', default=100, show_default=True, help='Users read per query.')
+@click.option('--dry-run', is_flag=True, help='Only count the avatars that would be moved.')
+@with_appcontext
+def migrate_avatars(batch_size, dry_run):
+    """Move base64 avatars out of users.profile_picture into media storage.
+
+    Other running workers pick up the new URLs once their profile card
+    cache expires (PROFILE_CACHE_TTL).
+    """
+
+    supabase = get_supabase()
+    scanned = converted = failed = 0
+    for rows in _keyset_batches('users', 'id, profile_picture', batch_size):
+        for row in rows:
+            scanned += 1
+            if not is_data_url(row.get('profile_picture')):
+                continue
+            if dry_run:
+                converted += 1
+                continue
+            try:
+                url = ImageService.store_image(row['profile_picture'], prefix='avatars')
+                supabase.table('users').update({'profile_picture': url}).eq('id', row['id']).execute()
+                converted += 1
+            except Exception as e:
+                failed += 1
+                click.echo(f"✗ User {row['id']}: {e}", err=True)
+
+        click.echo(f"  ...{scanned} users scanned")
+
+    verb = "would be moved" if dry_run else "moved"
+    click.echo(f"✓ {converted} of {scanned} avatars {verb}" + (f", {failed} failed" if failed else ""))
+
+
+def register_commands(app):
+    """Attach maintenance commands, run as `flask --app api <command>`."""
+    app.cli.add_command(rebuild_counters)
+    app.cli.add_command(rebuild_user_stats)
+    app.cli.add_command(migrate_images)
+    app.cli.add_command(migrate_avatars)
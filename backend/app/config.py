@@ -6,4 +6,90 @@ load_dotenv()
 class Config:
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-    SECRET_KEY = os.getenv("SECRET_KEY", "dev_key")
\ No newline at end of file
+    SECRET_KEY = os.getenv("SECRET_KEY", "dev_key")
+    # 'development' on your machine; render.yaml sets 'production'
+    FLASK_ENV = os.getenv("FLASK_ENV", "production")
+    IS_DEVELOPMENT = FLASK_ENV == "development"
+
+    # Supabase Dashboard -> Settings -> API -> JWT Secret. When set, access
+    # tokens are verified locally instead of calling the auth server.
+    SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+    # Without the secret, tokens accepted by the auth server are cached
+    AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "5000"))
+    AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", "300"))
+
+    # Cursor pagination for list endpoints
+    FEED_PAGE_SIZE = int(os.getenv("FEED_PAGE_SIZE", "20"))
+    FEED_MAX_PAGE_SIZE = int(os.getenv("FEED_MAX_PAGE_SIZE", "100"))
+
+    # Per-worker cache of user profile cards (name, avatar, course)
+    PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "2000"))
+    PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", "300"))
+
+    # Live notification stream (GET /api/notifications/stream). EVENT_BROKER
+    # is 'memory' (single worker) or 'package.module:ClassName' of an
+    # EventBroker that fans out across workers.
+    EVENT_BROKER = os.getenv("EVENT_BROKER", "memory")
+    EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+    STREAM_HEARTBEAT = int(os.getenv("STREAM_HEARTBEAT", "15"))
+    # Streams are closed after this many seconds; EventSource reconnects
+    STREAM_MAX_DURATION = int(os.getenv("STREAM_MAX_DURATION", "300"))
+    # Lifetime of the ?ticket= a client opens the stream with
+    STREAM_TICKET_TTL = int(os.getenv("STREAM_TICKET_TTL", "60"))
+
+    # Notifications are written by a background thread in batches. Set
+    # NOTIFY_ASYNC=false to insert them inline with the request instead.
+    NOTIFY_ASYNC = os.getenv("NOTIFY_ASYNC", "true").lower() == "true"
+    NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "1000"))
+    NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "50"))
+    NOTIFY_FLUSH_INTERVAL = float(os.getenv("NOTIFY_FLUSH_INTERVAL", "0.5"))
+
+    # Shared cache for feeds that look the same to every viewer. Backend is
+    # 'memory' (per worker), 'redis' (shared, needs the redis package and
+    # FEED_CACHE_URL) or 'none'.
+    FEED_CACHE_BACKEND = os.getenv("FEED_CACHE_BACKEND", "memory")
+    FEED_CACHE_URL = os.getenv("FEED_CACHE_URL", "redis://localhost:6379/0")
+    FEED_CACHE_TTL = int(os.getenv("FEED_CACHE_TTL", "10"))
+
+    # Observability: request/query timing, GET /metrics (Prometheus format)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", "500"))
+    SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", "1500"))
+    # Warn when one request runs the same query shape from the same line
+    # more than this many times (a loop issuing one query per row)
+    N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+    # /metrics is served only when this is set, to requests that send
+    # `Authorization: Bearer <token>` or ?token=
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    # Independent Supabase reads within one request run concurrently: in
+    # greenlets under the gevent worker, otherwise on a shared pool of this
+    # many threads per worker (1 = one after another either way)
+    FANOUT_WORKERS = int(os.getenv("FANOUT_WORKERS", "16"))
+
+    # Uploaded images are stored outside the database rows. MEDIA_BACKEND is
+    # 's3' (any S3-compatible bucket - AWS, Supabase Storage, MinIO - needs
+    # boto3) or, in development only, 'local' (files under MEDIA_ROOT,
+    # served from /media). MEDIA_BASE_URL is the public URL prefix written
+    # into items.images and users.profile_picture; it is required outside
+    # development, where it defaults to the dev server's /media.
+    MEDIA_BACKEND = os.getenv("MEDIA_BACKEND", "local" if IS_DEVELOPMENT else "s3")
+    MEDIA_ROOT = os.getenv("MEDIA_ROOT", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "media"))
+    MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL") or ("http://localhost:5000/media" if IS_DEVELOPMENT else None)
+    MEDIA_MAX_BYTES = int(os.getenv("MEDIA_MAX_BYTES", str(5 * 1024 * 1024)))
+    MEDIA_S3_BUCKET = os.getenv("MEDIA_S3_BUCKET")
+    MEDIA_S3_ENDPOINT = os.getenv("MEDIA_S3_ENDPOINT")
+    MEDIA_S3_REGION = os.getenv("MEDIA_S3_REGION")
+
+    # Stored images also get resized WebP variants (thumb/card/full, needs
+    # Pillow), rendered after the upload returns in MEDIA_VARIANT_WORKERS
+    # separate processes, so resizing never stalls the gevent worker.
+    # List endpoints link the smallest variant that fills their slot.
+    MEDIA_VARIANTS = os.getenv("MEDIA_VARIANTS", "true").lower() == "true"
+    MEDIA_VARIANT_WORKERS = int(os.getenv("MEDIA_VARIANT_WORKERS", "2"))
+    MEDIA_VARIANT_QUALITY = int(os.getenv("MEDIA_VARIANT_QUALITY", "80"))
+    # Variants are only linked once storage has them. Each worker remembers
+    # up to this many checked images, and rechecks missing ones after
+    # MEDIA_VARIANT_RECHECK seconds
+    MEDIA_VARIANT_CACHE_SIZE = int(os.getenv("MEDIA_VARIANT_CACHE_SIZE", "50000"))
+    MEDIA_VARIANT_RECHECK = int(os.getenv("MEDIA_VARIANT_RECHECK", "30"))
@@ -1,8 +1,48 @@
+import base64
+import json
+
 from supabase import create_client, Client
 from app.config import Config
+from app.utils.instrumentation import InstrumentedClient
 
 # Initialize client
 supabase: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
 
+# Every query made through get_supabase() is timed and counted per request
+# (see app/utils/instrumentation.py and GET /metrics)
+_client = InstrumentedClient(supabase)
+
 def get_supabase() -> Client:
-    return supabase
\ No newline at end of file
+    return _client
+
+def set_supabase(client):
+    """Route every service through another client, e.g. the in-memory
+    stand-in used by benchmarks/ (see benchmarks/README.md)."""
+    global _client
+    _client = InstrumentedClient(client)
+
+def _key_role(key):
+    # New-style keys name their kind; legacy keys are JWTs with a role claim
+    if key.startswith('sb_secret_'):
+        return 'service_role'
+    if key.startswith('sb_publishable_'):
+        return 'anon'
+    try:
+        claims = key.split('.')[1]
+        return json.loads(base64.urlsafe_b64decode(claims + '=' * (-len(claims) % 4))).get('role')
+    except Exception:
+        return None
+
+def check_supabase_key():
+    """Refuse to start unless SUPABASE_KEY is the service_role (secret) key.
+
+    The stats, counter, reputation and inbox functions are only executable
+    by service_role, so with the anon key the dashboard, meetups and
+    messages would fail on first use instead of at deploy time.
+    """
+    role = _key_role(Config.SUPABASE_KEY or '')
+    if role != 'service_role':
+        raise RuntimeError(
+            f"SUPABASE_KEY must be the service_role key (Supabase Dashboard -> Settings -> API), "
+            f"got a key with role {role!r}"
+        )
@@ -0,0 +1,180 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+from functools import wraps
+
+from flask import g, jsonify, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from app.config import Config
+from app.extensions import get_supabase
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# token hash -> (user_id, expires_at) for tokens the auth server has accepted
+_verified_tokens = TTLCache(maxsize=Config.AUTH_CACHE_SIZE, ttl=Config.AUTH_CACHE_TTL)
+
+
+class AuthError(Exception):
+    """The bearer token is malformed, expired or not signed by Supabase."""
+
+
+def _b64decode(segment):
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+
+def _parse_jwt(token):
+    """Split a JWT into (header, claims, signing_input, signature) without verifying it."""
+    try:
+        header_b64, claims_b64, signature_b64 = token.split('.')
+        header = json.loads(_b64decode(header_b64))
+        claims = json.loads(_b64decode(claims_b64))
+        signature = _b64decode(signature_b64)
+    except Exception:
+        raise AuthError("Malformed token")
+    return header, claims, f"{header_b64}.{claims_b64}".encode(), signature
+
+
+def _check_claims(claims):
+    if claims.get('exp') is not None and claims['exp'] <= time.time():
+        raise AuthError("Token expired")
+    if not claims.get('sub'):
+        raise AuthError("Token has no subject")
+
+
+def _verify_locally(claims, signing_input, signature):
+    """Verify an HS256 Supabase access token with the project's JWT secret."""
+    expected = hmac.new(Config.SUPABASE_JWT_SECRET.encode(), signing_input, hashlib.sha256).digest()
+    if not hmac.compare_digest(expected, signature):
+        raise AuthError("Invalid signature")
+    if claims.get('aud') not in (None, 'authenticated'):
+        raise AuthError("Invalid audience")
+    _check_claims(claims)
+    return claims['sub']
+
+
+def _verify_remotely(token, claims):
+    """Ask the Supabase auth server, remembering the answer until the token expires."""
+    key = hashlib.sha256(token.encode()).hexdigest()
+
+    cached = _verified_tokens.get(key)
+    if cached and cached[1] > time.time():
+        return cached[0]
+
+    try:
+        user_response = get_supabase().auth.get_user(token)
+        user_id = user_response.user.id
+    except Exception as e:
+        raise AuthError(str(e))
+
+    # Never trust a cached answer past the token's own expiry
+    expires_at = claims.get('exp') or (time.time() + Config.AUTH_CACHE_TTL)
+    _verified_tokens.set(key, (user_id, expires_at))
+    return user_id
+
+
+def verify_token(token):
+    """Resolve a Supabase access token to the user id it was issued for.
+
+    When SUPABASE_JWT_SECRET is configured, HS256 tokens are checked locally
+    with no network call at all. Otherwise (or for tokens signed with an
+    asymmetric key) the auth server is asked once and the result is cached
+    for at most AUTH_CACHE_TTL seconds, never beyond the token's `exp`.
+    """
+    header, claims, signing_input, signature = _parse_jwt(token)
+
+    if Config.SUPABASE_JWT_SECRET and header.get('alg') == 'HS256':
+        return _verify_locally(claims, signing_input, signature)
+
+    _check_claims(claims)
+    return _verify_remotely(token, claims)
+
+
+def auth_cache_stats():
+    """Hit/miss counters for tokens verified through the auth server."""
+    return _verified_tokens.stats()
+
+
+def get_bearer_token():
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+    return auth_header.replace('Bearer ', '')
+
+
+def require_auth(f):
+    """Reject the request with 401 unless it carries a valid bearer token.
+
+    The verified user id is passed to the view as the `user_id` keyword
+    argument and is also available as `g.user_id`.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        token = get_bearer_token()
+        if not token:
+            return jsonify({"success": False, "message": "Missing Token"}), 401
+
+        try:
+            user_id = verify_token(token)
+        except AuthError as e:
+            logger.info("Rejected token: %s", e)
+            return jsonify({"success": False, "message": "Invalid Token"}), 401
+
+        g.user_id = user_id
+        return f(*args, user_id=user_id, **kwargs)
+    return decorated
+
+
+def _ticket_serializer():
+    return URLSafeTimedSerializer(Config.SECRET_KEY, salt='stream-ticket')
+
+
+def issue_stream_ticket(user_id):
+    """A short-lived ticket that opens one user's event stream.
+
+    EventSource can't send headers, so streams authenticate with
+    `?ticket=` instead of putting the long-lived access token in the URL
+    (and so in proxy and access logs). Valid for STREAM_TICKET_TTL seconds.
+    """
+    return _ticket_serializer().dumps(user_id)
+
+
+def require_stream_ticket(f):
+    """Like `require_auth`, for streams opened with `?ticket=`."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        ticket = request.args.get('ticket')
+        if not ticket:
+            return jsonify({"success": False, "message": "Missing Ticket"}), 401
+
+        try:
+            user_id = _ticket_serializer().loads(ticket, max_age=Config.STREAM_TICKET_TTL)
+        except BadSignature as e:
+            logger.info("Rejected stream ticket: %s", e)
+            return jsonify({"success": False, "message": "Invalid Ticket"}), 401
+
+        g.user_id = user_id
+        return f(*args, user_id=user_id, **kwargs)
+    return decorated
+
+
+def optional_auth(f):
+    """Like `require_auth`, but anonymous or invalid tokens get `user_id=None`."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        user_id = None
+        token = get_bearer_token()
+        if token:
+            try:
+                user_id = verify_token(token)
+            except AuthError as e:
+                logger.info("Ignoring invalid token: %s", e)
+                # Continue without user_id
+
+        g.user_id = user_id
+        return f(*args, user_id=user_id, **kwargs)
+    return decorated
@@ -1,6 +1,10 @@
+import logging
+
 from flask import Blueprint, request, jsonify
 from app.services.auth_service import AuthService
 
+logger = logging.getLogger(__name__)
+
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/register', methods=['POST'])
@@ -8,8 +12,6 @@ def register():
     try:
         data = request.get_json()
         
-        print(f"Registration request received: {data}")
-        
         # Validate required fields
         required_fields = ['schoolEmail', 'password', 'firstName', 'lastName', 
                           'currentYear', 'blockSection', 'course', 'phoneNumber']
@@ -37,9 +39,7 @@ def register():
         return jsonify(response), status
         
     except Exception as e:
-        print(f"Registration route error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Registration failed")
         return jsonify({
             "success": False,
             "message": f"Server error: {str(e)}"
@@ -57,8 +57,5 @@ def login():
         password=data.get('password')
     )
     
-    print(f"Login response being sent: {response}")
-    print(f"User data in response: {response.get('user')}")
-    
     return jsonify(response), status
 
@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify
+import logging
 import os
 import smtplib
 from email.message import EmailMessage
 
 feedback_bp = Blueprint('feedback', __name__)
+logger = logging.getLogger(__name__)
 
 
 def _send_feedback_email(subject: str, body: str) -> None:
@@ -20,7 +22,7 @@ def _send_feedback_email(subject: str, body: str) -> None:
     smtp_user = os.getenv('SMTP_USER')
     smtp_pass = os.getenv('SMTP_PASS')
 
-    print(f"SMTP Config - Host: {smtp_host}, Port: {smtp_port}, User: {smtp_user}, To: {to_email}")
+    logger.debug("SMTP config - host: %s, port: %s, user: %s, to: %s", smtp_host, smtp_port, smtp_user, to_email)
 
     if not (smtp_user and smtp_pass):
         # In dev, fail gracefully so the frontend sees a clear error
@@ -32,16 +34,11 @@ def _send_feedback_email(subject: str, body: str) -> None:
     msg['To'] = to_email
     msg.set_content(body)
 
-    try:
-        with smtplib.SMTP(smtp_host, smtp_port, timeout=10) as server:
-            server.set_debuglevel(1)  # Enable debug output
-            server.starttls()
-            server.login(smtp_user, smtp_pass)
-            server.send_message(msg)
-            print(f"Email sent successfully to {to_email}")
-    except Exception as e:
-        print(f"SMTP Error: {type(e).__name__}: {str(e)}")
-        raise
+    with smtplib.SMTP(smtp_host, smtp_port, timeout=10) as server:
+        server.starttls()
+        server.login(smtp_user, smtp_pass)
+        server.send_message(msg)
+    logger.info("Feedback email sent to %s", to_email)
 
 
 @feedback_bp.route('/send', methods=['POST'])
@@ -77,22 +74,14 @@ def send_feedback():
     ]
     body = "\n".join(lines)
 
-    # Log feedback to console (always works)
-    print(f"\n{'='*50}")
-    print(f"📬 FEEDBACK RECEIVED")
-    print(f"{'='*50}")
-    print(f"Type: {feedback_type}")
-    print(f"Page: {page or 'N/A'}")
-    print(f"Contact: {contact or 'N/A'}")
-    print(f"Message:\n{message}")
-    print(f"{'='*50}\n")
+    # Log feedback (always works)
+    logger.info("Feedback received\n%s", body)
     
     # Try to send email, but don't fail if it doesn't work
     try:
         _send_feedback_email(subject, body)
-        print("✅ Email sent successfully")
     except Exception as e:
-        print(f"⚠️ Email not sent (but feedback logged): {type(e).__name__}: {e}")
+        logger.warning("Feedback email not sent (but feedback logged): %s: %s", type(e).__name__, e)
     
     # Always return success since feedback is logged
     return jsonify({"success": True, "message": "Feedback received. Thank you!"}), 200
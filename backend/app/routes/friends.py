@@ -1,26 +1,14 @@
 from flask import Blueprint, request, jsonify
-from app.extensions import get_supabase
+from app.middlewares.auth_middleware import require_auth
 from app.services.friend_service import FriendService
+from app.utils.http_cache import cache_policy
 
 friends_bp = Blueprint('friends', __name__)
 
 @friends_bp.route('/request/send', methods=['POST'])
-def send_friend_request():
+@require_auth
+def send_friend_request(user_id):
     """Send a friend request"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     data = request.get_json()
     receiver_id = data.get('receiver_id')
     
@@ -37,42 +25,16 @@ def send_friend_request():
     return jsonify(result), 400
 
 @friends_bp.route('/requests', methods=['GET'])
-def get_friend_requests():
+@require_auth
+def get_friend_requests(user_id):
     """Get pending friend requests"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     result = FriendService.get_friend_requests(user_id)
     return jsonify(result)
 
 @friends_bp.route('/request/<request_id>/accept', methods=['PUT'])
-def accept_friend_request(request_id):
+@require_auth
+def accept_friend_request(request_id, user_id):
     """Accept a friend request"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     result = FriendService.accept_friend_request(request_id, user_id)
     
     if result['success']:
@@ -80,22 +42,9 @@ def accept_friend_request(request_id):
     return jsonify(result), 400
 
 @friends_bp.route('/request/<request_id>/reject', methods=['PUT'])
-def reject_friend_request(request_id):
+@require_auth
+def reject_friend_request(request_id, user_id):
     """Reject a friend request"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     result = FriendService.reject_friend_request(request_id, user_id)
     
     if result['success']:
@@ -103,42 +52,17 @@ def reject_friend_request(request_id):
     return jsonify(result), 400
 
 @friends_bp.route('/list', methods=['GET'])
-def get_friends():
+@cache_policy(vary=('Authorization',))
+@require_auth
+def get_friends(user_id):
     """Get list of friends"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     result = FriendService.get_friends(user_id)
     return jsonify(result)
 
 @friends_bp.route('/remove/<friendship_id>', methods=['DELETE'])
-def remove_friend(friendship_id):
+@require_auth
+def remove_friend(friendship_id, user_id):
     """Remove a friend"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     result = FriendService.remove_friend(friendship_id, user_id)
     
     if result['success']:
@@ -146,21 +70,8 @@ def remove_friend(friendship_id):
     return jsonify(result), 400
 
 @friends_bp.route('/status/<other_user_id>', methods=['GET'])
-def get_friendship_status(other_user_id):
+@require_auth
+def get_friendship_status(other_user_id, user_id):
     """Get friendship status with another user"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     result = FriendService.get_friendship_status(user_id, other_user_id)
     return jsonify(result)
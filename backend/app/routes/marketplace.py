@@ -1,20 +1,53 @@
 from flask import Blueprint,request,jsonify
-from app.extensions import get_supabase
+from app.services.marketplace_service import MarketPlaceService
+from app.utils.http_cache import PUBLIC_REVALIDATE, cache_policy
 
 market_bp = Blueprint('marketplace', __name__)
 
 
 @market_bp.route('/items', methods=['GET'])
+@cache_policy(PUBLIC_REVALIDATE)
 def get_marketplace_item():
-    # Import inside the function
     try:
-        from app.services.marketplace_service import MarketPlaceService
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        fields = request.args.get('fields')
+        response, status = MarketPlaceService.get_marketplace_item(limit=limit, cursor=cursor, fields=fields)
+        return jsonify(response), status
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    
+        return jsonify({"success": False, "message": str(e)}), 500
+
+
+@market_bp.route('/search', methods=['GET'])
+@cache_policy(PUBLIC_REVALIDATE)
+def search_marketplace_items():
+    """Server-side search over active listings.
+
+    Query params: q, category, subcategory, condition, size, min_price,
+    max_price, sort (newest | oldest | price_asc | price_desc), limit,
+    cursor, facets (send facets=0 to skip the facet counts), fields.
+    """
     try:
-        response, status = MarketPlaceService.get_marketplace_item()
+        min_price = request.args.get('min_price', type=float)
+        max_price = request.args.get('max_price', type=float)
+        if (request.args.get('min_price') and min_price is None) or \
+                (request.args.get('max_price') and max_price is None):
+            return jsonify({"success": False, "message": "Prices must be numbers"}), 400
+
+        response, status = MarketPlaceService.search_items(
+            q=request.args.get('q'),
+            category=request.args.get('category'),
+            subcategory=request.args.get('subcategory'),
+            condition=request.args.get('condition'),
+            size=request.args.get('size'),
+            min_price=min_price,
+            max_price=max_price,
+            sort=request.args.get('sort', 'newest'),
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            include_facets=request.args.get('facets') != '0',
+            fields=request.args.get('fields')
+        )
         return jsonify(response), status
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
-
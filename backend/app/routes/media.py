@@ -0,0 +1,35 @@
+import os
+
+from flask import Blueprint, jsonify, redirect, send_file
+
+from app.services.image_service import ImageService
+from app.utils.media_storage import IMMUTABLE_CACHE_CONTROL, LocalStorage, get_media_storage
+
+media_bp = Blueprint('media', __name__)
+
+
+@media_bp.route('/<path:key>', methods=['GET'])
+def get_media(key):
+    """Serve stored images when MEDIA_BACKEND=local (S3 serves its own)."""
+    storage = get_media_storage()
+    if not isinstance(storage, LocalStorage):
+        return jsonify({"success": False, "message": "Not found"}), 404
+
+    try:
+        path = storage.path(key)
+    except ValueError:
+        return jsonify({"success": False, "message": "Not found"}), 404
+    if not os.path.isfile(path):
+        # Variants are rendered just after the upload; until then send the original
+        original = ImageService.variant_source(key)
+        if original:
+            response = redirect(storage.url(original), code=302)
+            response.headers['Cache-Control'] = 'no-store'
+            return response
+        return jsonify({"success": False, "message": "Not found"}), 404
+
+    # The key is the content hash: the file behind a URL never changes
+    response = send_file(path, conditional=True, max_age=31536000)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
@@ -1,65 +1,56 @@
-from flask import Blueprint, request, jsonify
-from app.extensions import get_supabase
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from app.middlewares.auth_middleware import issue_stream_ticket, require_auth, require_stream_ticket
+from app.config import Config
 from app.services.notification_service import NotificationService
 
 notifications_bp = Blueprint('notifications', __name__)
 
 @notifications_bp.route('/', methods=['GET'])
-def get_notifications():
+@require_auth
+def get_notifications(user_id):
     """Get all notifications for the current user"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     result = NotificationService.get_notifications(user_id)
     return jsonify(result)
 
 @notifications_bp.route('/mark-read', methods=['PUT'])
-def mark_all_read():
+@require_auth
+def mark_all_read(user_id):
     """Mark all notifications as read"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     result = NotificationService.mark_all_read(user_id)
     return jsonify(result)
 
 @notifications_bp.route('/<notification_id>/read', methods=['PUT'])
-def mark_notification_read(notification_id):
+@require_auth
+def mark_notification_read(notification_id, user_id):
     """Mark a specific notification as read"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     result = NotificationService.mark_read(notification_id, user_id)
     return jsonify(result)
+
+@notifications_bp.route('/stream-ticket', methods=['POST'])
+@require_auth
+def create_stream_ticket(user_id):
+    """A short-lived ticket for opening the notification stream"""
+    return jsonify({
+        "success": True,
+        "ticket": issue_stream_ticket(user_id),
+        "expires_in": Config.STREAM_TICKET_TTL
+    })
+
+@notifications_bp.route('/stream', methods=['GET'])
+@require_stream_ticket
+def stream_notifications(user_id):
+    """Server-sent events: new notifications, messages and unread counts.
+
+    POST /stream-ticket, then open `new EventSource('/api/notifications/stream?ticket=...')`
+    instead of polling the notification and unread-count endpoints. Get a
+    fresh ticket for every (re)connect.
+    """
+    return Response(
+        stream_with_context(NotificationService.stream_events(user_id)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            # Stop reverse proxies from buffering the stream
+            'X-Accel-Buffering': 'no'
+        }
+    )
@@ -1,26 +1,14 @@
 from flask import Blueprint, request, jsonify
-from app.extensions import get_supabase
+from app.middlewares.auth_middleware import require_auth
 from app.services.offer_service import OfferService
+from app.utils.helpers import is_uuid
 
 offer_bp = Blueprint('offer', __name__)
 
 @offer_bp.route('/create', methods=['POST'])
-def create_offer():
+@require_auth
+def create_offer(user_id):
     """Create a new offer on an item"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     data = request.get_json()
     
     item_id = data.get('item_id')
@@ -37,62 +25,23 @@ def create_offer():
     return jsonify(result), 400
 
 @offer_bp.route('/received', methods=['GET'])
-def get_received_offers():
+@require_auth
+def get_received_offers(user_id):
     """Get all offers received by the user"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     result = OfferService.get_received_offers(user_id)
     return jsonify(result)
 
 @offer_bp.route('/sent', methods=['GET'])
-def get_sent_offers():
+@require_auth
+def get_sent_offers(user_id):
     """Get all offers sent by the user"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     result = OfferService.get_sent_offers(user_id)
     return jsonify(result)
 
 @offer_bp.route('/<offer_id>/status', methods=['PUT'])
-def update_offer_status(offer_id):
+@require_auth
+def update_offer_status(offer_id, user_id):
     """Update offer status (accept, reject, counter)"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     data = request.get_json()
     
     status = data.get('status')
@@ -112,22 +61,9 @@ def update_offer_status(offer_id):
     return jsonify(result), 400
 
 @offer_bp.route('/message/send', methods=['POST'])
-def send_message():
+@require_auth
+def send_message(user_id):
     """Send a direct message"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     data = request.get_json()
     
     receiver_id = data.get('receiver_id')
@@ -145,65 +81,35 @@ def send_message():
     return jsonify(result), 400
 
 @offer_bp.route('/conversations', methods=['GET'])
-def get_conversations():
+@require_auth
+def get_conversations(user_id):
     """Get all conversations for the user"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
-    result = OfferService.get_conversations(user_id)
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+
+    result = OfferService.get_conversations(user_id, limit=limit, cursor=cursor)
     return jsonify(result)
 
 @offer_bp.route('/messages/<other_user_id>', methods=['GET'])
-def get_messages(other_user_id):
+@require_auth
+def get_messages(other_user_id, user_id):
     """Get recent messages with a specific user (limited, Messenger-style)"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     # Optional query params for pagination
     limit = request.args.get('limit', default=50, type=int)
     before = request.args.get('before')  # ISO timestamp string
+    after = request.args.get('after')  # sync_cursor from the previous response
+    if not is_uuid(other_user_id):
+        return jsonify({"success": False, "message": "Invalid user id"}), 400
 
-    result = OfferService.get_messages(user_id, other_user_id, limit=limit, before=before)
+    result = OfferService.get_messages(user_id, other_user_id, limit=limit, before=before, after=after)
+    if after and result.get('success') and not result['messages']:
+        # Nothing new: the client keeps its cursor
+        return '', 204
     return jsonify(result)
 
 @offer_bp.route('/unread-count', methods=['GET'])
-def get_unread_count():
+@require_auth
+def get_unread_count(user_id):
     """Get total unread message count"""
-    auth_header = request.headers.get('Authorization')
-    
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        return jsonify({"success": False, "message": "Invalid Token"}), 401
-    
     result = OfferService.get_unread_count(user_id)
     return jsonify(result)
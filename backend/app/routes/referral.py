@@ -1,26 +1,13 @@
 from flask import Blueprint, jsonify, request
-from app.extensions import get_supabase
+from app.middlewares.auth_middleware import require_auth
 from app.services.referral_service import ReferralService
 
 referral_bp = Blueprint('referral', __name__)
 
 @referral_bp.route('/stats', methods=['GET'])
-def get_referral_stats():
+@require_auth
+def get_referral_stats(user_id):
     """Get user's referral statistics"""
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        print(f"Auth error: {e}")
-        return jsonify({"success": False, "message": "Invalid or Expired Token"}), 401
-    
     try:
         stats = ReferralService.get_user_referral_stats(user_id)
         return jsonify(stats), 200
@@ -41,22 +28,9 @@ def validate_referral_code(code):
         return jsonify({"success": False, "message": str(e)}), 500
 
 @referral_bp.route('/leaderboard', methods=['GET'])
-def get_referral_leaderboard():
+@require_auth
+def get_referral_leaderboard(user_id):
     """Get top referrers leaderboard"""
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        print(f"Auth error: {e}")
-        return jsonify({"success": False, "message": "Invalid or Expired Token"}), 401
-    
     try:
         limit = request.args.get('limit', 10, type=int)
         leaderboard = ReferralService.get_referral_leaderboard(limit)
@@ -1,33 +1,17 @@
-from flask import Blueprint,request,jsonify
-from app.extensions import get_supabase
+from flask import Blueprint,request,jsonify,redirect
+from app.middlewares.auth_middleware import require_auth
+from app.utils.http_cache import cache_policy, set_last_modified
 from app.services.user_service import UserService
 
 user_bp = Blueprint('user', __name__)
 
 @user_bp.route('/dashboard', methods=['GET'])
-def get_dashboard():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-    user_id = None
-
-    # --- BLOCK 1: VALIDATE AUTH ---
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        # If this fails, it is genuinely an invalid token
-        print(f"Auth specific error: {e}")
-        return jsonify({"success": False, "message": "Invalid or Expired Token"}), 401
-
-    # --- BLOCK 2: FETCH DATA (Outside the Auth Try/Catch) ---
-    # If this fails, it will show a real 500 error in your terminal, 
-    # instead of falsely saying "Invalid Token"
+@require_auth
+def get_dashboard(user_id):
+    # Auth is handled by @require_auth, so a failure here shows a real
+    # 500 error in your terminal instead of falsely saying "Invalid Token"
     
-    response, status = UserService.get_dashboard_data(user_id)
+    response, status = UserService.get_dashboard_data(user_id, fields=request.args.get('fields'))
 
     # Fix the Serialization Error here:
     if hasattr(response, 'data'):
@@ -38,101 +22,53 @@ def get_dashboard():
     return jsonify(final_data), status
 
 @user_bp.route('/profile', methods=['GET'])
-def get_profile():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        print(f"Auth error: {e}")
-        return jsonify({"success": False, "message": "Invalid or Expired Token"}), 401
-
-    response, status = UserService.get_profile(user_id)
+@require_auth
+def get_profile(user_id):
+    response, status = UserService.get_profile(user_id, fields=request.args.get('fields'))
     return jsonify(response), status
 
 @user_bp.route('/profile', methods=['PUT'])
-def update_profile():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        print(f"Auth error: {e}")
-        return jsonify({"success": False, "message": "Invalid or Expired Token"}), 401
-
+@require_auth
+def update_profile(user_id):
     data = request.get_json()
     response, status = UserService.update_profile(user_id, data)
     return jsonify(response), status
 
 @user_bp.route('/profile/completion', methods=['GET'])
-def check_profile_completion():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-
-    try:
-        user_response = supabase.auth.get_user(token)
-        user_id = user_response.user.id
-    except Exception as e:
-        print(f"Auth error: {e}")
-        return jsonify({"success": False, "message": "Invalid or Expired Token"}), 401
-
+@require_auth
+def check_profile_completion(user_id):
     response, status = UserService.check_profile_completion(user_id)
     return jsonify(response), status
 
-@user_bp.route('/profile/<user_id>', methods=['GET'])
-def get_user_profile(user_id):
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-
-    try:
-        user_response = supabase.auth.get_user(token)
-        # Just verify token is valid, don't need to match user_id
-    except Exception as e:
-        print(f"Auth error: {e}")
-        return jsonify({"success": False, "message": "Invalid or Expired Token"}), 401
-
-    response, status = UserService.get_user_profile_by_id(user_id)
+@user_bp.route('/profile/<profile_user_id>', methods=['GET'])
+@cache_policy()
+@require_auth
+def get_user_profile(profile_user_id, user_id):
+    # Any signed-in user may view another user's profile
+    response, status = UserService.get_user_profile_by_id(profile_user_id)
+    if status == 200 and response.get('user'):
+        set_last_modified(response['user'].get('updated_at'))
     return jsonify(response), status
 
-@user_bp.route('/search', methods=['GET'])
-def search_users():
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return jsonify({"success": False, "message": "Missing Token"}), 401
-
-    token = auth_header.replace('Bearer ', '')
-    supabase = get_supabase()
-
-    try:
-        user_response = supabase.auth.get_user(token)
-        current_user_id = user_response.user.id
-    except Exception as e:
-        print(f"Auth error: {e}")
-        return jsonify({"success": False, "message": "Invalid or Expired Token"}), 401
+@user_bp.route('/profile/<profile_user_id>/avatar', methods=['GET'])
+def get_avatar(profile_user_id):
+    # Used straight from <img src>, which can't send a bearer token. The
+    # redirect is short-lived (the avatar may change); the file it points
+    # to is content-addressed and cached for a year.
+    response, status = UserService.get_avatar_url(profile_user_id, request.args.get('size', 'sm'))
+    if status != 200:
+        return jsonify(response), status
+    avatar = redirect(response['url'], code=302)
+    avatar.headers['Cache-Control'] = 'public, max-age=300'
+    return avatar
 
+@user_bp.route('/search', methods=['GET'])
+@require_auth
+def search_users(user_id):
     query = request.args.get('q', '')
     course = request.args.get('course', '')
     year = request.args.get('year', '')
+    include_facets = request.args.get('facets') == '1'
     
-    response, status = UserService.search_users(query, course, year, current_user_id)
+    response, status = UserService.search_users(query, course, year, user_id, include_facets)
     return jsonify(response), status
\ No newline at end of file
@@ -1,4 +1,9 @@
+import logging
+
 from app.extensions import get_supabase
+from app.services.user_service import PROFILE_FIELDS
+
+logger = logging.getLogger(__name__)
 
 class AuthService:
     
@@ -8,10 +13,6 @@ class AuthService:
         supabase = get_supabase()
         
         try:
-            print(f"Attempting to register user: {email}")
-            if referral_code:
-                print(f"Referral code provided: {referral_code}")
-            
             # Step 1: Validate referral code if provided
             referrer_id = None
             if referral_code:
@@ -19,11 +20,10 @@ class AuthService:
                     referrer = supabase.table('users').select('id').eq('referral_code', referral_code).execute()
                     if referrer.data and len(referrer.data) > 0:
                         referrer_id = referrer.data[0]['id']
-                        print(f"✓ Valid referral code from user: {referrer_id}")
                     else:
-                        print(f"⚠ Invalid referral code: {referral_code}")
+                        logger.info("Ignoring unknown referral code at registration")
                 except Exception as ref_error:
-                    print(f"⚠ Error validating referral code: {str(ref_error)}")
+                    logger.warning("Error validating referral code: %s", ref_error)
             
             # Step 2: Create auth user (Supabase handles password hashing automatically)
             auth_response = supabase.auth.sign_up({
@@ -31,13 +31,11 @@ class AuthService:
                 "password": password
             })
             
-            print(f"Auth response: {auth_response}")
-            
             if not auth_response.user:
-                print("Auth user creation failed")
+                logger.warning("Auth user creation failed")
                 return {"success": False, "message": "Registration failed - could not create auth user"}, 400
             
-            print(f"Auth user created with ID: {auth_response.user.id}")
+            logger.info("Auth user created: %s", auth_response.user.id)
             
             # Step 3: Generate referral code for new user
             new_referral_code = None
@@ -47,9 +45,8 @@ class AuthService:
                     'user_last_name': last_name
                 }).execute()
                 new_referral_code = code_result.data
-                print(f"✓ Generated referral code: {new_referral_code}")
             except Exception as code_error:
-                print(f"⚠ Error generating referral code: {str(code_error)}")
+                logger.warning("Error generating referral code: %s", code_error)
             
             # Step 4: Store additional user data in users table
             user_data = {
@@ -66,13 +63,9 @@ class AuthService:
                 "profile_completed": False
             }
             
-            print(f"Inserting user data: {user_data}")
-            
             try:
                 # Use upsert instead of insert to avoid conflicts
                 db_response = supabase.table('users').upsert(user_data).execute()
-                print(f"Database upsert response: {db_response}")
-                print(f"✓ User data saved to database successfully")
                 
                 # Step 5: Process referral reward if referrer exists
                 if referrer_id:
@@ -82,13 +75,12 @@ class AuthService:
                             'referred_uuid': auth_response.user.id,
                             'ref_code': referral_code
                         }).execute()
-                        print(f"✓ Referral rewards processed successfully")
                     except Exception as reward_error:
-                        print(f"⚠ Error processing referral rewards: {str(reward_error)}")
+                        logger.warning("Error processing referral rewards: %s", reward_error)
                 
             except Exception as db_error:
-                print(f"⚠ Database insert failed: {str(db_error)}")
-                print(f"⚠ User can still login, but profile data may be incomplete")
+                # The user can still log in, but profile data may be incomplete
+                logger.error("Saving profile for new user %s failed: %s", auth_response.user.id, db_error)
             
             return {
                 "success": True,
@@ -97,9 +89,7 @@ class AuthService:
             }, 201
             
         except Exception as e:
-            print(f"Registration error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Registration error")
             
             # If it's a foreign key error, the auth user was created but DB insert failed
             # The user can still login after email confirmation
@@ -125,14 +115,12 @@ class AuthService:
             
             if response.user:
                 # Get additional user data from users table
-                user_data = supabase.table('users').select('*').eq('id', response.user.id).execute()
-                
-                print(f"Login - User ID: {response.user.id}")
-                print(f"Login - User data query result: {user_data.data}")
+                user_data = supabase.table('users').select(
+                    PROFILE_FIELDS.resolve().columns).eq('id', response.user.id).execute()
                 
                 # Check if user data exists
                 if not user_data.data or len(user_data.data) == 0:
-                    print(f"⚠ Warning: No user data found in users table for user {response.user.id}")
+                    logger.warning("No users row for authenticated user %s", response.user.id)
                     return {
                         "success": False,
                         "message": "Login successful but user data is missing. Please try again."
@@ -151,8 +139,6 @@ class AuthService:
             return {"success": False, "message": "Invalid credentials"}, 401
             
         except Exception as e:
-            print(f"Login error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.info("Login failed: %s", e)
             return {"success": False, "message": str(e)}, 401
     
@@ -1,48 +1,52 @@
+import logging
 from app.extensions import get_supabase
+from app.services.profile_card_service import hydrate_users
+from app.utils.feed_cache import get_feed_cache, invalidate_feeds
+
+logger = logging.getLogger(__name__)
 
 class BoardService:
     @staticmethod
     def get_board_item(user_id=None):
+        """Get active requests with poster name and reply/like counts from a
+        single `get_board_feed` call (see datas/create_board_feed.sql).
+
+        The feed itself is the same for everyone and is shared through the
+        feed cache; only whether the viewer liked each request is looked up
+        per viewer, with one small query.
+        """
         supabase = get_supabase()
         try:
-            # Fetch requests
-            requests = supabase.table('requests').select('*').eq('status', 'active').order('created_at', desc=True).limit(100).execute()
-            
-            # Add reply count, like count, user_liked status, and user info to each request
-            if requests.data:
-                for req in requests.data:
-                    # Fetch user data for the request poster
-                    try:
-                        user_data = supabase.table('users').select('first_name, last_name').eq('id', req['user_id']).single().execute()
-                        if user_data.data:
-                            req['user_first_name'] = user_data.data.get('first_name', 'Unknown')
-                            req['user_last_name'] = user_data.data.get('last_name', 'User')
-                        else:
-                            req['user_first_name'] = 'Unknown'
-                            req['user_last_name'] = 'User'
-                    except Exception as e:
-                        print(f"Error fetching user data for user {req['user_id']}: {e}")
-                        req['user_first_name'] = 'Unknown'
-                        req['user_last_name'] = 'User'
-                    
-                    # Count replies for this request
-                    reply_count = supabase.table('request_replies').select('id', count='exact').eq('request_id', req['id']).execute()
-                    req['reply_count'] = reply_count.count if reply_count.count else 0
-                    
-                    # Count likes for this request
-                    like_count = supabase.table('request_likes').select('id', count='exact').eq('request_id', req['id']).execute()
-                    req['like_count'] = like_count.count if like_count.count else 0
-                    
-                    # Check if current user liked this request
-                    if user_id:
-                        user_like = supabase.table('request_likes').select('id').eq('request_id', req['id']).eq('user_id', user_id).execute()
-                        req['user_liked'] = len(user_like.data) > 0 if user_like.data else False
-                    else:
-                        req['user_liked'] = False
+            def build():
+                feed = supabase.rpc('get_board_feed', {'viewer_id': None, 'page_limit': 100}).execute()
+
+                requests = []
+                for req in feed.data or []:
+                    req.pop('liked_by_me', None)
+                    req['user_first_name'] = req.get('user_first_name') or 'Unknown'
+                    req['user_last_name'] = req.get('user_last_name') or 'User'
+                    req['reply_count'] = req.get('reply_count') or 0
+                    req['like_count'] = req.get('like_count') or 0
+                    requests.append(req)
+                return requests
+
+            shared = get_feed_cache().get_or_build('board', 'feed', build)
+
+            liked = set()
+            if user_id and shared:
+                likes = supabase.table('request_likes')\
+                    .select('request_id')\
+                    .eq('user_id', user_id)\
+                    .in_('request_id', [req['id'] for req in shared])\
+                    .execute()
+                liked = {like['request_id'] for like in likes.data or []}
+
+            # Copy rows: the cached list is shared between viewers
+            requests = [{**req, 'user_liked': req['id'] in liked} for req in shared]
             
-            return {"success": True, "data": requests.data}, 200
+            return {"success": True, "data": requests}, 200
         except Exception as e:
-            print(f"Service Error: {e}")
+            logger.exception("Get request board failed")
             return {"success": False, "message": str(e)}, 500
 
     @staticmethod
@@ -59,9 +63,10 @@ class BoardService:
                 "status": "active"
             }
             response = supabase.table('requests').insert(request_payload).execute()
+            invalidate_feeds('board')
             return {"success": True, "data": response.data}, 201
         except Exception as e:
-            print(f"Create Request Error: {e}")
+            logger.exception("Create request failed")
             return {"success": False, "message": str(e)}, 500
 
     @staticmethod
@@ -74,9 +79,10 @@ class BoardService:
             if check.data['user_id'] != user_id:
                 return {"success": False, "message": "Unauthorized"}, 403
             response = supabase.table('requests').delete().eq('id', request_id).execute()
+            invalidate_feeds('board', 'board_replies')
             return {"success": True, "message": "Request deleted"}, 200
         except Exception as e:
-            print(f"Delete Request Error: {e}")
+            logger.exception("Delete request failed")
             return {"success": False, "message": str(e)}, 500
 
     @staticmethod
@@ -90,41 +96,33 @@ class BoardService:
             else:
                 supabase.table('request_likes').insert({"user_id": user_id, "request_id": request_id}).execute()
                 user_liked = True
+            invalidate_feeds('board')
             
-            # Count likes directly instead of using RPC
-            like_count_result = supabase.table('request_likes').select('id', count='exact').eq('request_id', request_id).execute()
-            like_count = like_count_result.count if like_count_result.count else 0
+            # like_count is kept up to date by a trigger on request_likes
+            # (datas/add_request_counters.sql), so this is a primary key read
+            counter = supabase.table('requests').select('like_count').eq('id', request_id).single().execute()
+            like_count = (counter.data or {}).get('like_count') or 0
             
             return {"success": True, "data": {"like_count": like_count, "user_liked": user_liked}}, 200
         except Exception as e:
-            print(f"Like error: {e}")
+            logger.exception("Like failed")
             return {"success": False, "message": str(e)}, 500
 
     @staticmethod
     def get_replies(request_id):
         supabase = get_supabase()
         try:
-            replies = supabase.table('request_replies').select('*').eq('request_id', request_id).order('created_at', desc=False).execute()
+            def build():
+                replies = supabase.table('request_replies').select('*').eq('request_id', request_id).order('created_at', desc=False).execute()
+                
+                # Attach reply authors' names from the shared profile card cache
+                return hydrate_users(replies.data or [], 'user_id', 'user', fields=('first_name', 'last_name'))
             
-            # Fetch user data for each reply
-            if replies.data:
-                for reply in replies.data:
-                    try:
-                        user_data = supabase.table('users').select('first_name, last_name').eq('id', reply['user_id']).single().execute()
-                        if user_data.data:
-                            reply['user_first_name'] = user_data.data.get('first_name', 'Unknown')
-                            reply['user_last_name'] = user_data.data.get('last_name', 'User')
-                        else:
-                            reply['user_first_name'] = 'Unknown'
-                            reply['user_last_name'] = 'User'
-                    except Exception as e:
-                        print(f"Error fetching user data for reply user {reply['user_id']}: {e}")
-                        reply['user_first_name'] = 'Unknown'
-                        reply['user_last_name'] = 'User'
+            replies = get_feed_cache().get_or_build('board_replies', request_id, build)
             
-            return {"success": True, "data": replies.data}, 200
+            return {"success": True, "data": replies}, 200
         except Exception as e:
-            print(f"Get Replies Error: {e}")
+            logger.exception("Get replies failed")
             return {"success": False, "message": str(e)}, 500
 
     @staticmethod
@@ -139,9 +137,10 @@ class BoardService:
                 "content": content_text  # Send both to satisfy both columns
             }
             response = supabase.table('request_replies').insert(reply_payload).execute()
+            invalidate_feeds('board', 'board_replies')
             return {"success": True, "data": response.data}, 201
         except Exception as e:
-            print(f"Create Reply Error: {e}")
+            logger.exception("Create reply failed")
             return {"success": False, "message": str(e)}, 500
 
     @staticmethod
@@ -154,7 +153,8 @@ class BoardService:
             if check.data['user_id'] != user_id:
                 return {"success": False, "message": "Unauthorized"}, 403
             response = supabase.table('request_replies').delete().eq('id', reply_id).execute()
+            invalidate_feeds('board', 'board_replies')
             return {"success": True, "message": "Reply deleted"}, 200
         except Exception as e:
-            print(f"Delete Reply Error: {e}")
+            logger.exception("Delete reply failed")
             return {"success": False, "message": str(e)}, 500
@@ -1,9 +1,13 @@
+import logging
 import uuid
 from datetime import datetime
 from typing import List, Dict
 from app.extensions import get_supabase
+from app.services.image_service import ImageService
 from app.services.notification_service import NotificationService
 
+logger = logging.getLogger(__name__)
+
 class FriendService:
     @staticmethod
     def send_friend_request(sender_id: str, receiver_id: str) -> Dict:
@@ -19,10 +23,6 @@ class FriendService:
             if existing.data:
                 return {"success": False, "message": "Friend request already exists or you are already friends"}
             
-            # Get sender info for notification
-            sender_response = supabase.table('users').select('first_name, last_name').eq('id', sender_id).single().execute()
-            sender_name = f"{sender_response.data['first_name']} {sender_response.data['last_name']}"
-            
             # Create friend request
             request_id = str(uuid.uuid4())
             friendship_data = {
@@ -35,7 +35,7 @@ class FriendService:
             supabase.table('friendships').insert(friendship_data).execute()
             
             # Create notification
-            NotificationService.create_friend_request_notification(receiver_id, sender_name, request_id)
+            NotificationService.create_friend_request_notification(receiver_id, sender_id, request_id)
             
             return {
                 "success": True,
@@ -43,7 +43,7 @@ class FriendService:
                 "request_id": request_id
             }
         except Exception as e:
-            print(f"Send friend request error: {e}")
+            logger.exception("Send friend request failed")
             return {"success": False, "message": str(e)}
     
     @staticmethod
@@ -67,7 +67,7 @@ class FriendService:
                     'created_at': req['created_at'],
                     'sender_first_name': req['users']['first_name'] if req.get('users') else '',
                     'sender_last_name': req['users']['last_name'] if req.get('users') else '',
-                    'sender_profile_picture': req['users'].get('profile_picture') if req.get('users') else None,
+                    'sender_profile_picture': ImageService.avatar_url(req['users'].get('profile_picture')) if req.get('users') else None,
                     'sender_course': req['users'].get('course') if req.get('users') else None
                 })
             
@@ -76,7 +76,7 @@ class FriendService:
                 "requests": requests
             }
         except Exception as e:
-            print(f"Get friend requests error: {e}")
+            logger.exception("Get friend requests failed")
             return {"success": False, "message": str(e), "requests": []}
     
     @staticmethod
@@ -99,19 +99,15 @@ class FriendService:
             # Update status to active
             supabase.table('friendships').update({'status': 'active'}).eq('id', request_id).execute()
             
-            # Get accepter info for notification
-            accepter_response = supabase.table('users').select('first_name, last_name').eq('id', user_id).single().execute()
-            accepter_name = f"{accepter_response.data['first_name']} {accepter_response.data['last_name']}"
-            
             # Notify sender that request was accepted
-            NotificationService.create_friend_accepted_notification(request['user_id'], accepter_name, request_id)
+            NotificationService.create_friend_accepted_notification(request['user_id'], user_id, request_id)
             
             return {
                 "success": True,
                 "message": "Friend request accepted"
             }
         except Exception as e:
-            print(f"Accept friend request error: {e}")
+            logger.exception("Accept friend request failed")
             return {"success": False, "message": str(e)}
     
     @staticmethod
@@ -137,7 +133,7 @@ class FriendService:
                 "message": "Friend request rejected"
             }
         except Exception as e:
-            print(f"Reject friend request error: {e}")
+            logger.exception("Reject friend request failed")
             return {"success": False, "message": str(e)}
     
     @staticmethod
@@ -165,7 +161,7 @@ class FriendService:
                     'id': friend_id,
                     'first_name': friend_data.get('first_name', ''),
                     'last_name': friend_data.get('last_name', ''),
-                    'profile_picture': friend_data.get('profile_picture'),
+                    'profile_picture': ImageService.avatar_url(friend_data.get('profile_picture')),
                     'course': friend_data.get('course'),
                     'friendship_id': friendship['id']
                 })
@@ -175,7 +171,7 @@ class FriendService:
                 "friends": friends
             }
         except Exception as e:
-            print(f"Get friends error: {e}")
+            logger.exception("Get friends failed")
             return {"success": False, "message": str(e), "friends": []}
     
     @staticmethod
@@ -203,7 +199,7 @@ class FriendService:
                 "message": "Friend removed"
             }
         except Exception as e:
-            print(f"Remove friend error: {e}")
+            logger.exception("Remove friend failed")
             return {"success": False, "message": str(e)}
     
     @staticmethod
@@ -229,5 +225,5 @@ class FriendService:
             
             return {"success": True, "status": status}
         except Exception as e:
-            print(f"Get friendship status error: {e}")
+            logger.exception("Get friendship status failed")
             return {"success": False, "message": str(e), "status": "none"}
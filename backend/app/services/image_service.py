@@ -0,0 +1,364 @@
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import multiprocessing
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.config import Config
+from app.utils.concurrency import gather
+from app.utils.media_storage import get_media_storage
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional: without it lists link the originals
+    Image = ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+# data:image/png;base64,iVBORw0...
+_DATA_URL = re.compile(r'^data:([\w/+.-]+)?(;[\w=.-]+)*;base64,', re.I)
+
+# Formats we accept, recognised from the file's own bytes rather than the
+# type the client claims: (magic prefix check, content type, extension)
+_FORMATS = (
+    (lambda b: b.startswith(b'\xff\xd8\xff'), 'image/jpeg', 'jpg'),
+    (lambda b: b.startswith(b'\x89PNG\r\n\x1a\n'), 'image/png', 'png'),
+    (lambda b: b[:6] in (b'GIF87a', b'GIF89a'), 'image/gif', 'gif'),
+    (lambda b: b[:4] == b'RIFF' and b[8:12] == b'WEBP', 'image/webp', 'webp'),
+)
+
+
+# Resized WebP copies made of every stored image, by key prefix:
+# variant name -> longest edge in pixels. Smaller images are never enlarged.
+VARIANT_SIZES = {
+    'items': {'thumb': 256, 'card': 640, 'full': 1280},
+    'avatars': {'sm': 96, 'md': 192, 'lg': 512},
+}
+# Prefixes whose variants are centre-cropped to a square
+SQUARE_VARIANTS = {'avatars'}
+
+# items/<sha256>.jpg and its variants items/<sha256>_card.webp
+_STORED_KEY = re.compile(r'(?P<prefix>[a-z]+)/(?P<digest>[0-9a-f]{64})\.(?:jpg|png|gif|webp)$')
+_STORED_OR_VARIANT_KEY = re.compile(
+    r'(?P<prefix>[a-z]+)/(?P<digest>[0-9a-f]{64})(?:_[a-z]+\.webp|\.(?:jpg|png|gif|webp))$'
+)
+_VARIANT_KEY = re.compile(r'^(?P<prefix>[a-z]+)/(?P<digest>[0-9a-f]{64})_(?P<variant>[a-z]+)\.webp$')
+
+_executor = None
+_executor_lock = threading.Lock()
+# Decoding and resizing run in separate processes: under the gevent worker
+# a render in a thread would hold the GIL and stall every other request
+_process_pool = None
+
+# Which stored images have their variants written, so lists only link
+# variants that exist: '<prefix>/<digest>' -> True, or the monotonic time
+# after which a missing set is checked again
+_rendered = {}
+_rendered_lock = threading.Lock()
+# Images with a render queued on the pool, so each is only queued once
+_pending = set()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # Created lazily so forked gunicorn workers each get their own threads
+                _executor = ThreadPoolExecutor(max_workers=Config.MEDIA_VARIANT_WORKERS,
+                                               thread_name_prefix='image-variants')
+    return _executor
+
+
+def _get_process_pool():
+    global _process_pool
+    if _process_pool is None:
+        with _executor_lock:
+            if _process_pool is None:
+                # Spawned rather than forked: a fork of a gevent worker would
+                # copy its hub and half-patched threads into the child
+                _process_pool = ProcessPoolExecutor(max_workers=Config.MEDIA_VARIANT_WORKERS,
+                                                    mp_context=multiprocessing.get_context('spawn'))
+    return _process_pool
+
+
+def _reset_process_pool(pool):
+    """Drop a pool whose child died so the next render starts a new one."""
+    global _process_pool
+    with _executor_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False)
+
+
+def _encode_variants(prefix, data, sizes, quality):
+    """Resize image bytes to each {name: longest edge} in `sizes`.
+
+    Runs in the process pool, so it only touches bytes: returns
+    {name: WebP bytes} for the caller to write to storage.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        # JPEGs can decode straight to a reduced size, much cheaper for phone photos
+        largest = max(sizes.values())
+        source.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(source)
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    encoded = {}
+    for name, edge in sizes.items():
+        if prefix in SQUARE_VARIANTS:
+            side = min(edge, *image.size)
+            resized = ImageOps.fit(image, (side, side), Image.LANCZOS)
+        else:
+            resized = image.copy()
+            resized.thumbnail((edge, edge), Image.LANCZOS)
+        out = io.BytesIO()
+        resized.save(out, 'WEBP', quality=quality, method=4)
+        encoded[name] = out.getvalue()
+    return encoded
+
+
+def variants_enabled():
+    return Config.MEDIA_VARIANTS and Image is not None
+
+
+def variant_key(key, variant):
+    """items/<sha256>.png -> items/<sha256>_<variant>.webp"""
+    return f"{key.rsplit('.', 1)[0]}_{variant}.webp"
+
+
+def _image_id(key):
+    """items/<sha256>.png or items/<sha256>_card.webp -> items/<sha256>"""
+    match = _STORED_OR_VARIANT_KEY.search(key)
+    return f"{match.group('prefix')}/{match.group('digest')}" if match else None
+
+
+def _mark_rendered(image_id):
+    with _rendered_lock:
+        if len(_rendered) >= Config.MEDIA_VARIANT_CACHE_SIZE:
+            _rendered.clear()
+        _rendered[image_id] = True
+        _pending.discard(image_id)
+
+
+class InvalidImage(ValueError):
+    """An uploaded image could not be decoded or is not an allowed format."""
+
+
+def is_data_url(value):
+    return isinstance(value, str) and _DATA_URL.match(value) is not None
+
+
+class ImageService:
+    @staticmethod
+    def decode_data_url(data_url):
+        """Return (bytes, content_type, extension) for a base64 image data URL."""
+        match = _DATA_URL.match(data_url)
+        if not match:
+            raise InvalidImage("Images must be base64 data URLs")
+        try:
+            data = base64.b64decode(data_url[match.end():], validate=True)
+        except (binascii.Error, ValueError):
+            raise InvalidImage("Image data is not valid base64")
+
+        if len(data) > Config.MEDIA_MAX_BYTES:
+            raise InvalidImage(f"Images must be smaller than {Config.MEDIA_MAX_BYTES // (1024 * 1024)} MB")
+        for matches, content_type, extension in _FORMATS:
+            if matches(data):
+                return data, content_type, extension
+        raise InvalidImage("Unsupported image format. Use JPEG, PNG, GIF or WebP")
+
+    @staticmethod
+    def store_image(data_url, prefix='items'):
+        """Write one data URL image to media storage and return its public URL.
+
+        Objects are keyed by the SHA-256 of their bytes, so re-uploading the
+        same picture reuses the stored copy.
+        """
+        data, content_type, extension = ImageService.decode_data_url(data_url)
+        key = f"{prefix}/{hashlib.sha256(data).hexdigest()}.{extension}"
+        storage = get_media_storage()
+        storage.put(key, data, content_type)
+        if variants_enabled() and prefix in VARIANT_SIZES:
+            # Resizing takes far longer than the upload itself; lists link
+            # the original until the variants are written
+            ImageService._queue_render(key, data)
+        return storage.url(key)
+
+    @staticmethod
+    def store_images(images, prefix='items'):
+        """Replace every data URL in `images` with a stored image URL.
+
+        Entries that are already URLs (images kept while editing a listing)
+        are returned unchanged. Raises InvalidImage for bad uploads.
+        """
+        if images is None:
+            return []
+        if not isinstance(images, list):
+            raise InvalidImage("images must be a list")
+        return [
+            ImageService.store_image(image, prefix) if is_data_url(image) else image
+            for image in images
+        ]
+
+    @staticmethod
+    def render_variants(key, data):
+        """Write the WebP variants of the stored image `key` (bytes `data`).
+
+        Variants that already exist are skipped. Returns how many were written.
+        """
+        prefix = key.split('/', 1)[0]
+        sizes = VARIANT_SIZES.get(prefix, {})
+        storage = get_media_storage()
+        missing = {name: edge for name, edge in sizes.items() if not storage.exists(variant_key(key, name))}
+        if not missing:
+            _mark_rendered(_image_id(key))
+            return 0
+
+        pool = _get_process_pool()
+        try:
+            # Waiting on the future yields to other requests under gevent
+            encoded = pool.submit(_encode_variants, prefix, data, missing,
+                                  Config.MEDIA_VARIANT_QUALITY).result()
+        except BrokenProcessPool:
+            _reset_process_pool(pool)
+            raise
+
+        for name, edge in sorted(missing.items(), key=lambda entry: -entry[1]):
+            storage.put(variant_key(key, name), encoded[name], 'image/webp')
+        _mark_rendered(_image_id(key))
+        return len(missing)
+
+    @staticmethod
+    def _queue_render(key, data=None):
+        """Render the variants of `key` on the pool, reading it first when
+        `data` is not given. Does nothing if a render is already queued."""
+        image_id = _image_id(key)
+        with _rendered_lock:
+            if image_id in _pending:
+                return
+            _pending.add(image_id)
+        _get_executor().submit(ImageService._render_variants_quietly, key, data)
+
+    @staticmethod
+    def _render_variants_quietly(key, data=None):
+        try:
+            if data is None:
+                data = get_media_storage().read(key)
+            ImageService.render_variants(key, data)
+        except Exception:
+            logger.exception("Rendering variants for %s failed", key)
+        finally:
+            with _rendered_lock:
+                _pending.discard(_image_id(key))
+
+    @staticmethod
+    def variants_ready(image_id, original_key=None):
+        """Whether the variants of `image_id` ('items/<sha256>') are in storage.
+
+        Checked once per process and remembered; a missing set is checked
+        again after MEDIA_VARIANT_RECHECK seconds. When `original_key` is
+        known, a missing set is rendered in the background, which backfills
+        images uploaded before variants existed or whose render failed.
+        """
+        now = time.monotonic()
+        with _rendered_lock:
+            state = _rendered.get(image_id)
+        if state is True:
+            return True
+        if state is not None and now < state:
+            return False
+
+        prefix = image_id.split('/', 1)[0]
+        # Variants are written largest first, so the smallest one is the last
+        smallest = min(VARIANT_SIZES[prefix].items(), key=lambda entry: entry[1])[0]
+        if get_media_storage().exists(f"{image_id}_{smallest}.webp"):
+            _mark_rendered(image_id)
+            return True
+
+        with _rendered_lock:
+            if len(_rendered) >= Config.MEDIA_VARIANT_CACHE_SIZE:
+                _rendered.clear()
+            _rendered[image_id] = now + Config.MEDIA_VARIANT_RECHECK
+        if original_key:
+            ImageService._queue_render(original_key)
+        return False
+
+    @staticmethod
+    def variant_url(url, variant):
+        """URL of the `variant` rendition of a stored image URL.
+
+        `url` may itself be a variant. Anything that is not one of our
+        stored images (external links, legacy data URLs) is returned
+        unchanged, as is every URL when variants are turned off.
+        """
+        if not url or not variants_enabled() or not isinstance(url, str):
+            return url
+        match = _STORED_OR_VARIANT_KEY.search(url)
+        if not match or variant not in VARIANT_SIZES.get(match.group('prefix'), {}):
+            return url
+        image_id = f"{match.group('prefix')}/{match.group('digest')}"
+        # Until the variants are written (or if rendering failed) link the original
+        if not ImageService.variants_ready(image_id, ImageService.stored_key(url)):
+            return url
+        return f"{url[:match.start()]}{image_id}_{variant}.webp"
+
+    @staticmethod
+    def avatar_url(url, size='sm'):
+        """A square avatar rendition: sm for lists and cards, md/lg for profiles."""
+        return ImageService.variant_url(url, size)
+
+    @staticmethod
+    def cover_url(images, variant):
+        """The `variant` of a listing's first image, or None without images."""
+        if not isinstance(images, list) or not images:
+            return None
+        return ImageService.variant_url(images[0], variant)
+
+    @staticmethod
+    def add_thumbnails(items, variant='card'):
+        """Give every listing a `thumbnail` sized for a feed card.
+
+        `images` keeps the originals for the detail view.
+        """
+        if variants_enabled():
+            # Look up unchecked images together rather than one per card
+            covers = {item['images'][0] for item in items if isinstance(item.get('images'), list) and item['images']}
+            unchecked = {}
+            for url in covers:
+                key = ImageService.stored_key(url)
+                image_id = _image_id(key) if key else None
+                if image_id and image_id.split('/', 1)[0] in VARIANT_SIZES and _rendered.get(image_id) is not True:
+                    unchecked[image_id] = key
+            gather(*[
+                (lambda image_id=image_id, key=key: ImageService.variants_ready(image_id, key))
+                for image_id, key in unchecked.items()
+            ])
+        for item in items:
+            item['thumbnail'] = ImageService.cover_url(item.get('images'), variant)
+        return items
+
+    @staticmethod
+    def variant_source(key):
+        """For a variant key that is not rendered yet, the stored original's key."""
+        match = _VARIANT_KEY.match(key)
+        if not match:
+            return None
+        storage = get_media_storage()
+        for extension in ('jpg', 'png', 'gif', 'webp'):
+            original = f"{match.group('prefix')}/{match.group('digest')}.{extension}"
+            if storage.exists(original):
+                return original
+        return None
+
+    @staticmethod
+    def stored_key(url):
+        """The storage key behind one of our image URLs, or None."""
+        match = _STORED_KEY.search(url) if isinstance(url, str) else None
+        return match.group(0) if match else None
@@ -1,4 +1,24 @@
+import logging
+
+from app.config import Config
 from app.extensions import get_supabase
+from app.services.image_service import ImageService, InvalidImage
+from app.utils.feed_cache import invalidate_feeds
+from app.utils.fields import FieldSet, InvalidFields
+from app.utils.pagination import InvalidCursor, clamp_page_size, paginate
+
+logger = logging.getLogger(__name__)
+
+# ?fields= for /items/user/me. The listing cards need only the default;
+# the edit form asks for description, notes and images.
+USER_ITEM_FIELDS = FieldSet(
+    allowed=('seller_id', 'title', 'description', 'notes', 'price', 'category', 'subcategory', 'condition',
+             'size', 'images', 'status', 'is_sold', 'view_count', 'updated_at'),
+    default=('title', 'price', 'category', 'subcategory', 'condition', 'size', 'status', 'view_count',
+             'thumbnail'),
+    required=('id', 'created_at'),
+    computed={'thumbnail': ('images',)},
+)
 
 class ItemService:
     @staticmethod
@@ -28,39 +48,57 @@ class ItemService:
                 "description": data.get("description"),
                 "notes": data.get("notes"),
                 "size": data.get("size"),
-                "images": data.get("images", []),
+                # Uploaded data URLs go to media storage; the row keeps short URLs
+                "images": ImageService.store_images(data.get("images", [])),
                 "seller_id": user_id
             }
 
             response = supabase.table('items').insert(item_payload).execute()
+            invalidate_feeds('marketplace')
             return {"success": True, "data": response.data}, 201
         
+        except InvalidImage as e:
+            return {"success": False, "message": str(e)}, 400
         except Exception as e:
-            print("Exception in Service: ", e)
+            logger.exception("Create item failed")
             return {"success": False, "message": str(e)}, 500
     
     @staticmethod
-    def get_user_items(user_id):
+    def get_user_items(user_id, limit=None, cursor=None, fields=None):
+        """Get the user's own listings, newest first.
+
+        With `limit` and/or `cursor` the result is keyset paginated and
+        includes a `next_cursor`; otherwise every listing is returned.
+        `fields` is the raw `?fields=` value (see USER_ITEM_FIELDS).
+        """
         supabase = get_supabase()
 
         try:
-            print(f"--- SERVICE: Fetching items for user: {user_id} ---")
-            
+            projection = USER_ITEM_FIELDS.resolve(fields)
+
             # Get all items where seller_id matches the user_id
-            response = supabase.table('items').select('*').eq('seller_id', user_id).execute()
-            
-            print(f"--- SERVICE: Query executed, found {len(response.data) if response.data else 0} items ---")
-            print(f"--- SERVICE: Response data: {response.data} ---")
-            
+            query = supabase.table('items').select(projection.columns).eq('seller_id', user_id)
+
+            next_cursor = None
+            if limit or cursor:
+                page_size = clamp_page_size(limit, Config.FEED_PAGE_SIZE, Config.FEED_MAX_PAGE_SIZE)
+                items, next_cursor = paginate(query, cursor, page_size)
+            else:
+                response = query.order('created_at', desc=True).order('id', desc=True).execute()
+                items = response.data
+
             # Return empty array if no data, not None
-            items = response.data if response.data else []
+            items = items if items else []
+            if 'thumbnail' in projection:
+                ImageService.add_thumbnails(items)
+            projection.trim(items)
             
-            return {"success": True, "data": items}, 200
+            return {"success": True, "data": items, "next_cursor": next_cursor}, 200
         
+        except (InvalidCursor, InvalidFields) as e:
+            return {"success": False, "message": str(e)}, 400
         except Exception as e:
-            print(f"--- EXCEPTION in get_user_items: {e} ---")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Get items for user %s failed", user_id)
             return {"success": False, "message": str(e)}, 500
 
     @staticmethod
@@ -68,27 +106,20 @@ class ItemService:
         supabase = get_supabase()
 
         try:
-            print(f"--- DELETE SERVICE: Attempting to delete item {item_id} for user {user_id} ---")
-            
             # First check if item exists and belongs to user
-            check_response = supabase.table('items').select('*').eq('id', item_id).eq('seller_id', user_id).execute()
-            print(f"--- DELETE SERVICE: Check response data: {check_response.data} ---")
+            check_response = supabase.table('items').select('id').eq('id', item_id).eq('seller_id', user_id).execute()
             
             if not check_response.data or len(check_response.data) == 0:
-                print("--- DELETE SERVICE: Item not found or no permission ---")
                 return {"success": False, "message": "Item not found or you don't have permission to delete it"}, 404
             
             # Delete the item
-            print(f"--- DELETE SERVICE: Proceeding with delete ---")
             response = supabase.table('items').delete().eq('id', item_id).execute()
-            print(f"--- DELETE SERVICE: Delete response: {response.data} ---")
+            invalidate_feeds('marketplace')
             
             return {"success": True, "message": "Item deleted successfully"}, 200
         
         except Exception as e:
-            print(f"--- DELETE SERVICE EXCEPTION: {e} ---")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Delete item %s failed", item_id)
             return {"success": False, "message": str(e)}, 500
     
     @staticmethod
@@ -96,9 +127,6 @@ class ItemService:
         supabase = get_supabase()
 
         try:
-            print(f"--- UPDATE SERVICE: Attempting to update item {item_id} for user {user_id} ---")
-            print(f"--- UPDATE SERVICE: Data received: {data} ---")
-            
             # Remove fields that shouldn't be updated
             if 'id' in data: del data['id']
             if 'seller_id' in data: del data['seller_id']
@@ -108,28 +136,26 @@ class ItemService:
             
             # Allow updating: title, category, subcategory, price, condition, description, notes, size, images
 
-            print(f"--- UPDATE SERVICE: Data after cleanup: {data} ---")
-
             # Check if item exists and belongs to user
-            check_response = supabase.table('items').select('*').eq('id', item_id).eq('seller_id', user_id).execute()
-            print(f"--- UPDATE SERVICE: Check response: {check_response.data} ---")
+            check_response = supabase.table('items').select('id').eq('id', item_id).eq('seller_id', user_id).execute()
 
             if not check_response.data or len(check_response.data) == 0:
-                print("--- UPDATE SERVICE: Item not found or no permission ---")
                 return {"success": False, "message": "Item not found or you don't have permission"}, 404
+
+            if 'images' in data:
+                data['images'] = ImageService.store_images(data['images'])
             
             # Update the item and return the updated data
-            print(f"--- UPDATE SERVICE: Proceeding with update ---")
             response = supabase.table('items').update(data).eq('id', item_id).execute()
-            print(f"--- UPDATE SERVICE: Update response: {response.data} ---")
+            invalidate_feeds('marketplace')
             
             # Return the updated item data
             return {"success": True, "message": "Item updated successfully", "data": response.data[0] if response.data else None}, 200
             
+        except InvalidImage as e:
+            return {"success": False, "message": str(e)}, 400
         except Exception as e:
-            print(f"--- UPDATE SERVICE EXCEPTION: {e} ---")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Update item %s failed", item_id)
             return {"success": False, "message": str(e)}, 500
     
 
@@ -138,25 +164,18 @@ class ItemService:
         supabase = get_supabase()
 
         try:
-            print(f"--- MARK AS SOLD SERVICE: Attempting to mark item {item_id} as sold for user {user_id} ---")
-            
             # Check if item exists and belongs to user
-            check_response = supabase.table('items').select('*').eq('id', item_id).eq('seller_id', user_id).execute()
-            print(f"--- MARK AS SOLD SERVICE: Check response: {check_response.data} ---")
+            check_response = supabase.table('items').select('id').eq('id', item_id).eq('seller_id', user_id).execute()
 
             if not check_response.data or len(check_response.data) == 0:
-                print("--- MARK AS SOLD SERVICE: Item not found or no permission ---")
                 return {"success": False, "message": "Item not found or you don't have permission"}, 404
             
             # Update item status to 'sold'
-            print(f"--- MARK AS SOLD SERVICE: Proceeding with status update ---")
             response = supabase.table('items').update({"status": "sold"}).eq('id', item_id).execute()
-            print(f"--- MARK AS SOLD SERVICE: Update response: {response.data} ---")
+            invalidate_feeds('marketplace')
             
             return {"success": True, "message": "Item marked as sold successfully", "data": response.data[0] if response.data else None}, 200
             
         except Exception as e:
-            print(f"--- MARK AS SOLD SERVICE EXCEPTION: {e} ---")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Mark item %s as sold failed", item_id)
             return {"success": False, "message": str(e)}, 500
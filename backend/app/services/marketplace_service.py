@@ -1,38 +1,168 @@
+import logging
+import json
+
+from app.config import Config
 from app.extensions import get_supabase
+from app.services.image_service import ImageService
+from app.services.profile_card_service import hydrate_users
+from app.utils.concurrency import gather
+from app.utils.feed_cache import get_feed_cache
+from app.utils.fields import FieldSet, InvalidFields
+from app.utils.pagination import InvalidCursor, clamp_page_size, paginate
+
+logger = logging.getLogger(__name__)
+
+# Page size used when a client asks for neither `limit` nor `cursor`
+LEGACY_FEED_SIZE = 100
+
+# ?fields= for the feed and search. Cards render the default; the detail
+# view and the client-side filter also ask for description and images.
+# price is required because search can sort (and so paginate) on it.
+ITEM_FEED_FIELDS = FieldSet(
+    allowed=('title', 'description', 'price', 'category', 'subcategory', 'condition', 'images', 'status',
+             'size', 'view_count'),
+    default=('title', 'price', 'category', 'subcategory', 'condition', 'status', 'size', 'thumbnail'),
+    required=('id', 'created_at', 'price', 'seller_id'),
+    computed={'thumbnail': ('images',)},
+)
+
+# sort option -> (keyset column, descending)
+SEARCH_SORTS = {
+    'newest': ('created_at', True),
+    'oldest': ('created_at', False),
+    'price_asc': ('price', False),
+    'price_desc': ('price', True),
+}
 
 class MarketPlaceService:
 
     @staticmethod
-    def get_marketplace_item():
+    def get_marketplace_item(limit=None, cursor=None, fields=None):
+        """Get active listings, newest first.
+
+        Passing `limit` and/or `cursor` switches to keyset pagination: the
+        response carries a `next_cursor` to send back for the following page
+        (None on the last page). Without them the newest 100 items are
+        returned as before. `fields` is the raw `?fields=` value (see
+        ITEM_FEED_FIELDS).
+        """
         supabase = get_supabase()
         try:
-            active_listing = supabase.table('items')\
-                .select('id, title, description, price, category, subcategory, condition, images, status, size, created_at, seller_id')\
-                .eq('status', 'active')\
-                .order('created_at', desc=True)\
-                .limit(100)\
-                .execute()
-
-            # Fetch user data for each item
-            if active_listing.data:
-                for item in active_listing.data:
-                    try:
-                        user_data = supabase.table('users').select('first_name, last_name, profile_picture').eq('id', item['seller_id']).single().execute()
-                        if user_data.data:
-                            item['seller_first_name'] = user_data.data.get('first_name', 'Unknown')
-                            item['seller_last_name'] = user_data.data.get('last_name', 'User')
-                            item['seller_profile_picture'] = user_data.data.get('profile_picture')
-                        else:
-                            item['seller_first_name'] = 'Unknown'
-                            item['seller_last_name'] = 'User'
-                            item['seller_profile_picture'] = None
-                    except Exception as e:
-                        print(f"Error fetching user data for seller {item['seller_id']}: {e}")
-                        item['seller_first_name'] = 'Unknown'
-                        item['seller_last_name'] = 'User'
-                        item['seller_profile_picture'] = None
-
-            return {"success": True, "data": active_listing.data}, 200
+            projection = ITEM_FEED_FIELDS.resolve(fields)
+            if limit or cursor:
+                page_size = clamp_page_size(limit, Config.FEED_PAGE_SIZE, Config.FEED_MAX_PAGE_SIZE)
+            else:
+                page_size = LEGACY_FEED_SIZE
+
+            def build():
+                query = supabase.table('items')\
+                    .select(projection.columns)\
+                    .eq('status', 'active')
+
+                items, next_cursor = paginate(query, cursor, page_size)
+
+                # Resolve every seller in one batched query instead of one per item
+                hydrate_users(items, 'seller_id', 'seller')
+                if 'thumbnail' in projection:
+                    ImageService.add_thumbnails(items)
+                projection.trim(items)
+
+                return {"success": True, "data": items, "next_cursor": next_cursor}
+
+            # Same for every visitor, so pages are shared through the feed cache
+            return get_feed_cache().get_or_build('marketplace', f"feed:{page_size}:{cursor}:{projection.key}", build), 200
+        except (InvalidCursor, InvalidFields) as e:
+            return {"success": False, "message": str(e)}, 400
+        except Exception as e:
+            logger.exception("Get marketplace items failed")
+            return ({"success": False, "message": str(e)}), 500
+
+    @staticmethod
+    def search_items(q=None, category=None, subcategory=None, condition=None, size=None,
+                     min_price=None, max_price=None, sort='newest', limit=None, cursor=None,
+                     include_facets=True, fields=None):
+        """Search active listings with filters, a sort order and facet counts.
+
+        `q` is matched against title and description with Postgres full-text
+        search (web-search syntax: quotes, `or`, `-word`). Results are keyset
+        paginated by the chosen sort; keep the same filters and `sort` when
+        following `next_cursor`. Facet counts come from `marketplace_facets`
+        (datas/create_marketplace_search.sql). `fields` picks the item
+        fields as in get_marketplace_item.
+        """
+        try:
+            if sort not in SEARCH_SORTS:
+                return {"success": False, "message": f"Invalid sort. Use one of: {', '.join(SEARCH_SORTS)}"}, 400
+            if min_price is not None and max_price is not None and min_price > max_price:
+                return {"success": False, "message": "min_price cannot be greater than max_price"}, 400
+
+            q = (q or '').strip() or None
+            page_size = clamp_page_size(limit, Config.FEED_PAGE_SIZE, Config.FEED_MAX_PAGE_SIZE)
+            sort_column, desc = SEARCH_SORTS[sort]
+            projection = ITEM_FEED_FIELDS.resolve(fields)
+
+            def build():
+                return MarketPlaceService._run_search(
+                    q, category, subcategory, condition, size, min_price, max_price,
+                    sort_column, desc, page_size, cursor, include_facets, projection
+                )
+
+            variant = json.dumps([q, category, subcategory, condition, size, min_price, max_price,
+                                  sort, page_size, cursor, include_facets, projection.key])
+            return get_feed_cache().get_or_build('marketplace', f"search:{variant}", build), 200
+        except (InvalidCursor, InvalidFields) as e:
+            return {"success": False, "message": str(e)}, 400
         except Exception as e:
-            print(f"Service Error: {e}") 
-            return ({"success": False, "message": str(e)}), 500
\ No newline at end of file
+            logger.exception("Search items failed")
+            return {"success": False, "message": str(e)}, 500
+
+    @staticmethod
+    def _run_search(q, category, subcategory, condition, size, min_price, max_price,
+                    sort_column, desc, page_size, cursor, include_facets, projection):
+        supabase = get_supabase()
+
+        query = supabase.table('items')\
+            .select(projection.columns)\
+            .eq('status', 'active')
+
+        if q:
+            query = query.text_search('search_vector', q, options={'config': 'english', 'type': 'websearch'})
+        if category:
+            query = query.eq('category', category)
+        if subcategory:
+            query = query.eq('subcategory', subcategory)
+        if condition:
+            query = query.eq('condition', condition)
+        if size:
+            query = query.eq('size', size)
+        if min_price is not None:
+            query = query.gte('price', min_price)
+        if max_price is not None:
+            query = query.lte('price', max_price)
+
+        def page():
+            items, next_cursor = paginate(query, cursor, page_size, sort_column, desc)
+            hydrate_users(items, 'seller_id', 'seller')
+            if 'thumbnail' in projection:
+                ImageService.add_thumbnails(items)
+            projection.trim(items)
+            return {"success": True, "data": items, "next_cursor": next_cursor}
+
+        if not include_facets:
+            return page()
+
+        def facets():
+            return supabase.rpc('marketplace_facets', {
+                'q': q,
+                'p_category': category or None,
+                'p_subcategory': subcategory or None,
+                'p_condition': condition or None,
+                'p_size': size or None,
+                'p_min_price': min_price,
+                'p_max_price': max_price
+            }).execute().data
+
+        # The facet counts don't depend on the page: run both at once
+        result, facet_counts = gather(page, facets)
+        result["facets"] = facet_counts
+        return result
@@ -1,6 +1,19 @@
+import logging
 from app.extensions import get_supabase
+from app.services.image_service import ImageService
+from app.services.reputation_service import (
+    BUYER_CANCELLATION_PENALTY,
+    COMPLETION_REWARD,
+    SELLER_CANCELLATION_PENALTY,
+    ReputationService
+)
+from app.services.user_service import UserService
+from app.services.profile_card_service import get_profile_cards, hydrate_users
+from app.utils.concurrency import gather
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 class MeetupService:
     
     @staticmethod
@@ -24,7 +37,7 @@ class MeetupService:
             response = supabase.table('meetups').insert(meetup_payload).execute()
             return {"success": True, "data": response.data}, 201
         except Exception as e:
-            print(f"Create Meetup Error: {e}")
+            logger.exception("Create meetup failed")
             return {"success": False, "message": str(e)}, 500
     
     @staticmethod
@@ -34,51 +47,42 @@ class MeetupService:
             # Get meetups where user is either seller or buyer
             meetups = supabase.table('meetups').select('*').or_(f'seller_id.eq.{user_id},buyer_id.eq.{user_id}').order('scheduled_date', desc=False).execute()
             
-            # Fetch user data and item data for each meetup
+            # Fetch user data and item data for all meetups at once
             if meetups.data:
-                for meetup in meetups.data:
-                    # Fetch seller info
-                    try:
-                        seller_data = supabase.table('users').select('first_name, last_name, email, profile_picture').eq('id', meetup['seller_id']).single().execute()
-                        if seller_data.data:
-                            meetup['seller_first_name'] = seller_data.data.get('first_name', 'Unknown')
-                            meetup['seller_last_name'] = seller_data.data.get('last_name', 'User')
-                            meetup['seller_email'] = seller_data.data.get('email', '')
-                            meetup['seller_profile_picture'] = seller_data.data.get('profile_picture')
-                    except Exception as e:
-                        print(f"Error fetching seller data: {e}")
-                        meetup['seller_first_name'] = 'Unknown'
-                        meetup['seller_last_name'] = 'User'
-                        meetup['seller_profile_picture'] = None
-                    
-                    # Fetch buyer info
-                    try:
-                        buyer_data = supabase.table('users').select('first_name, last_name, email, profile_picture').eq('id', meetup['buyer_id']).single().execute()
-                        if buyer_data.data:
-                            meetup['buyer_first_name'] = buyer_data.data.get('first_name', 'Unknown')
-                            meetup['buyer_last_name'] = buyer_data.data.get('last_name', 'User')
-                            meetup['buyer_email'] = buyer_data.data.get('email', '')
-                            meetup['buyer_profile_picture'] = buyer_data.data.get('profile_picture')
-                    except Exception as e:
-                        print(f"Error fetching buyer data: {e}")
-                        meetup['buyer_first_name'] = 'Unknown'
-                        meetup['buyer_last_name'] = 'User'
-                        meetup['buyer_profile_picture'] = None
-                    
-                    # Fetch item info
+                participant_fields = ('first_name', 'last_name', 'email', 'profile_picture')
+                try:
+                    participants = get_profile_cards(
+                        [m['seller_id'] for m in meetups.data] + [m['buyer_id'] for m in meetups.data]
+                    )
+                except Exception as e:
+                    logger.exception("Fetching participant data failed")
+                    participants = {}
+                hydrate_users(meetups.data, 'seller_id', 'seller', participant_fields, users=participants)
+                hydrate_users(meetups.data, 'buyer_id', 'buyer', participant_fields, users=participants)
+
+                # Fetch item info
+                items = {}
+                item_ids = list({m['item_id'] for m in meetups.data if m.get('item_id')})
+                if item_ids:
                     try:
-                        item_data = supabase.table('items').select('title, price, images').eq('id', meetup['item_id']).single().execute()
-                        if item_data.data:
-                            meetup['item_title'] = item_data.data.get('title', 'Unknown Item')
-                            meetup['item_price'] = item_data.data.get('price', 0)
-                            meetup['item_images'] = item_data.data.get('images', [])
+                        item_data = supabase.table('items').select('id, title, price, images').in_('id', item_ids).execute()
+                        items = {item['id']: item for item in (item_data.data or [])}
                     except Exception as e:
-                        print(f"Error fetching item data: {e}")
+                        logger.exception("Fetching item data failed")
+
+                for meetup in meetups.data:
+                    item = items.get(meetup.get('item_id'))
+                    if item:
+                        meetup['item_title'] = item.get('title', 'Unknown Item')
+                        meetup['item_price'] = item.get('price', 0)
+                        meetup['item_images'] = item.get('images', [])
+                        meetup['item_thumbnail'] = ImageService.cover_url(item.get('images'), 'thumb')
+                    else:
                         meetup['item_title'] = 'Unknown Item'
             
             return {"success": True, "data": meetups.data}, 200
         except Exception as e:
-            print(f"Get Meetups Error: {e}")
+            logger.exception("Get meetups failed")
             return {"success": False, "message": str(e)}, 500
     
     @staticmethod
@@ -94,7 +98,7 @@ class MeetupService:
             response = supabase.table('meetups').update({"status": "confirmed"}).eq('id', meetup_id).execute()
             return {"success": True, "data": response.data}, 200
         except Exception as e:
-            print(f"Accept Meetup Error: {e}")
+            logger.exception("Accept meetup failed")
             return {"success": False, "message": str(e)}, 500
     
     @staticmethod
@@ -119,7 +123,7 @@ class MeetupService:
             
             return {"success": True, "data": response.data}, 200
         except Exception as e:
-            print(f"Decline Meetup Error: {e}")
+            logger.exception("Decline meetup failed")
             return {"success": False, "message": str(e)}, 500
     
     @staticmethod
@@ -147,7 +151,7 @@ class MeetupService:
             
             return {"success": True, "data": response.data}, 200
         except Exception as e:
-            print(f"Complete Meetup Error: {e}")
+            logger.exception("Complete meetup failed")
             return {"success": False, "message": str(e)}, 500
     
     @staticmethod
@@ -182,7 +186,7 @@ class MeetupService:
             
             return {"success": True, "data": response.data}, 200
         except Exception as e:
-            print(f"Cancel Meetup Error: {e}")
+            logger.exception("Cancel meetup failed")
             return {"success": False, "message": str(e)}, 500
     
     @staticmethod
@@ -207,80 +211,80 @@ class MeetupService:
             response = supabase.table('meetups').update(update_data).eq('id', meetup_id).execute()
             return {"success": True, "data": response.data}, 200
         except Exception as e:
-            print(f"Reschedule Meetup Error: {e}")
+            logger.exception("Reschedule meetup failed")
             return {"success": False, "message": str(e)}, 500
     
     @staticmethod
     def _apply_cancellation_penalty(user_id, meetup_id, user_type):
         """Apply reputation penalty for cancelling meetup"""
-        supabase = get_supabase()
         try:
-            # Determine penalty based on user type
             # Seller penalty: -3, Buyer penalty: -1
             if user_type == 'seller':
-                penalty = -3
+                penalty = SELLER_CANCELLATION_PENALTY
                 reason = "Meetup cancelled by seller"
             else:
-                penalty = -1
+                penalty = BUYER_CANCELLATION_PENALTY
                 reason = "Meetup cancelled by buyer"
             
-            # Update user reputation
-            user_data = supabase.table('users').select('reputation_score').eq('id', user_id).single().execute()
-            current_score = user_data.data.get('reputation_score', 0) if user_data.data else 0
-            new_score = max(0, current_score + penalty)  # Don't go below 0
-            
-            supabase.table('users').update({"reputation_score": new_score}).eq('id', user_id).execute()
-            
-            # Log reputation change
-            supabase.table('reputation_history').insert({
-                "user_id": user_id,
-                "meetup_id": meetup_id,
-                "change_amount": penalty,
-                "reason": reason
-            }).execute()
+            ReputationService.apply_changes([
+                ReputationService.change(
+                    user_id, penalty, reason, meetup_id,
+                    ReputationService.meetup_key(meetup_id, 'cancelled', user_type)
+                )
+            ])
         except Exception as e:
-            print(f"Error applying cancellation penalty: {e}")
+            logger.exception("Applying cancellation penalty failed")
     
     @staticmethod
     def _apply_completion_reward(seller_id, buyer_id, meetup_id):
         """Apply reputation reward for completing meetup"""
-        supabase = get_supabase()
         try:
-            # Both seller and buyer get +5 for completing transaction
-            rewards = [
-                (seller_id, 5, "Transaction completed as seller"),
-                (buyer_id, 5, "Transaction completed as buyer")
-            ]
-            
-            for user_id, reward, reason in rewards:
-                # Update user reputation
-                user_data = supabase.table('users').select('reputation_score').eq('id', user_id).single().execute()
-                current_score = user_data.data.get('reputation_score', 0) if user_data.data else 0
-                new_score = current_score + reward
-                
-                supabase.table('users').update({"reputation_score": new_score}).eq('id', user_id).execute()
-                
-                # Log reputation change
-                supabase.table('reputation_history').insert({
-                    "user_id": user_id,
-                    "meetup_id": meetup_id,
-                    "change_amount": reward,
-                    "reason": reason
-                }).execute()
+            # Both seller and buyer get +5 for completing transaction,
+            # credited together in one atomic call
+            ReputationService.apply_changes([
+                ReputationService.change(
+                    seller_id, COMPLETION_REWARD, "Transaction completed as seller", meetup_id,
+                    ReputationService.meetup_key(meetup_id, 'completed', 'seller')
+                ),
+                ReputationService.change(
+                    buyer_id, COMPLETION_REWARD, "Transaction completed as buyer", meetup_id,
+                    ReputationService.meetup_key(meetup_id, 'completed', 'buyer')
+                )
+            ])
         except Exception as e:
-            print(f"Error applying completion reward: {e}")
+            logger.exception("Applying completion reward failed")
     
     @staticmethod
-    def search_users(query):
+    def search_users(query, user_id=None, course=None, year=None, include_facets=False):
         """Search users by name or email for buyer selection"""
-        supabase = get_supabase()
         try:
-            # Search by first name, last name, or email
-            users = supabase.table('users').select('id, first_name, last_name, email').or_(
-                f'first_name.ilike.%{query}%,last_name.ilike.%{query}%,email.ilike.%{query}%'
-            ).limit(10).execute()
+            # Ranked, index-backed typeahead (see UserService.rank_users);
+            # facet counts are a separate query and run alongside it
+            facets = None
+            if include_facets:
+                matches, facets = gather(
+                    lambda: UserService.rank_users(query, course, year, exclude_id=user_id, limit=10),
+                    lambda: UserService.user_facets(query, course, year, user_id)
+                )
+            else:
+                matches = UserService.rank_users(query, course, year, exclude_id=user_id, limit=10)
+            users = [
+                {
+                    'id': user['id'],
+                    'first_name': user['first_name'],
+                    'last_name': user['last_name'],
+                    'email': user['email'],
+                    'course': user['course'],
+                    'current_year': user['current_year']
+                }
+                for user in matches
+            ]
+            
+            result = {"success": True, "data": users}
+            if include_facets:
+                result["facets"] = facets
             
-            return {"success": True, "data": users.data}, 200
+            return result, 200
         except Exception as e:
-            print(f"Search Users Error: {e}")
+            logger.exception("Search users failed")
             return {"success": False, "message": str(e)}, 500
@@ -1,15 +1,57 @@
+import logging
+import json
+import threading
+import time
 import uuid
 from datetime import datetime
 from typing import List, Dict
+from app.config import Config
 from app.extensions import get_supabase
+from app.services.profile_card_service import format_full_name, get_profile_cards
+from app.utils.concurrency import gather
+from app.utils.dispatcher import BatchDispatcher
+from app.utils.events import get_broker, publish_event
+
+logger = logging.getLogger(__name__)
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_notification_dispatcher() -> BatchDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = BatchDispatcher(
+                    NotificationService.write_notifications,
+                    name='notification-dispatcher',
+                    maxsize=Config.NOTIFY_QUEUE_SIZE,
+                    batch_size=Config.NOTIFY_BATCH_SIZE,
+                    flush_interval=Config.NOTIFY_FLUSH_INTERVAL
+                )
+    return _dispatcher
+
 
 class NotificationService:
     @staticmethod
-    def create_notification(user_id: str, notif_type: str, message: str, related_id: str = None, title: str = None) -> Dict:
-        """Create a notification"""
-        supabase = get_supabase()
-        
+    def create_notification(user_id: str, notif_type: str, message: str, related_id: str = None, title: str = None, actor_id: str = None, params: Dict = None) -> Dict:
+        """Create a notification.
+
+        With `actor_id` or `params`, `message` is a str.format template:
+        `{actor_name}` becomes `actor_id`'s full name at write time and the
+        other fields come from `params`. User-supplied text (item titles,
+        post titles) must go in `params`, never in the template itself.
+
+        The row is queued for the background dispatcher and written in a
+        batch shortly after, so the result only says it was accepted:
+        `queued` is True until then. With NOTIFY_ASYNC off it is written
+        before returning and `queued` is False.
+        """
         try:
+            if actor_id is None and params:
+                message = message.format_map(params)
+                params = None
             notification_id = str(uuid.uuid4())
             notification_data = {
                 'id': notification_id,
@@ -19,14 +61,44 @@ class NotificationService:
                 'related_id': related_id,
                 'is_read': False
             }
+            job = (notification_data, actor_id, params)
             
-            supabase.table('notifications').insert(notification_data).execute()
+            if Config.NOTIFY_ASYNC:
+                get_notification_dispatcher().submit(job)
+            else:
+                NotificationService.write_notifications([job])
             
-            return {"success": True, "notification_id": notification_id}
+            return {"success": True, "queued": Config.NOTIFY_ASYNC, "notification_id": notification_id}
         except Exception as e:
-            print(f"Create notification error: {e}")
+            logger.exception("Create notification failed")
             return {"success": False, "message": str(e)}
     
+    @staticmethod
+    def write_notifications(jobs: List) -> None:
+        """Insert (notification row, actor id, template params) jobs with one
+        query and push them to the recipients' open streams. Raises on
+        failure so the dispatcher can retry the rows one by one."""
+        supabase = get_supabase()
+        
+        actors = get_profile_cards(actor_id for _, actor_id, _ in jobs if actor_id)
+        rows = []
+        for row, actor_id, params in jobs:
+            if actor_id is not None:
+                # One format pass: text inside the params is never re-scanned
+                name = format_full_name(actors.get(actor_id))
+                row = {**row, 'message': row['message'].format_map({**(params or {}), 'actor_name': name})}
+            rows.append(row)
+        
+        response = supabase.table('notifications').insert(rows).execute()
+        
+        for row in response.data or rows:
+            publish_event(row['user_id'], 'notification', NotificationService._format_notification(row))
+    
+    @staticmethod
+    def dispatcher_stats() -> Dict:
+        """Queue depth and throughput of the background notification writer"""
+        return get_notification_dispatcher().stats()
+    
     @staticmethod
     def get_notifications(user_id: str) -> Dict:
         """Get all notifications for a user"""
@@ -35,53 +107,106 @@ class NotificationService:
         try:
             response = supabase.table('notifications').select('*').eq('user_id', user_id).order('created_at', desc=True).limit(50).execute()
             
-            notifications = []
-            for notif in response.data:
-                # Format time
-                created_at = datetime.fromisoformat(notif['created_at'].replace('Z', '+00:00'))
-                now = datetime.now(created_at.tzinfo)
-                diff = now - created_at
-                
-                if diff.total_seconds() < 60:
-                    time_str = 'Just now'
-                elif diff.total_seconds() < 3600:
-                    time_str = f'{int(diff.total_seconds() / 60)}m ago'
-                elif diff.total_seconds() < 86400:
-                    time_str = f'{int(diff.total_seconds() / 3600)}h ago'
-                else:
-                    time_str = f'{int(diff.total_seconds() / 86400)}d ago'
-                
-                # Determine link based on type
-                link = '#'
-                if notif['type'] == 'offer':
-                    link = '/offers'
-                elif notif['type'] == 'message':
-                    link = '/messages'
-                elif notif['type'] == 'meetup':
-                    link = '/meetup-scheduler'
-                elif notif['type'] == 'friend_request':
-                    link = '/friend-requests'
-                elif notif['type'] == 'board_post':
-                    link = '/request-board'
-                
-                notifications.append({
-                    'id': notif['id'],
-                    'type': notif['type'],
-                    'title': notif['message'].split(':')[0] if ':' in notif['message'] else 'Notification',
-                    'message': notif['message'],
-                    'time': time_str,
-                    'read': notif['is_read'],
-                    'link': link
-                })
+            notifications = [NotificationService._format_notification(notif) for notif in response.data]
             
             return {
                 "success": True,
                 "notifications": notifications
             }
         except Exception as e:
-            print(f"Get notifications error: {e}")
+            logger.exception("Get notifications failed")
             return {"success": False, "message": str(e), "notifications": []}
     
+    @staticmethod
+    def _format_notification(notif: Dict) -> Dict:
+        """Shape a notifications row the way the frontend displays it"""
+        # Format time (rows that were just inserted may not carry created_at)
+        time_str = 'Just now'
+        if notif.get('created_at'):
+            created_at = datetime.fromisoformat(notif['created_at'].replace('Z', '+00:00'))
+            now = datetime.now(created_at.tzinfo)
+            diff = now - created_at
+            
+            if diff.total_seconds() < 60:
+                time_str = 'Just now'
+            elif diff.total_seconds() < 3600:
+                time_str = f'{int(diff.total_seconds() / 60)}m ago'
+            elif diff.total_seconds() < 86400:
+                time_str = f'{int(diff.total_seconds() / 3600)}h ago'
+            else:
+                time_str = f'{int(diff.total_seconds() / 86400)}d ago'
+        
+        # Determine link based on type
+        link = '#'
+        if notif['type'] == 'offer':
+            link = '/offers'
+        elif notif['type'] == 'message':
+            link = '/messages'
+        elif notif['type'] == 'meetup':
+            link = '/meetup-scheduler'
+        elif notif['type'] == 'friend_request':
+            link = '/friend-requests'
+        elif notif['type'] == 'board_post':
+            link = '/request-board'
+        
+        return {
+            'id': notif['id'],
+            'type': notif['type'],
+            'title': notif['message'].split(':')[0] if ':' in notif['message'] else 'Notification',
+            'message': notif['message'],
+            'time': time_str,
+            'read': notif['is_read'],
+            'link': link
+        }
+    
+    @staticmethod
+    def get_unread_counts(user_id: str) -> Dict:
+        """Unread notifications and unread messages, for badges"""
+        supabase = get_supabase()
+        
+        notif_response, message_response = gather(
+            lambda: supabase.table('notifications').select('id', count='exact').eq('user_id', user_id).eq('is_read', False).limit(1).execute(),
+            lambda: supabase.table('messages').select('id', count='exact').eq('receiver_id', user_id).eq('is_read', False).limit(1).execute()
+        )
+        
+        return {
+            "notifications": notif_response.count or 0,
+            "messages": message_response.count or 0
+        }
+    
+    @staticmethod
+    def stream_events(user_id: str):
+        """Server-sent events for one user's open tab.
+
+        Sends the current unread counts, then every new notification and a
+        fresh `unread` event whenever the counts may have changed. Comment
+        lines keep idle connections alive; the stream ends after
+        STREAM_MAX_DURATION seconds and the browser's EventSource reconnects.
+        """
+        def sse(event_type, data):
+            return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+        
+        subscription = get_broker().subscribe(user_id)
+        try:
+            yield "retry: 3000\n\n"
+            yield sse('unread', NotificationService.get_unread_counts(user_id))
+            
+            deadline = time.monotonic() + Config.STREAM_MAX_DURATION
+            while time.monotonic() < deadline:
+                event = subscription.get(timeout=Config.STREAM_HEARTBEAT)
+                if event is None:
+                    yield ": keepalive\n\n"
+                elif event['type'] == 'unread_changed':
+                    yield sse('unread', NotificationService.get_unread_counts(user_id))
+                else:
+                    yield sse(event['type'], event['data'])
+                    if event['type'] == 'notification':
+                        yield sse('unread', NotificationService.get_unread_counts(user_id))
+        except Exception as e:
+            logger.exception("Notification stream failed")
+        finally:
+            subscription.close()
+    
     @staticmethod
     def mark_all_read(user_id: str) -> Dict:
         """Mark all notifications as read"""
@@ -89,10 +214,11 @@ class NotificationService:
         
         try:
             supabase.table('notifications').update({'is_read': True, 'read_at': datetime.now().isoformat()}).eq('user_id', user_id).eq('is_read', False).execute()
+            publish_event(user_id, 'unread_changed')
             
             return {"success": True, "message": "All notifications marked as read"}
         except Exception as e:
-            print(f"Mark all read error: {e}")
+            logger.exception("Mark all read failed")
             return {"success": False, "message": str(e)}
     
     @staticmethod
@@ -102,24 +228,26 @@ class NotificationService:
         
         try:
             supabase.table('notifications').update({'is_read': True, 'read_at': datetime.now().isoformat()}).eq('id', notification_id).eq('user_id', user_id).execute()
+            publish_event(user_id, 'unread_changed')
             
             return {"success": True, "message": "Notification marked as read"}
         except Exception as e:
-            print(f"Mark read error: {e}")
+            logger.exception("Mark read failed")
             return {"success": False, "message": str(e)}
     
     # Helper methods for creating specific notification types
     @staticmethod
-    def create_offer_notification(seller_id: str, buyer_name: str, item_title: str, offer_id: str):
+    def create_offer_notification(seller_id: str, buyer_id: str, item_title: str, offer_id: str):
         """Create notification for new offer"""
-        message = f"New offer from {buyer_name} on {item_title}"
-        return NotificationService.create_notification(seller_id, 'offer', message, offer_id)
+        message = "New offer from {actor_name} on {item_title}"
+        return NotificationService.create_notification(seller_id, 'offer', message, offer_id, actor_id=buyer_id,
+                                                       params={'item_title': item_title})
     
     @staticmethod
-    def create_message_notification(receiver_id: str, sender_name: str, message_id: str):
+    def create_message_notification(receiver_id: str, sender_id: str, message_id: str):
         """Create notification for new message"""
-        message = f"New message from {sender_name}"
-        return NotificationService.create_notification(receiver_id, 'message', message, message_id)
+        message = "New message from {actor_name}"
+        return NotificationService.create_notification(receiver_id, 'message', message, message_id, actor_id=sender_id)
     
     @staticmethod
     def create_meetup_notification(user_id: str, meetup_title: str, meetup_id: str):
@@ -128,16 +256,16 @@ class NotificationService:
         return NotificationService.create_notification(user_id, 'meetup', message, meetup_id)
     
     @staticmethod
-    def create_friend_request_notification(receiver_id: str, sender_name: str, request_id: str):
+    def create_friend_request_notification(receiver_id: str, sender_id: str, request_id: str):
         """Create notification for friend request"""
-        message = f"{sender_name} sent you a friend request"
-        return NotificationService.create_notification(receiver_id, 'friend_request', message, request_id)
+        message = "{actor_name} sent you a friend request"
+        return NotificationService.create_notification(receiver_id, 'friend_request', message, request_id, actor_id=sender_id)
     
     @staticmethod
-    def create_friend_accepted_notification(sender_id: str, accepter_name: str, friendship_id: str):
+    def create_friend_accepted_notification(sender_id: str, accepter_id: str, friendship_id: str):
         """Create notification when friend request is accepted"""
-        message = f"{accepter_name} accepted your friend request"
-        return NotificationService.create_notification(sender_id, 'friend_request', message, friendship_id)
+        message = "{actor_name} accepted your friend request"
+        return NotificationService.create_notification(sender_id, 'friend_request', message, friendship_id, actor_id=accepter_id)
     
     @staticmethod
     def create_board_post_notification(user_id: str, post_title: str, post_id: str):
@@ -1,8 +1,29 @@
+import logging
 import uuid
 from datetime import datetime
 from typing import List, Dict, Optional
+from app.config import Config
 from app.extensions import get_supabase
+from app.services.image_service import ImageService
 from app.services.notification_service import NotificationService
+from app.services.profile_card_service import hydrate_users
+from app.utils.events import publish_event
+from app.utils.helpers import is_uuid
+from app.utils.pagination import InvalidCursor, clamp_page_size, decode_cursor, encode_cursor, keyset_filter
+
+logger = logging.getLogger(__name__)
+
+# Incremental chat sync (OfferService.sync_messages)
+SYNC_MESSAGE_COLUMNS = 'id, sender_id, receiver_id, item_id, offer_id, message, is_read, created_at'
+MAX_SYNC_MESSAGES = 200
+
+
+def _conversation_filter(user_id, other_user_id):
+    # Both ids must be validated UUIDs: they are spliced into the filter
+    return (
+        f'and(sender_id.eq.{user_id},receiver_id.eq.{other_user_id}),'
+        f'and(sender_id.eq.{other_user_id},receiver_id.eq.{user_id})'
+    )
 
 class OfferService:
     @staticmethod
@@ -39,12 +60,8 @@ class OfferService:
             
             supabase.table('offers').insert(offer_data).execute()
             
-            # Get buyer info for notification
-            buyer_response = supabase.table('users').select('first_name, last_name').eq('id', buyer_id).single().execute()
-            buyer_name = f"{buyer_response.data['first_name']} {buyer_response.data['last_name']}"
-            
             # Create notification for seller
-            NotificationService.create_offer_notification(item['seller_id'], buyer_name, item['title'], offer_id)
+            NotificationService.create_offer_notification(item['seller_id'], buyer_id, item['title'], offer_id)
             
             return {
                 "success": True,
@@ -52,7 +69,7 @@ class OfferService:
                 "offer_id": offer_id
             }
         except Exception as e:
-            print(f"Create offer error: {e}")
+            logger.exception("Create offer failed")
             return {"success": False, "message": str(e)}
     
     @staticmethod
@@ -66,11 +83,8 @@ class OfferService:
             
             offers = []
             for offer in offers_response.data:
-                # Get first image from images array
-                item_image = None
-                if offer.get('items') and offer['items'].get('images'):
-                    images = offer['items']['images']
-                    item_image = images[0] if isinstance(images, list) and len(images) > 0 else None
+                # First image, as the small variant the offer card shows
+                item_image = ImageService.cover_url((offer.get('items') or {}).get('images'), 'thumb')
                 
                 offers.append({
                     **offer,
@@ -79,7 +93,7 @@ class OfferService:
                     'item_image': item_image,
                     'buyer_first_name': offer['users']['first_name'] if offer.get('users') else None,
                     'buyer_last_name': offer['users']['last_name'] if offer.get('users') else None,
-                    'buyer_profile_picture': offer['users']['profile_picture'] if offer.get('users') else None,
+                    'buyer_profile_picture': ImageService.avatar_url(offer['users']['profile_picture']) if offer.get('users') else None,
                 })
             
             return {
@@ -87,7 +101,7 @@ class OfferService:
                 "offers": offers
             }
         except Exception as e:
-            print(f"Get received offers error: {e}")
+            logger.exception("Get received offers failed")
             return {"success": False, "message": str(e), "offers": []}
     
     @staticmethod
@@ -101,11 +115,8 @@ class OfferService:
             
             offers = []
             for offer in offers_response.data:
-                # Get first image from images array
-                item_image = None
-                if offer.get('items') and offer['items'].get('images'):
-                    images = offer['items']['images']
-                    item_image = images[0] if isinstance(images, list) and len(images) > 0 else None
+                # First image, as the small variant the offer card shows
+                item_image = ImageService.cover_url((offer.get('items') or {}).get('images'), 'thumb')
                 
                 offers.append({
                     **offer,
@@ -114,7 +125,7 @@ class OfferService:
                     'item_image': item_image,
                     'seller_first_name': offer['users']['first_name'] if offer.get('users') else None,
                     'seller_last_name': offer['users']['last_name'] if offer.get('users') else None,
-                    'seller_profile_picture': offer['users']['profile_picture'] if offer.get('users') else None,
+                    'seller_profile_picture': ImageService.avatar_url(offer['users']['profile_picture']) if offer.get('users') else None,
                 })
             
             return {
@@ -122,7 +133,7 @@ class OfferService:
                 "offers": offers
             }
         except Exception as e:
-            print(f"Get sent offers error: {e}")
+            logger.exception("Get sent offers failed")
             return {"success": False, "message": str(e), "offers": []}
     
     @staticmethod
@@ -159,7 +170,7 @@ class OfferService:
                 "message": f"Offer {status} successfully"
             }
         except Exception as e:
-            print(f"Update offer status error: {e}")
+            logger.exception("Update offer status failed")
             return {"success": False, "message": str(e)}
     
     @staticmethod
@@ -181,12 +192,17 @@ class OfferService:
             
             supabase.table('messages').insert(message_data).execute()
             
-            # Get sender info for notification
-            sender_response = supabase.table('users').select('first_name, last_name').eq('id', sender_id).single().execute()
-            sender_name = f"{sender_response.data['first_name']} {sender_response.data['last_name']}"
+            # Live update for the receiver's open chat (their unread badge
+            # refreshes with the notification below)
+            publish_event(receiver_id, 'message', {
+                'message_id': message_id,
+                'sender_id': sender_id,
+                'item_id': item_id,
+                'offer_id': offer_id
+            })
             
             # Create notification for receiver
-            NotificationService.create_message_notification(receiver_id, sender_name, message_id)
+            NotificationService.create_message_notification(receiver_id, sender_id, message_id)
             
             return {
                 "success": True,
@@ -194,62 +210,78 @@ class OfferService:
                 "message_id": message_id
             }
         except Exception as e:
-            print(f"Send message error: {e}")
+            logger.exception("Send message failed")
             return {"success": False, "message": str(e)}
     
     @staticmethod
-    def get_conversations(user_id: str) -> Dict:
-        """Get all conversations for a user"""
+    def get_conversations(user_id: str, limit: int = None, cursor: str = None) -> Dict:
+        """Get the user's conversations, most recently active first.
+
+        Backed by the `get_inbox` function (datas/create_inbox_function.sql),
+        which returns the latest message, partner profile and unread count
+        per partner in one query. Pass the returned `next_cursor` back as
+        `cursor` to load the next page.
+        """
         supabase = get_supabase()
         
         try:
-            # Get all messages where user is sender or receiver
-            messages_response = supabase.table('messages').select('sender_id, receiver_id, message, created_at').or_(f'sender_id.eq.{user_id},receiver_id.eq.{user_id}').order('created_at', desc=True).execute()
-            
-            # Group by conversation partner
-            conversations_dict = {}
-            for msg in messages_response.data:
-                other_user_id = msg['receiver_id'] if msg['sender_id'] == user_id else msg['sender_id']
-                
-                if other_user_id not in conversations_dict:
-                    conversations_dict[other_user_id] = {
-                        'other_user_id': other_user_id,
-                        'last_message': msg['message'],
-                        'last_message_time': msg['created_at']
-                    }
-            
-            # Get user details and unread counts
-            conversations = []
-            for other_user_id, conv_data in conversations_dict.items():
-                # Get user details
-                user_response = supabase.table('users').select('first_name, last_name, profile_picture').eq('id', other_user_id).single().execute()
-                
-                # Get unread count
-                unread_response = supabase.table('messages').select('id', count='exact').eq('sender_id', other_user_id).eq('receiver_id', user_id).eq('is_read', False).execute()
-                
-                conversations.append({
-                    **conv_data,
-                    'first_name': user_response.data['first_name'] if user_response.data else '',
-                    'last_name': user_response.data['last_name'] if user_response.data else '',
-                    'profile_picture': user_response.data['profile_picture'] if user_response.data else None,
-                    'unread_count': unread_response.count if unread_response.count else 0
-                })
+            if limit or cursor:
+                page_size = clamp_page_size(limit, Config.FEED_PAGE_SIZE, Config.FEED_MAX_PAGE_SIZE)
+            else:
+                # Clients that don't page get every conversation (LIMIT NULL)
+                page_size = None
+            params = {'p_user_id': user_id, 'page_limit': page_size + 1 if page_size else None}
+            if cursor:
+                params['before_time'], params['before_partner'] = decode_cursor(cursor)
+
+            inbox_response = supabase.rpc('get_inbox', params).execute()
+            rows = inbox_response.data or []
+
+            next_cursor = None
+            if page_size and len(rows) > page_size:
+                rows = rows[:page_size]
+                last = rows[-1]
+                next_cursor = encode_cursor(
+                    {'last_message_time': last['last_message_time'], 'id': last['other_user_id']},
+                    'last_message_time'
+                )
+
+            conversations = [{
+                'other_user_id': row['other_user_id'],
+                'last_message': row['last_message'],
+                'last_message_time': row['last_message_time'],
+                'first_name': row.get('first_name') or '',
+                'last_name': row.get('last_name') or '',
+                'profile_picture': ImageService.avatar_url(row.get('profile_picture')),
+                'unread_count': row.get('unread_count') or 0
+            } for row in rows]
             
             return {
                 "success": True,
-                "conversations": conversations
+                "conversations": conversations,
+                "next_cursor": next_cursor
             }
+        except InvalidCursor as e:
+            return {"success": False, "message": str(e)}
         except Exception as e:
-            print(f"Get conversations error: {e}")
+            logger.exception("Get conversations failed")
             return {"success": False, "message": str(e)}
     
     @staticmethod
-    def get_messages(user_id: str, other_user_id: str, limit: int = 50, before: Optional[str] = None) -> Dict:
+    def get_messages(user_id: str, other_user_id: str, limit: int = 50, before: Optional[str] = None,
+                     after: Optional[str] = None) -> Dict:
         """Get recent messages between two users (with limit & optional pagination)
         
         - Returns the most recent `limit` messages by default (like Messenger)
         - If `before` is provided (ISO timestamp), returns messages older than that
+        - If `after` is provided (a `sync_cursor` from an earlier response),
+          returns only the messages newer than it - see sync_messages
         """
+        if not is_uuid(other_user_id):
+            return {"success": False, "message": "Invalid user id"}
+        if after:
+            return OfferService.sync_messages(user_id, other_user_id, after, limit)
+
         supabase = get_supabase()
         
         try:
@@ -258,10 +290,7 @@ class OfferService:
                 supabase
                 .table('messages')
                 .select('*, users!messages_sender_id_fkey(first_name, last_name, profile_picture)')
-                .or_(
-                    f'and(sender_id.eq.{user_id},receiver_id.eq.{other_user_id}),'
-                    f'and(sender_id.eq.{other_user_id},receiver_id.eq.{user_id})'
-                )
+                .or_(_conversation_filter(user_id, other_user_id))
                 .order('created_at', desc=True)
             )
 
@@ -271,7 +300,7 @@ class OfferService:
                     # Trust client to send a valid timestamp string; Supabase will validate
                     query = query.lt('created_at', before)
                 except Exception as cursor_error:
-                    print(f"Invalid 'before' cursor passed to get_messages: {cursor_error}")
+                    logger.warning("Invalid 'before' cursor passed to get_messages: %s", cursor_error)
 
             # Limit number of messages to keep initial load fast
             if limit and limit > 0:
@@ -286,19 +315,79 @@ class OfferService:
                     **msg,
                     'sender_first_name': msg['users']['first_name'] if msg.get('users') else None,
                     'sender_last_name': msg['users']['last_name'] if msg.get('users') else None,
-                    'sender_profile_picture': msg['users']['profile_picture'] if msg.get('users') else None,
+                    'sender_profile_picture': ImageService.avatar_url(msg['users']['profile_picture']) if msg.get('users') else None,
                 })
             
-            # Mark messages as read
-            supabase.table('messages').update({'is_read': True}).eq('sender_id', other_user_id).eq('receiver_id', user_id).eq('is_read', False).execute()
+            # Mark messages as read. Older unread messages can only hide
+            # past a full page, otherwise the page shows whether any exist.
+            page_full = bool(limit and limit > 0 and len(messages) >= limit)
+            if page_full or OfferService._has_unread(messages, user_id):
+                OfferService._mark_read(user_id, other_user_id)
             
             return {
                 "success": True,
-                "messages": messages
+                "messages": messages,
+                "sync_cursor": encode_cursor(messages[-1]) if messages else None
             }
         except Exception as e:
-            print(f"Get messages error: {e}")
+            logger.exception("Get messages failed")
             return {"success": False, "message": str(e)}
+
+    @staticmethod
+    def sync_messages(user_id: str, other_user_id: str, after: str, limit: int = 50) -> Dict:
+        """Messages in a conversation newer than the `after` sync cursor, oldest first.
+
+        Made for polling an open chat: no join (senders come from the
+        profile card cache) and no write unless something unread arrived,
+        so an idle poll is one indexed read that returns nothing. Send the
+        returned `sync_cursor` with the next poll; when a burst exceeds
+        `limit` the rest follows on the next one.
+        """
+        if not is_uuid(other_user_id):
+            return {"success": False, "message": "Invalid user id"}
+        supabase = get_supabase()
+
+        try:
+            page_size = clamp_page_size(limit, 50, MAX_SYNC_MESSAGES)
+            # One `or` holds both the conversation and the keyset on
+            # (created_at, id), so the database skips what the client has
+            after_cursor = keyset_filter(after, 'created_at', desc=False)
+            response = (
+                supabase
+                .table('messages')
+                .select(SYNC_MESSAGE_COLUMNS)
+                .or_(f'and(or({_conversation_filter(user_id, other_user_id)}),or({after_cursor}))')
+                .order('created_at', desc=False)
+                .order('id', desc=False)
+                .limit(page_size)
+                .execute()
+            )
+            messages = response.data or []
+            hydrate_users(messages, 'sender_id', 'sender')
+
+            if OfferService._has_unread(messages, user_id):
+                OfferService._mark_read(user_id, other_user_id)
+
+            return {
+                "success": True,
+                "messages": messages,
+                "sync_cursor": encode_cursor(messages[-1]) if messages else after
+            }
+        except InvalidCursor as e:
+            return {"success": False, "message": str(e)}
+        except Exception as e:
+            logger.exception("Sync messages failed")
+            return {"success": False, "message": str(e)}
+
+    @staticmethod
+    def _has_unread(messages, user_id):
+        return any(m['receiver_id'] == user_id and not m.get('is_read') for m in messages)
+
+    @staticmethod
+    def _mark_read(user_id, other_user_id):
+        supabase = get_supabase()
+        supabase.table('messages').update({'is_read': True}).eq('sender_id', other_user_id).eq('receiver_id', user_id).eq('is_read', False).execute()
+        publish_event(user_id, 'unread_changed')
     
     @staticmethod
     def get_unread_count(user_id: str) -> Dict:
@@ -313,5 +402,5 @@ class OfferService:
                 "unread_count": unread_response.count if unread_response.count else 0
             }
         except Exception as e:
-            print(f"Get unread count error: {e}")
+            logger.exception("Get unread count failed")
             return {"success": False, "message": str(e)}
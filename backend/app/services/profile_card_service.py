@@ -0,0 +1,94 @@
+import logging
+
+from app.config import Config
+from app.services.image_service import ImageService
+from app.utils.cache import TTLCache
+from app.utils.helpers import fetch_users_by_ids
+
+logger = logging.getLogger(__name__)
+
+# The small, public slice of a user that other pages show next to content
+# (seller of an item, poster of a request, chat partner, ...)
+PROFILE_CARD_COLUMNS = 'id, first_name, last_name, email, course, profile_picture'
+
+# Shared by every service in this worker. Profile cards are read on almost
+# every page but only change when a user edits their profile, so a short
+# TTL is enough to bound staleness across gunicorn workers.
+_cache = TTLCache(maxsize=Config.PROFILE_CACHE_SIZE, ttl=Config.PROFILE_CACHE_TTL)
+
+
+def get_profile_cards(user_ids):
+    """Get profile cards for many users, keyed by user id.
+
+    Cached cards are served from memory; all misses are resolved together
+    with one `users` query. Unknown ids are simply absent from the result.
+    """
+    ids = list(dict.fromkeys(user_id for user_id in user_ids if user_id))
+    if not ids:
+        return {}
+
+    cards, missing = _cache.get_many(ids)
+    if missing:
+        fetched = fetch_users_by_ids(missing, PROFILE_CARD_COLUMNS)
+        for user_id, card in fetched.items():
+            # Cards sit next to content in lists: link the small avatar
+            card['profile_picture'] = ImageService.avatar_url(card.get('profile_picture'))
+            _cache.set(user_id, card)
+        cards.update(fetched)
+
+    return cards
+
+
+def get_profile_card(user_id):
+    """Get a single profile card, or None if the user doesn't exist."""
+    return get_profile_cards([user_id]).get(user_id)
+
+
+def format_full_name(card, default='Someone'):
+    if not card:
+        return default
+    return f"{card.get('first_name', '')} {card.get('last_name', '')}".strip() or default
+
+
+def get_full_name(user_id, default='Someone'):
+    return format_full_name(get_profile_card(user_id), default)
+
+
+def invalidate_profile_card(user_id):
+    """Drop a user's cached card, e.g. after they edit their profile."""
+    _cache.delete(user_id)
+
+
+def profile_card_stats():
+    """Hit/miss counters for the profile card cache in this worker."""
+    return _cache.stats()
+
+
+def hydrate_users(rows, id_key, prefix, fields=('first_name', 'last_name', 'profile_picture'), users=None):
+    """Attach user fields to every row using one batched lookup.
+
+    Replaces the per-row `users ... .single()` pattern: the distinct ids found
+    under `id_key` are resolved together through the shared profile card
+    cache and copied onto each row as `<prefix>_<field>`. Missing users fall
+    back to 'Unknown User', matching the defaults the services used before.
+
+    `fields` must be profile card columns. Pass `users` (as returned by
+    `get_profile_cards`) to reuse a lookup that already covered these ids.
+    """
+    if not rows:
+        return rows
+
+    if users is None:
+        try:
+            users = get_profile_cards(row.get(id_key) for row in rows)
+        except Exception:
+            logger.exception("Fetching user data for %s failed", prefix)
+            users = {}
+
+    defaults = {'first_name': 'Unknown', 'last_name': 'User', 'email': ''}
+    for row in rows:
+        user = users.get(row.get(id_key)) or {}
+        for field in fields:
+            row[f'{prefix}_{field}'] = user.get(field) or defaults.get(field)
+
+    return rows
@@ -1,4 +1,9 @@
+import logging
 from app.extensions import get_supabase
+from app.services.profile_card_service import get_profile_cards
+from app.utils.concurrency import gather
+
+logger = logging.getLogger(__name__)
 
 class ReferralService:
     
@@ -8,10 +13,16 @@ class ReferralService:
         supabase = get_supabase()
         
         try:
-            # Get user's referral code and total referrals
-            user_data = supabase.table('users').select(
-                'referral_code, total_referrals, reputation_score'
-            ).eq('id', user_id).execute()
+            # User's referral code/totals and the list of referred users,
+            # fetched concurrently
+            user_data, referrals = gather(
+                lambda: supabase.table('users').select(
+                    'referral_code, total_referrals, reputation_score'
+                ).eq('id', user_id).execute(),
+                lambda: supabase.table('referrals').select(
+                    'created_at, referred_id'
+                ).eq('referrer_id', user_id).order('created_at', desc=True).execute()
+            )
             
             if not user_data.data or len(user_data.data) == 0:
                 return {
@@ -21,22 +32,16 @@ class ReferralService:
             
             user_info = user_data.data[0]
             
-            # Get list of referred users
-            referrals = supabase.table('referrals').select(
-                'created_at, referred_id'
-            ).eq('referrer_id', user_id).order('created_at', desc=True).execute()
-            
             # Get referred users details
             referred_users = []
             if referrals.data:
+                cards = get_profile_cards(r['referred_id'] for r in referrals.data)
                 for referral in referrals.data:
-                    user = supabase.table('users').select(
-                        'first_name, last_name, created_at'
-                    ).eq('id', referral['referred_id']).execute()
+                    user = cards.get(referral['referred_id'])
                     
-                    if user.data and len(user.data) > 0:
+                    if user:
                         referred_users.append({
-                            'name': f"{user.data[0]['first_name']} {user.data[0]['last_name']}",
+                            'name': f"{user['first_name']} {user['last_name']}",
                             'joined_at': referral['created_at']
                         })
             
@@ -49,7 +54,7 @@ class ReferralService:
             }
             
         except Exception as e:
-            print(f"Error getting referral stats: {str(e)}")
+            logger.exception("Getting referral stats failed")
             raise e
     
     @staticmethod
@@ -61,7 +66,7 @@ class ReferralService:
             result = supabase.table('users').select('id').eq('referral_code', code).execute()
             return result.data and len(result.data) > 0
         except Exception as e:
-            print(f"Error validating referral code: {str(e)}")
+            logger.exception("Validating referral code failed")
             return False
     
     @staticmethod
@@ -87,5 +92,5 @@ class ReferralService:
             return leaderboard
             
         except Exception as e:
-            print(f"Error getting leaderboard: {str(e)}")
+            logger.exception("Getting leaderboard failed")
             raise e
@@ -0,0 +1,37 @@
+from app.extensions import get_supabase
+
+# Reputation rules for meetups
+COMPLETION_REWARD = 5
+SELLER_CANCELLATION_PENALTY = -3
+BUYER_CANCELLATION_PENALTY = -1
+
+
+class ReputationService:
+    @staticmethod
+    def change(user_id, amount, reason, meetup_id=None, idempotency_key=None):
+        """Describe one reputation change for `apply_changes`."""
+        return {
+            "user_id": user_id,
+            "amount": amount,
+            "reason": reason,
+            "meetup_id": meetup_id,
+            "idempotency_key": idempotency_key
+        }
+
+    @staticmethod
+    def apply_changes(changes):
+        """Apply reputation changes atomically in one round trip.
+
+        Each change increments the user's score and writes its
+        reputation_history row in the same transaction (see
+        datas/create_reputation_ledger.sql). Changes whose idempotency key
+        was already used are skipped, so retrying a request never awards
+        or deducts twice. Returns [{user_id, applied, reputation_score}].
+        """
+        supabase = get_supabase()
+        response = supabase.rpc('apply_reputation_changes', {'changes': changes}).execute()
+        return response.data or []
+
+    @staticmethod
+    def meetup_key(meetup_id, event, role):
+        return f"meetup:{meetup_id}:{event}:{role}"
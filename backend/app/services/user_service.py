@@ -1,17 +1,63 @@
+import logging
 from app.extensions import get_supabase
+from app.services.image_service import VARIANT_SIZES, ImageService, InvalidImage, is_data_url
+from app.services.profile_card_service import get_profile_card, invalidate_profile_card
+from app.utils.concurrency import gather
+from app.utils.fields import FieldSet, InvalidFields
+
+logger = logging.getLogger(__name__)
+
+# Columns of a user's own row a client may ask for with ?fields=
+# (search_text is internal). The default leaves out the address, which
+# only the profile page shows.
+OWN_USER_COLUMNS = (
+    'email', 'first_name', 'last_name', 'course', 'current_year', 'block_section', 'phone_number',
+    'address', 'profile_picture', 'profile_completed', 'reputation_score', 'referral_code', 'referred_by',
+    'total_referrals', 'created_at', 'updated_at'
+)
+# The signed-in user as the frontend keeps it after login
+SESSION_USER_FIELDS = (
+    'email', 'first_name', 'last_name', 'course', 'current_year', 'block_section', 'phone_number',
+    'profile_picture', 'profile_completed', 'reputation_score', 'referral_code'
+)
+PROFILE_FIELDS = FieldSet(allowed=OWN_USER_COLUMNS, default=SESSION_USER_FIELDS)
+DASHBOARD_FIELDS = FieldSet(
+    allowed=OWN_USER_COLUMNS,
+    default=('first_name', 'last_name', 'profile_picture', 'profile_completed', 'reputation_score')
+)
+USER_STATS_COLUMNS = 'active_listings, total_sales, total_earnings, engagement_rate'
 
 
 class UserService:
 
     @staticmethod
-    def get_profile(user_id):
+    def get_profile(user_id, fields=None):
         supabase = get_supabase()
         try:
+            projection = PROFILE_FIELDS.resolve(fields)
             user_response = supabase.table('users').select(
-                '*').eq('id', user_id).single().execute()
+                projection.columns).eq('id', user_id).single().execute()
             return {"success": True, "user": user_response.data}, 200
+        except InvalidFields as e:
+            return {"success": False, "message": str(e)}, 400
         except Exception as e:
-            print(f"Get profile error: {e}")
+            logger.exception("Get profile failed")
+            return {"success": False, "message": str(e)}, 500
+
+    @staticmethod
+    def get_avatar_url(user_id, size='sm'):
+        """URL of a user's avatar at one of the pre-rendered sizes."""
+        if size not in VARIANT_SIZES['avatars']:
+            return {"success": False, "message": f"Invalid size. Use one of: {', '.join(VARIANT_SIZES['avatars'])}"}, 400
+        try:
+            card = get_profile_card(user_id)
+            picture = card.get('profile_picture') if card else None
+            if not picture or is_data_url(picture):
+                # Inline avatars are served from the profile until `flask migrate-avatars` runs
+                return {"success": False, "message": "No avatar"}, 404
+            return {"success": True, "url": ImageService.avatar_url(picture, size)}, 200
+        except Exception as e:
+            logger.exception("Get avatar failed")
             return {"success": False, "message": str(e)}, 500
 
     @staticmethod
@@ -20,41 +66,57 @@ class UserService:
         supabase = get_supabase()
         try:
             user_response = supabase.table('users').select(
-                'id, first_name, last_name, email, course, current_year, block_section, phone_number, address, profile_picture, profile_completed, reputation_score').eq('id', user_id).single().execute()
+                'id, first_name, last_name, email, course, current_year, block_section, phone_number, address, profile_picture, profile_completed, reputation_score, updated_at').eq('id', user_id).single().execute()
             return {"success": True, "user": user_response.data}, 200
         except Exception as e:
-            print(f"Get user profile error: {e}")
+            logger.exception("Get user profile failed")
             return {"success": False, "message": str(e)}, 500
 
     @staticmethod
-    def search_users(query, course, year, current_user_id):
-        """Search for users by name, email, course, or year"""
+    def rank_users(query, course=None, year=None, exclude_id=None, limit=20):
+        """Ranked user matches from the indexed `search_users` function
+        (datas/create_user_search.sql). Prefix matches on first name, last
+        name or email come first, then fuzzy matches by similarity."""
         supabase = get_supabase()
-        try:
-            # Start with base query
-            db_query = supabase.table('users').select(
-                'id, first_name, last_name, email, course, current_year, block_section, profile_picture, profile_completed, reputation_score')
+        response = supabase.rpc('search_users', {
+            'q': (query or '').strip(),
+            'p_course': course or None,
+            'p_year': year or None,
+            'exclude_id': exclude_id,
+            'page_limit': max(1, min(limit, 100))
+        }).execute()
+        users = response.data or []
+        for user in users:
+            user['profile_picture'] = ImageService.avatar_url(user.get('profile_picture'))
+        return users
 
-            # Apply filters
-            if query:
-                # Search in first_name, last_name, or email
-                db_query = db_query.or_(
-                    f'first_name.ilike.%{query}%,last_name.ilike.%{query}%,email.ilike.%{query}%')
-
-            if course:
-                db_query = db_query.eq('course', course)
-
-            if year:
-                db_query = db_query.eq('current_year', year)
-
-            # Exclude current user and limit results
-            db_query = db_query.neq('id', current_user_id).limit(50)
-
-            response = db_query.execute()
+    @staticmethod
+    def user_facets(query, course=None, year=None, exclude_id=None):
+        """Course and year counts for a search: {courses: [...], years: [...]}"""
+        supabase = get_supabase()
+        response = supabase.rpc('search_user_facets', {
+            'q': (query or '').strip(),
+            'p_course': course or None,
+            'p_year': year or None,
+            'exclude_id': exclude_id
+        }).execute()
+        return response.data or {"courses": [], "years": []}
 
-            return {"success": True, "users": response.data or []}, 200
+    @staticmethod
+    def search_users(query, course, year, current_user_id, include_facets=False):
+        """Search for users by name, email, course, or year"""
+        try:
+            if include_facets:
+                users, facets = gather(
+                    lambda: UserService.rank_users(query, course, year, current_user_id, limit=50),
+                    lambda: UserService.user_facets(query, course, year, current_user_id)
+                )
+                return {"success": True, "users": users, "facets": facets}, 200
+
+            users = UserService.rank_users(query, course, year, current_user_id, limit=50)
+            return {"success": True, "users": users}, 200
         except Exception as e:
-            print(f"Search users error: {e}")
+            logger.exception("Search users failed")
             return {"success": False, "message": str(e)}, 500
 
     @staticmethod
@@ -68,9 +130,16 @@ class UserService:
                 if field in data:
                     del data[field]
 
+            # Uploaded avatars go to media storage; the row keeps only the URL
+            if is_data_url(data.get('profile_picture')):
+                data['profile_picture'] = ImageService.store_image(data['profile_picture'], prefix='avatars')
+
             response = supabase.table('users').update(
                 data).eq('id', user_id).execute()
 
+            # Name/avatar may have changed - drop the cached profile card
+            invalidate_profile_card(user_id)
+
             # After updating, check if profile is now complete
             updated_user = response.data[0] if response.data else None
             if updated_user:
@@ -88,25 +157,29 @@ class UserService:
                     supabase.table('users').update(
                         {'profile_completed': True}).eq('id', user_id).execute()
                     updated_user['profile_completed'] = True
-                    print(f"✓ Profile marked as complete for user {user_id}")
+                    logger.info("Profile marked as complete for user %s", user_id)
 
             return {"success": True, "user": updated_user}, 200
+        except InvalidImage as e:
+            return {"success": False, "message": str(e)}, 400
         except Exception as e:
-            print(f"Update profile error: {e}")
+            logger.exception("Update profile failed")
             return {"success": False, "message": str(e)}, 500
 
     @staticmethod
     def check_profile_completion(user_id):
         supabase = get_supabase()
         try:
-            # Get user data
-            user_response = supabase.table('users').select(
-                'profile_picture, address').eq('id', user_id).single().execute()
+            # User data and listing count are independent: fetch both at once
+            user_response, items_response = gather(
+                lambda: supabase.table('users').select(
+                    'profile_picture, address').eq('id', user_id).single().execute(),
+                lambda: supabase.table('items').select(
+                    'id', count='exact').eq('seller_id', user_id).execute()
+            )
             user = user_response.data
 
             # Check if user has at least 1 item listed
-            items_response = supabase.table('items').select(
-                'id', count='exact').eq('seller_id', user_id).execute()
             has_listing = (items_response.count or 0) > 0
 
             # Profile is complete if: profile_picture + address + 1 listing
@@ -128,162 +201,60 @@ class UserService:
                 }
             }, 200
         except Exception as e:
-            print(f"Check profile completion error: {e}")
+            logger.exception("Check profile completion failed")
             return {"success": False, "message": str(e)}, 500
 
     @staticmethod
-    def get_dashboard_data(user_id):
+    def get_dashboard_data(user_id, fields=None):
         supabase = get_supabase()
 
         try:
-            # NOTE: This endpoint does a few aggregate reads. To keep it fast and
-            # "real‑time‑ish" we minimise round‑trips and avoid per‑row loops.
+            projection = DASHBOARD_FIELDS.resolve(fields)
 
-            # 1. Base user data
+            # The stats are materialized in user_stats and kept current by
+            # triggers (see datas/create_user_stats.sql), so the whole
+            # dashboard is one row read with the stats embedded.
             user_response = (
                 supabase
                 .table('users')
-                .select('*')
+                .select(f"{projection.columns}, user_stats({USER_STATS_COLUMNS})")
                 .eq('id', user_id)
                 .single()
                 .execute()
             )
 
-            # 2. Active listings (single count query)
-            active_listing = (
-                supabase
-                .table('items')
-                .select('*', count='exact')
-                .eq('seller_id', user_id)
-                .eq('status', 'active')
-                .execute()
-            )
-
-            # 3. Completed meetups as seller (for total_sales + earnings)
-            completed_meetups_seller = (
-                supabase
-                .table('meetups')
-                .select('id', count='exact')
-                .eq('seller_id', user_id)
-                .eq('status', 'completed')
-                .execute()
-            )
-
-            # 4. Total earnings: single JOIN query (already optimised)
-            completed_meetups_with_items = (
-                supabase
-                .table('meetups')
-                .select('item_id, items(price)')
-                .eq('seller_id', user_id)
-                .eq('status', 'completed')
-                .execute()
-            )
-
-            total_earnings = 0.0
-            if completed_meetups_with_items.data:
-                for meetup in completed_meetups_with_items.data:
-                    try:
-                        item_data = meetup.get('items') or {}
-                        price = item_data.get('price')
-                        if price is not None:
-                            total_earnings += float(price)
-                    except Exception as item_error:
-                        # Log and continue – a single bad row shouldn't break the dashboard
-                        print(f"Error calculating earnings: {item_error}")
-
-            # 5. Completed meetups as buyer (for engagement)
-            completed_deals_buyer = (
-                supabase
-                .table('meetups')
-                .select('id', count='exact')
-                .eq('buyer_id', user_id)
-                .eq('status', 'completed')
-                .execute()
-            )
-
-            total_completed_deals = (
-                completed_meetups_seller.count or 0) + (completed_deals_buyer.count or 0)
-
-            # 6. Request‑board posts + likes
-            #    - ONE query to get this user's posts (for count + ids)
-            #    - ONE query to count all likes across those posts (no per‑post loop)
-            user_posts = (
-                supabase
-                .table('requests')
-                .select('id')
-                .eq('user_id', user_id)
-                .execute()
-            )
-
-            post_ids = [post['id']
-                        for post in (user_posts.data or []) if 'id' in post]
-            total_posts = len(post_ids)
-
-            total_post_likes = 0
-            if post_ids:
-                try:
-                    likes_resp = (
-                        supabase
-                        .table('request_likes')
-                        .select('id', count='exact')
-                        .in_('request_id', post_ids)
-                        .execute()
-                    )
-                    total_post_likes = likes_resp.count or 0
-                except Exception as like_error:
-                    print(f"Error counting total likes: {like_error}")
-
-            # 7. Marketplace item views (single query)
-            user_items = (
-                supabase
-                .table('items')
-                .select('view_count')
-                .eq('seller_id', user_id)
-                .execute()
-            )
-
-            total_views = 0
-            if user_items.data:
-                for item in user_items.data:
-                    total_views += (item.get('view_count') or 0)
-
-            # 8. Engagement score → engagement rate (bounded 0‑100)
-            completed_deals_points = total_completed_deals * 10
-            likes_points = total_post_likes / 4.0    # Every 4 likes = 1 point
-            posts_points = total_posts * 5
-            views_points = total_views / 10.0        # Every 10 views = 1 point
-
-            total_points = completed_deals_points + \
-                likes_points + posts_points + views_points
-
-            max_possible_points = 200.0  # Represents 100% engagement
-            engagement_rate = 0.0
-            if max_possible_points > 0:
-                engagement_rate = min(
-                    (total_points / max_possible_points) * 100.0, 100.0)
-
-            # Debug logs (kept but more compact)
-            print("Dashboard user:", user_response.data)
-            print(
-                f"Dashboard stats -> active={active_listing.count}, "
-                f"sold={completed_meetups_seller.count}, earnings={total_earnings:.2f}, "
-                f"deals={total_completed_deals}, likes={total_post_likes}, "
-                f"posts={total_posts}, views={total_views}, "
-                f"engagement={engagement_rate:.1f}%"
-            )
+            user = user_response.data
+            stats = user.pop('user_stats', None)
+            # Older PostgREST versions embed one-to-one relations as a list
+            if isinstance(stats, list):
+                stats = stats[0] if stats else None
+
+            if not stats:
+                # First visit before the backfill ran: build this user's row now
+                supabase.rpc('rebuild_user_stats', {'p_user_id': user_id}).execute()
+                stats_response = (
+                    supabase
+                    .table('user_stats')
+                    .select(USER_STATS_COLUMNS)
+                    .eq('user_id', user_id)
+                    .execute()
+                )
+                stats = (stats_response.data or [{}])[0]
 
             return {
                 "success": True,
-                "user": user_response.data,
+                "user": user,
                 "stats": {
-                    "active_listings": active_listing.count or 0,
-                    "total_sales": completed_meetups_seller.count or 0,
-                    "total_earnings": total_earnings,
-                    "engagement_rate": round(engagement_rate, 1),
+                    "active_listings": stats.get('active_listings') or 0,
+                    "total_sales": stats.get('total_sales') or 0,
+                    "total_earnings": float(stats.get('total_earnings') or 0),
+                    "engagement_rate": float(stats.get('engagement_rate') or 0),
                 },
             }, 200
 
+        except InvalidFields as e:
+            return {"success": False, "message": str(e)}, 400
         except Exception as e:
             # Print the actual error for debugging
-            print(f"Service Error (get_dashboard_data): {e}")
+            logger.exception("Get dashboard data failed")
             return {"success": False, "message": str(e)}, 500
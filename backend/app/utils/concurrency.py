@@ -0,0 +1,92 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import Config
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Set inside pool threads so nested gather() calls run inline instead of
+# waiting on the same pool they occupy
+_in_pool = contextvars.ContextVar('fanout_in_pool', default=False)
+
+
+def _gevent_patched():
+    """Whether this worker runs on gevent (gunicorn's gevent worker patches threading)."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # Created lazily so forked gunicorn workers each get their own threads
+                _executor = ThreadPoolExecutor(max_workers=Config.FANOUT_WORKERS, thread_name_prefix='fanout')
+    return _executor
+
+
+def _run_in_pool(context, call):
+    def run():
+        _in_pool.set(True)
+        return call()
+    return context.run(run)
+
+
+def _gather_greenlets(calls):
+    import gevent
+
+    def run(context, call):
+        # Returned rather than raised, so gevent doesn't print each failure
+        try:
+            return None, _run_in_pool(context, call)
+        except Exception as error:
+            return error, None
+
+    greenlets = [gevent.spawn(run, contextvars.copy_context(), call) for call in calls]
+    gevent.joinall(greenlets)
+    outcomes = [greenlet.value for greenlet in greenlets]
+    for error, _ in outcomes:
+        if error is not None:
+            raise error
+    return [value for _, value in outcomes]
+
+
+def gather(*calls):
+    """Run independent blocking calls concurrently; return their results in order.
+
+    Each call is a zero-argument callable, typically one Supabase round
+    trip. A request that needs three unrelated reads waits for the slowest
+    one instead of all three in a row:
+
+        user, items = gather(
+            lambda: supabase.table('users')...execute(),
+            lambda: supabase.table('items')...execute(),
+        )
+
+    Under the gevent worker each call runs in its own greenlet, so the reads
+    overlap on the worker's event loop without a pool to queue behind;
+    otherwise they share a pool of FANOUT_WORKERS threads per worker.
+
+    Calls run with a copy of the caller's context, so their queries are
+    still counted against the current request (Server-Timing, /metrics). If
+    a call raises, the first exception in argument order is re-raised once
+    all calls have finished. FANOUT_WORKERS=1 runs everything in sequence.
+    """
+    if len(calls) < 2 or Config.FANOUT_WORKERS <= 1 or _in_pool.get():
+        return [call() for call in calls]
+    if _gevent_patched():
+        return _gather_greenlets(calls)
+
+    executor = _get_executor()
+    futures = [executor.submit(_run_in_pool, contextvars.copy_context(), call) for call in calls]
+    errors = [future.exception() for future in futures]
+    for error in errors:
+        if error is not None:
+            raise error
+    return [future.result() for future in futures]
@@ -0,0 +1,135 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BatchDispatcher:
+    """Hands write jobs to a background thread that stores them in batches.
+
+    `writer(jobs)` is called from the worker thread with up to `batch_size`
+    jobs at a time. The queue is bounded: when it is full, `submit` writes
+    the job synchronously in the caller's thread instead of growing memory
+    without limit, so a slow database pushes back on the request path rather
+    than losing work. Pending jobs are flushed when the process exits.
+    """
+
+    def __init__(self, writer, name='dispatcher', maxsize=1000, batch_size=50, flush_interval=0.5):
+        self.writer = writer
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+        self.overflowed = 0
+        self.batches = 0
+        self.max_depth = 0
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                # Started lazily so forked gunicorn workers each get their own thread
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+                atexit.register(self.shutdown)
+
+    def submit(self, job):
+        """Queue a job, or write it right away if the queue is full."""
+        self._ensure_started()
+        with self._lock:
+            self.submitted += 1
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.overflowed += 1
+            logger.warning("%s: queue full (%d), writing synchronously", self.name, self._queue.maxsize)
+            self._write([job])
+            return
+
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            with self._lock:
+                self.max_depth = max(self.max_depth, depth)
+
+    def _run(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._stopping:
+                    return
+                continue
+
+            batch = [job]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        try:
+            self.writer(batch)
+            with self._lock:
+                self.written += len(batch)
+                self.batches += 1
+            return
+        except Exception as e:
+            logger.warning("%s: batch of %d failed (%s), retrying one by one", self.name, len(batch), e)
+
+        # One bad job must not take the rest of the batch down with it
+        for job in batch:
+            try:
+                self.writer([job])
+                with self._lock:
+                    self.written += 1
+            except Exception:
+                logger.exception("%s: dropping job after error", self.name)
+                with self._lock:
+                    self.failed += 1
+
+    def flush(self, timeout=5.0):
+        """Wait until everything queued so far has been written."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return self._queue.unfinished_tasks == 0
+
+    def shutdown(self, timeout=5.0):
+        if self._thread is None:
+            return
+        flushed = self.flush(timeout)
+        self._stopping = True
+        if not flushed:
+            logger.warning("%s: %d jobs still pending at shutdown", self.name, self._queue.unfinished_tasks)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_maxsize": self._queue.maxsize,
+                "max_depth": self.max_depth,
+                "submitted": self.submitted,
+                "written": self.written,
+                "failed": self.failed,
+                "overflowed": self.overflowed,
+                "batches": self.batches,
+            }
@@ -0,0 +1,149 @@
+import importlib
+import logging
+import queue
+import threading
+from abc import ABC, abstractmethod
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One listener's mailbox on a broker channel.
+
+    Events are buffered in a bounded queue. If a slow client falls behind,
+    the oldest buffered event is dropped rather than blocking the publisher.
+    """
+
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def put(self, event):
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Wait up to `timeout` seconds for the next event, or return None."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker(ABC):
+    """Fan-out of small JSON-able events to everyone listening on a channel.
+
+    Channels are user ids. Implementations must provide `publish`,
+    `subscribe` and `unsubscribe`; a broker backed by an external pub/sub (so
+    events reach listeners connected to other workers) can deliver into the
+    same `Subscription` objects from its own listener thread.
+    """
+
+    @abstractmethod
+    def publish(self, channel, event):
+        """Deliver `event` to every subscriber of `channel`."""
+
+    @abstractmethod
+    def subscribe(self, channel):
+        """Return a new `Subscription` to `channel`."""
+
+    @abstractmethod
+    def unsubscribe(self, subscription):
+        """Stop delivering to `subscription`."""
+
+    def stats(self):
+        """Counters for /metrics; empty unless the broker has some."""
+        return {}
+
+
+class InProcessBroker(EventBroker):
+    """Delivers events to listeners in this worker process only."""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+        return len(subscribers)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.queue_size)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "channels": len(self._channels),
+                "subscribers": sum(len(subs) for subs in self._channels.values()),
+            }
+
+
+def _load_broker(spec):
+    # 'memory' or a 'package.module:ClassName' path to an EventBroker subclass
+    if spec == 'memory':
+        return InProcessBroker(queue_size=Config.EVENT_QUEUE_SIZE)
+    module_name, _, class_name = spec.partition(':')
+    broker_class = getattr(importlib.import_module(module_name), class_name)
+    if not (isinstance(broker_class, type) and issubclass(broker_class, EventBroker)):
+        raise TypeError(f"EVENT_BROKER {spec!r} is not an EventBroker subclass")
+    return broker_class()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = _load_broker(Config.EVENT_BROKER)
+    return _broker
+
+
+def set_broker(broker):
+    """Swap the broker, e.g. for a local stand-in in scripts or benchmarks."""
+    global _broker
+    _broker = broker
+
+
+def publish_event(user_id, event_type, data=None):
+    """Push an event to a user's open streams. Never raises: a failed push
+    must not fail the write that triggered it, clients resync on reconnect."""
+    if not user_id:
+        return
+    try:
+        get_broker().publish(user_id, {"type": event_type, "data": data or {}})
+    except Exception as e:
+        logger.exception("Publishing %s event failed", event_type)
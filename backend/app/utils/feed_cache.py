@@ -0,0 +1,214 @@
+import json
+import logging
+import threading
+import time
+
+from app.config import Config
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """Per-process backend. Each gunicorn worker keeps its own copy."""
+
+    def __init__(self, maxsize=512):
+        self._entries = TTLCache(maxsize=maxsize, ttl=Config.FEED_CACHE_TTL)
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, value, ttl):
+        self._entries.set(key, value)
+
+    def add(self, key, value, ttl):
+        # Single-flight locks are handled in-process by FeedCache already
+        return True
+
+    def delete(self, key):
+        self._entries.delete(key)
+
+    def generation(self, namespace):
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def bump_generation(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            return self._generations[namespace]
+
+    def stats(self):
+        return self._entries.stats()
+
+
+class RedisBackend:
+    """Backend shared by every worker through Redis or any server speaking
+    its protocol (KeyDB, Valkey, a local stand-in, ...). Requires the
+    optional `redis` package."""
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("FEED_CACHE_BACKEND=redis needs the `redis` package (pip install redis)")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self._client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(key, json.dumps(value, default=str), ex=max(1, int(ttl)))
+
+    def add(self, key, value, ttl):
+        return bool(self._client.set(key, json.dumps(value), ex=max(1, int(ttl)), nx=True))
+
+    def delete(self, key):
+        self._client.delete(key)
+
+    def generation(self, namespace):
+        return int(self._client.get(f"feedgen:{namespace}") or 0)
+
+    def bump_generation(self, namespace):
+        return self._client.incr(f"feedgen:{namespace}")
+
+    def stats(self):
+        return {}
+
+
+class FeedCache:
+    """Short-lived cache for responses that look the same to every viewer.
+
+    Keys live in namespaces ('marketplace', 'board', ...). `invalidate`
+    bumps the namespace's generation number, which is part of every key, so
+    all cached variants of a feed disappear at once without scanning keys.
+
+    Misses are coalesced (single-flight): while one request rebuilds a key,
+    concurrent requests for the same key wait for its result instead of
+    hitting the database too. With a shared backend a short lock key does
+    the same across workers.
+    """
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self.builds = 0
+        self.coalesced = 0
+
+    def _key_lock(self, key):
+        with self._locks_lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _release_key_lock(self, key, lock):
+        with self._locks_lock:
+            if self._locks.get(key) is lock and not lock.locked():
+                del self._locks[key]
+
+    def get_or_build(self, namespace, variant, builder):
+        """Return the cached value for (namespace, variant), building it with
+        `builder()` on a miss. A builder returning None is not cached.
+
+        Cached values may be shared between requests: treat them as
+        read-only and copy before changing anything per viewer.
+        """
+        try:
+            key = f"feed:{namespace}:{self.backend.generation(namespace)}:{variant}"
+            cached = self.backend.get(key)
+        except Exception as e:
+            logger.warning("Feed cache unavailable: %s", e)
+            return builder()
+        if cached is not None:
+            return cached
+
+        lock = self._key_lock(key)
+        if not lock.acquire(blocking=False):
+            # Another thread in this worker is already building this key
+            with lock:
+                self.coalesced += 1
+            cached = self.backend.get(key)
+            if cached is not None:
+                return cached
+            return self.get_or_build(namespace, variant, builder)
+
+        try:
+            cached = self._wait_for_other_worker(key)
+            if cached is not None:
+                return cached
+
+            try:
+                value = builder()
+                self.builds += 1
+                if value is not None:
+                    self.backend.set(key, value, self.ttl)
+                return value
+            finally:
+                self.backend.delete(f"{key}:lock")
+        finally:
+            lock.release()
+            self._release_key_lock(key, lock)
+
+    def _wait_for_other_worker(self, key, timeout=2.0):
+        # Returns the value another worker built, or None once we hold the lock
+        deadline = time.monotonic() + timeout
+        while not self.backend.add(f"{key}:lock", 1, timeout):
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.05)
+            cached = self.backend.get(key)
+            if cached is not None:
+                self.coalesced += 1
+                return cached
+        return None
+
+    def invalidate(self, *namespaces):
+        """Drop every cached variant in these namespaces (write-through)."""
+        for namespace in namespaces:
+            try:
+                self.backend.bump_generation(namespace)
+            except Exception as e:
+                logger.warning("Feed cache invalidation failed for %s: %s", namespace, e)
+
+    def stats(self):
+        return {"builds": self.builds, "coalesced": self.coalesced, **self.backend.stats()}
+
+
+class _NoCache:
+    """FEED_CACHE_BACKEND=none: always rebuild."""
+
+    def get_or_build(self, namespace, variant, builder):
+        return builder()
+
+    def invalidate(self, *namespaces):
+        pass
+
+    def stats(self):
+        return {}
+
+
+_feed_cache = None
+_feed_cache_lock = threading.Lock()
+
+
+def get_feed_cache():
+    global _feed_cache
+    if _feed_cache is None:
+        with _feed_cache_lock:
+            if _feed_cache is None:
+                if Config.FEED_CACHE_BACKEND == 'none':
+                    _feed_cache = _NoCache()
+                elif Config.FEED_CACHE_BACKEND == 'redis':
+                    _feed_cache = FeedCache(RedisBackend(Config.FEED_CACHE_URL), Config.FEED_CACHE_TTL)
+                else:
+                    _feed_cache = FeedCache(MemoryBackend(), Config.FEED_CACHE_TTL)
+    return _feed_cache
+
+
+def invalidate_feeds(*namespaces):
+    get_feed_cache().invalidate(*namespaces)
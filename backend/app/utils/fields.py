@@ -0,0 +1,63 @@
+class InvalidFields(ValueError):
+    """Raised when `?fields=` names a field the endpoint does not expose."""
+
+
+class Projection:
+    """The columns one request selects and the fields it returns."""
+
+    def __init__(self, fields, columns):
+        self.fields = fields
+        self.columns = ', '.join(columns)
+        # Selected only to compute other fields, removed by trim()
+        self.helpers = [column for column in columns if column not in fields]
+
+    def __contains__(self, field):
+        return field in self.fields
+
+    @property
+    def key(self):
+        """Stable text for cache keys."""
+        return ','.join(sorted(self.fields))
+
+    def trim(self, rows):
+        """Drop columns that were only selected to compute other fields."""
+        for row in rows:
+            for column in self.helpers:
+                row.pop(column, None)
+        return rows
+
+
+class FieldSet:
+    """Sparse fieldsets for one endpoint.
+
+    Clients pick the fields they render with `?fields=title,price`; any
+    name outside `allowed` is rejected. Without the parameter the lean
+    `default` is returned, so large columns (descriptions, notes, image
+    lists) only travel when asked for. `required` fields are always
+    included - ids and the columns keyset pagination sorts on.
+
+    `computed` maps fields the service derives after the query to the
+    columns they are built from, e.g. {'thumbnail': ('images',)}.
+    """
+
+    def __init__(self, allowed, default, required=('id',), computed=None):
+        self.computed = dict(computed or {})
+        self.allowed = tuple(dict.fromkeys((*required, *allowed, *self.computed)))
+        self.default = tuple(default)
+        self.required = tuple(required)
+
+    def resolve(self, fields=None):
+        """Projection for a raw `?fields=` value (None or '' for the default)."""
+        if fields:
+            requested = [name.strip() for name in fields.split(',') if name.strip()]
+            unknown = [name for name in requested if name not in self.allowed]
+            if unknown:
+                raise InvalidFields(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(self.allowed)}")
+        else:
+            requested = self.default
+
+        wanted = tuple(dict.fromkeys((*self.required, *requested)))
+        columns = []
+        for name in wanted:
+            columns.extend(self.computed.get(name, (name,)))
+        return Projection(frozenset(wanted), list(dict.fromkeys(columns)))
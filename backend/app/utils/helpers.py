@@ -0,0 +1,25 @@
+import uuid
+
+from app.extensions import get_supabase
+
+
+def is_uuid(value):
+    """True for a canonical UUID string, safe to put in a PostgREST filter."""
+    try:
+        return str(uuid.UUID(value)) == value.lower()
+    except (TypeError, ValueError, AttributeError):
+        return False
+
+
+def fetch_users_by_ids(user_ids, columns='id, first_name, last_name, profile_picture'):
+    """Fetch user rows for many ids in a single query, keyed by user id.
+
+    `columns` must include `id` so the rows can be matched back to their owner.
+    """
+    ids = list({user_id for user_id in user_ids if user_id})
+    if not ids:
+        return {}
+
+    supabase = get_supabase()
+    response = supabase.table('users').select(columns).in_('id', ids).execute()
+    return {row['id']: row for row in (response.data or [])}
@@ -0,0 +1,69 @@
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from flask import g, request
+
+# Common Cache-Control policies. Neither lets a cache serve a stored copy
+# without asking: a new reply or listing must show up on the next fetch.
+# Only content-addressed media is cached for a fixed time.
+# Same for every visitor; shared caches keep it but revalidate every use
+PUBLIC_REVALIDATE = 'public, no-cache'
+# Per-user data: the browser keeps a copy but revalidates it on every use,
+# which costs a 304 with no body when nothing changed
+PRIVATE_REVALIDATE = 'private, no-cache'
+
+
+def cache_policy(cache_control=PRIVATE_REVALIDATE, vary=None):
+    """Opt a GET route into conditional responses.
+
+    Successful responses get the given `Cache-Control` header and a strong
+    ETag computed from the body. A client sending a matching `If-None-Match`
+    (or an `If-Modified-Since` not older than `set_last_modified`) gets an
+    empty 304 instead. `vary` lists request headers the response depends
+    on, e.g. ('Authorization',) for views that change per user.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            g.cache_policy = (cache_control, vary)
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+
+def set_last_modified(value):
+    """Declare when the resource being served last changed (datetime or ISO string)."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return
+    g.last_modified = value
+
+
+def _make_conditional(response):
+    policy = g.get('cache_policy')
+    if (policy is None
+            or request.method not in ('GET', 'HEAD')
+            or response.status_code != 200
+            or response.is_streamed):
+        return response
+
+    cache_control, vary = policy
+    response.headers['Cache-Control'] = cache_control
+    for header in vary or ():
+        response.vary.add(header)
+
+    last_modified = g.get('last_modified')
+    if last_modified is not None:
+        response.last_modified = last_modified
+
+    response.set_etag(hashlib.sha256(response.get_data()).hexdigest()[:32])
+    # Compares If-None-Match / If-Modified-Since and turns the response
+    # into a bodiless 304 when the client's copy is still current
+    return response.make_conditional(request)
+
+
+def init_http_cache(app):
+    app.after_request(_make_conditional)
@@ -0,0 +1,440 @@
+import contextvars
+import hmac
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as _Tally
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# Metrics registry (Prometheus text format)
+# ============================================
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._values = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [0] * (len(self.buckets) + 2)
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                entry[index] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, entry in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, entry):
+                    cumulative += count
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {entry[-1]}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {round(entry[-2], 6)}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {entry[-1]}")
+        return lines
+
+
+HTTP_REQUESTS = Counter('acadswap_http_requests_total', 'HTTP requests handled.', ('method', 'route', 'status'))
+HTTP_DURATION = Histogram('acadswap_http_request_duration_seconds', 'Time spent handling a request.', ('route',))
+REQUEST_DB_CALLS = Histogram('acadswap_http_request_db_round_trips', 'Database round trips per request.', ('route',), COUNT_BUCKETS)
+DB_QUERIES = Counter('acadswap_db_queries_total', 'Supabase queries executed.', ('table', 'op', 'outcome'))
+DB_DURATION = Histogram('acadswap_db_query_duration_seconds', 'Supabase query latency.', ('table', 'op'))
+DB_ROWS = Counter('acadswap_db_rows_total', 'Rows returned by Supabase queries.', ('table', 'op'))
+N_PLUS_ONE = Counter('acadswap_n_plus_one_total', 'Requests that repeated one query shape more than N_PLUS_ONE_THRESHOLD times.', ('route', 'table'))
+
+_METRICS = (HTTP_REQUESTS, HTTP_DURATION, REQUEST_DB_CALLS, DB_QUERIES, DB_DURATION, DB_ROWS, N_PLUS_ONE)
+
+# name -> callable returning {stat: number}, rendered as gauges
+_collectors = {}
+
+
+def register_collector(name, collect):
+    """Expose a component's stats() dict as `acadswap_<name>_<stat>` gauges."""
+    _collectors[name] = collect
+
+
+def render_metrics():
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for name, collect in sorted(_collectors.items()):
+        try:
+            stats = collect() or {}
+        except Exception as e:
+            logger.warning("Metrics collector %s failed: %s", name, e)
+            continue
+        for stat, value in sorted(stats.items()):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric_name = f"acadswap_{name}_{stat}"
+            lines.append(f"# TYPE {metric_name} gauge")
+            lines.append(f"{metric_name} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+# ============================================
+# Request spans
+# ============================================
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def _call_site():
+    # Innermost frame in our own code (outside this module) that ran the query
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_APP_DIR) and filename != _THIS_FILE:
+            return f"{os.path.relpath(filename, _APP_DIR)}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+
+class QueryRecord:
+    __slots__ = ('table', 'op', 'shape', 'duration', 'rows', 'error', 'site')
+
+    def __init__(self, table, op, shape, duration, rows, error=False, site='unknown'):
+        self.table = table
+        self.op = op
+        self.shape = shape
+        self.duration = duration
+        self.rows = rows
+        self.error = error
+        self.site = site
+
+    @property
+    def signature(self):
+        """Table, operation and filter columns - identical for the same query
+        issued with different values."""
+        return f"{self.op} {self.table} {self.shape}".strip()
+
+
+class RequestSpan:
+    """Everything the database did on behalf of one HTTP request."""
+
+    MAX_QUERIES = 200
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.route = None
+        self.started = time.perf_counter()
+        self.db_calls = 0
+        self.db_time = 0.0
+        self.queries = []
+        self.repeats = _Tally()
+        # Queries fanned out with app.utils.concurrency.gather record from pool threads
+        self._lock = threading.Lock()
+
+    def record(self, query):
+        with self._lock:
+            self.db_calls += 1
+            self.db_time += query.duration
+            self.repeats[(query.signature, query.site, query.table)] += 1
+            if len(self.queries) < self.MAX_QUERIES:
+                self.queries.append(query)
+
+    def repeated(self, threshold):
+        """[(signature, call site, table, count)] for query shapes issued
+        from the same place more than `threshold` times - the N+1 pattern."""
+        return [
+            (signature, site, table, count)
+            for (signature, site, table), count in self.repeats.most_common()
+            if count > threshold
+        ]
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+_current_span = contextvars.ContextVar('request_span', default=None)
+
+
+def current_span():
+    return _current_span.get()
+
+
+def start_span(method, path):
+    span = RequestSpan(method, path)
+    return span, _current_span.set(span)
+
+
+def end_span(token):
+    _current_span.reset(token)
+
+
+# ============================================
+# Supabase client wrapper
+# ============================================
+
+_OPS = {'select', 'insert', 'update', 'upsert', 'delete'}
+_OR_TERMS = re.compile(r'([A-Za-z_][\w]*)\.(eq|neq|gt|gte|lt|lte|like|ilike|is|in|cs|cd|fts|plfts|phfts|wfts)\.')
+
+
+def _describe(method, args):
+    # Column names and operators only - never filter values
+    if method in _OPS:
+        return None
+    if method in ('or_', 'and_') and args:
+        terms = ','.join(f"{column}.{op}" for column, op in _OR_TERMS.findall(str(args[0])))
+        return f"{method.rstrip('_')}({terms})"
+    if method in ('limit', 'range', 'single', 'maybe_single', 'count'):
+        return method
+    if args and isinstance(args[0], str):
+        return f"{method.rstrip('_')}({args[0]})"
+    return method
+
+
+def _row_count(response):
+    data = getattr(response, 'data', None)
+    if isinstance(data, list):
+        return len(data)
+    return 0 if data is None else 1
+
+
+class _InstrumentedQuery:
+    """Proxy around a postgrest request builder that times `execute()`."""
+
+    def __init__(self, builder, table, op, shape):
+        self._builder = builder
+        self._table = table
+        self._op = op
+        self._shape = shape
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if name == 'execute':
+            return self._execute
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if not hasattr(result, 'execute'):
+                return result
+            op = name if name in _OPS else self._op
+            part = _describe(name, args)
+            shape = self._shape + ([part] if part else [])
+            return _InstrumentedQuery(result, self._table, op, shape)
+        return call
+
+    def _execute(self):
+        started = time.perf_counter()
+        error = False
+        response = None
+        try:
+            response = self._builder.execute()
+            return response
+        except Exception:
+            error = True
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            record_query(QueryRecord(
+                self._table, self._op, ' '.join(self._shape), duration,
+                _row_count(response) if response is not None else 0, error,
+                _call_site()
+            ))
+
+
+def record_query(query):
+    DB_QUERIES.inc(query.table, query.op, 'error' if query.error else 'ok')
+    DB_DURATION.observe(query.duration, query.table, query.op)
+    DB_ROWS.inc(query.table, query.op, amount=query.rows)
+
+    span = current_span()
+    if span is not None:
+        span.record(query)
+
+    for listener in list(_listeners):
+        listener(query)
+
+    if query.duration * 1000 >= Config.SLOW_QUERY_MS:
+        logger.warning("Slow query (%.0f ms, %d rows) at %s: %s",
+                       query.duration * 1000, query.rows, query.site, query.signature)
+
+
+# Callables receiving every QueryRecord, whatever request or thread ran it
+_listeners = []
+
+
+class QueryLog:
+    """Collects every query executed while the `with` block is active.
+
+        with QueryLog() as log:
+            client.get('/api/board/request')
+        assert log.count <= 3, log.summary()
+    """
+
+    def __init__(self):
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def _record(self, query):
+        with self._lock:
+            self.queries.append(query)
+
+    def __enter__(self):
+        _listeners.append(self._record)
+        return self
+
+    def __exit__(self, *exc):
+        _listeners.remove(self._record)
+        return False
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    def repeated(self, threshold):
+        """Query shapes issued from the same call site more than `threshold` times."""
+        tally = _Tally((query.signature, query.site) for query in self.queries)
+        return [(signature, site, count) for (signature, site), count in tally.most_common() if count > threshold]
+
+    def summary(self):
+        lines = [f"{self.count} queries:"]
+        tally = _Tally((query.signature, query.site) for query in self.queries)
+        for (signature, site), count in tally.most_common():
+            lines.append(f"  {count:>4} x {signature}  ({site})")
+        return '\n'.join(lines)
+
+
+class InstrumentedClient:
+    """Wraps the Supabase client so every table query and RPC is measured.
+
+    Only `table`/`from_`/`rpc` are intercepted; everything else (`auth`,
+    `storage`, ...) is passed straight through.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name):
+        return _InstrumentedQuery(self._client.table(name), name, 'select', [])
+
+    def from_(self, name):
+        return self.table(name)
+
+    def rpc(self, fn, params=None, *args, **kwargs):
+        builder = self._client.rpc(fn, params if params is not None else {}, *args, **kwargs)
+        return _InstrumentedQuery(builder, f"rpc:{fn}", 'rpc', [])
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# ============================================
+# Flask integration
+# ============================================
+
+def init_instrumentation(app):
+    """Time every request, count its DB round trips and serve /metrics."""
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_request_span():
+        g.request_span, g.request_span_token = start_span(request.method, request.path)
+
+    @app.after_request
+    def _finish_request_span(response):
+        span = g.get('request_span')
+        if span is None:
+            return response
+
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        span.route = route
+        elapsed = span.elapsed
+
+        HTTP_REQUESTS.inc(request.method, route, str(response.status_code))
+        HTTP_DURATION.observe(elapsed, route)
+        REQUEST_DB_CALLS.observe(span.db_calls, route)
+
+        # Visible in the browser's network panel
+        response.headers['Server-Timing'] = (
+            f'db;dur={span.db_time * 1000:.1f};desc="{span.db_calls} queries", '
+            f'total;dur={elapsed * 1000:.1f}'
+        )
+
+        # N+1 detection: the same query shape from the same line, over and over
+        for signature, site, table, count in span.repeated(Config.N_PLUS_ONE_THRESHOLD):
+            N_PLUS_ONE.inc(route, table)
+            logger.warning("Possible N+1 in %s %s: %d x %s at %s",
+                           request.method, route, count, signature, site)
+
+        if elapsed * 1000 >= Config.SLOW_REQUEST_MS:
+            logger.warning("Slow request %s %s: %.0f ms, %d queries (%.0f ms in db)",
+                           request.method, route, elapsed * 1000, span.db_calls, span.db_time * 1000)
+        return response
+
+    @app.teardown_request
+    def _end_request_span(exc):
+        token = g.pop('request_span_token', None)
+        if token is not None:
+            end_span(token)
+
+    @app.route('/metrics')
+    def metrics():
+        # Closed unless a token is configured: route names, volumes and
+        # queue depths are not for the public
+        if not Config.METRICS_TOKEN:
+            return Response("Not found\n", status=404, mimetype='text/plain')
+        supplied = request.headers.get('Authorization', '').replace('Bearer ', '') or request.args.get('token') or ''
+        if not hmac.compare_digest(supplied.encode(), Config.METRICS_TOKEN.encode()):
+            return Response("Forbidden\n", status=403, mimetype='text/plain')
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
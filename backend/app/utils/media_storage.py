@@ -0,0 +1,115 @@
+import os
+import tempfile
+import threading
+
+from app.config import Config
+
+# Stored objects are named by their content hash, so they never change
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class LocalStorage:
+    """Files under MEDIA_ROOT, served by the app itself from /media.
+
+    Development only: hosts like Render wipe the disk on every deploy.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    def path(self, key):
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError("Invalid media key")
+        return path
+
+    def exists(self, key):
+        return os.path.isfile(self.path(key))
+
+    def read(self, key):
+        with open(self.path(key), 'rb') as f:
+            return f.read()
+
+    def put(self, key, data, content_type):
+        path = self.path(key)
+        if os.path.isfile(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a half-written file is never served
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def url(self, key):
+        # Stored in database rows, so never built from the request's host
+        return f"{Config.MEDIA_BASE_URL.rstrip('/')}/{key}"
+
+
+class S3Storage:
+    """Any S3-compatible bucket, through `boto3` (in requirements.txt);
+    credentials come from the usual AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY."""
+
+    def __init__(self, bucket, endpoint_url=None, region=None):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("MEDIA_BACKEND=s3 needs the `boto3` package (pip install boto3)")
+        if not bucket or not Config.MEDIA_BASE_URL:
+            raise RuntimeError("MEDIA_BACKEND=s3 needs MEDIA_S3_BUCKET and MEDIA_BASE_URL (the bucket's public URL)")
+        self.bucket = bucket
+        self._client = boto3.client('s3', endpoint_url=endpoint_url, region_name=region)
+
+    def exists(self, key):
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except Exception:
+            return False
+
+    def read(self, key):
+        return self._client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+
+    def put(self, key, data, content_type):
+        # Content-addressed keys: uploading the same bytes twice is harmless
+        self._client.put_object(
+            Bucket=self.bucket, Key=key, Body=data,
+            ContentType=content_type, CacheControl=IMMUTABLE_CACHE_CONTROL
+        )
+
+    def url(self, key):
+        return f"{Config.MEDIA_BASE_URL.rstrip('/')}/{key}"
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def check_media_config():
+    """Refuse to start with storage that would lose or mislink uploads."""
+    if Config.MEDIA_BACKEND not in ('s3', 'local'):
+        raise RuntimeError(f"MEDIA_BACKEND must be 's3' or 'local', not {Config.MEDIA_BACKEND!r}")
+    if Config.MEDIA_BACKEND == 'local' and not Config.IS_DEVELOPMENT:
+        raise RuntimeError("MEDIA_BACKEND=local keeps uploads on the server's disk and is only for "
+                           "development (FLASK_ENV=development). Configure MEDIA_BACKEND=s3.")
+    if not Config.MEDIA_BASE_URL:
+        raise RuntimeError("Set MEDIA_BASE_URL to the public URL prefix of stored images")
+    # Fails now, not on the first upload, if the bucket settings or boto3 are missing
+    get_media_storage()
+
+
+def get_media_storage():
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                if Config.MEDIA_BACKEND == 's3':
+                    _storage = S3Storage(Config.MEDIA_S3_BUCKET, Config.MEDIA_S3_ENDPOINT, Config.MEDIA_S3_REGION)
+                else:
+                    _storage = LocalStorage(Config.MEDIA_ROOT)
+    return _storage
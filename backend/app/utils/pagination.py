@@ -0,0 +1,83 @@
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor token we did not issue."""
+
+
+def encode_cursor(row, sort_column='created_at'):
+    """Build an opaque cursor token pointing just past `row`."""
+    payload = {'v': row.get(sort_column), 'id': row.get('id')}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a cursor token into its (sort value, id) pair."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return payload['v'], payload['id']
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+
+
+def _quote(value):
+    # PostgREST logic trees need values with reserved characters
+    # (timestamps contain ':' and '+') wrapped in double quotes
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def apply_keyset(query, cursor, sort_column='created_at', desc=True):
+    """Order `query` by (sort_column, id) and resume after `cursor`.
+
+    Keyset pagination: instead of an OFFSET the database seeks directly to the
+    rows after the last one the client saw, so every page costs the same no
+    matter how deep the client scrolls, and new rows don't shift the pages.
+    """
+    query = query.order(sort_column, desc=desc).order('id', desc=desc)
+
+    if cursor:
+        query = query.or_(keyset_filter(cursor, sort_column, desc))
+
+    return query
+
+
+def keyset_filter(cursor, sort_column='created_at', desc=True):
+    """PostgREST logic for "rows after `cursor`" in (sort_column, id) order.
+
+    The terms of an `or`; wrap it as `or(...)` to combine it with other
+    conditions inside one `or_()` call.
+    """
+    value, last_id = decode_cursor(cursor)
+    op = 'lt' if desc else 'gt'
+    return (
+        f'{sort_column}.{op}.{_quote(value)},'
+        f'and({sort_column}.eq.{_quote(value)},id.{op}.{_quote(last_id)})'
+    )
+
+
+def clamp_page_size(limit, default, maximum):
+    """Coerce a client supplied page size into 1..maximum."""
+    if not limit or limit < 1:
+        return default
+    return min(limit, maximum)
+
+
+def paginate(query, cursor, limit, sort_column='created_at', desc=True):
+    """Run a keyset paginated query and return (rows, next_cursor).
+
+    One extra row is requested to learn whether another page exists, so the
+    client gets `next_cursor=None` on the last page without a count query.
+    """
+    query = apply_keyset(query, cursor, sort_column, desc)
+    response = query.limit(limit + 1).execute()
+    rows = response.data or []
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1], sort_column)
+
+    return rows, next_cursor
@@ -0,0 +1,799 @@
+"""In-memory stand-in for the Supabase client.
+
+Implements the part of the supabase-py / postgrest query builder the
+services use - select with embedded resources, filters, `or_` logic trees,
+order/limit, single(), count='exact', insert/update/upsert/delete and the
+project's RPC functions - over plain Python lists. Every execute() sleeps
+`latency` seconds (plus random jitter) to model the round trip to Supabase,
+so endpoints that make more round trips get slower exactly as they would
+in production.
+
+Database triggers are not emulated: counters such as requests.like_count
+and user_stats are computed when the data is seeded (see seed.py).
+"""
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+
+class FakeAPIError(Exception):
+    """Raised where PostgREST would answer with an error."""
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec='microseconds')
+
+
+# (table, column) -> referenced table. Embeds resolve through these, and
+# hints like `users!offers_buyer_id_fkey` name the "<table>_<column>_fkey"
+# constraint as PostgREST does.
+FOREIGN_KEYS = {
+    ('items', 'seller_id'): 'users',
+    ('offers', 'item_id'): 'items',
+    ('offers', 'buyer_id'): 'users',
+    ('offers', 'seller_id'): 'users',
+    ('messages', 'sender_id'): 'users',
+    ('messages', 'receiver_id'): 'users',
+    ('messages', 'item_id'): 'items',
+    ('messages', 'offer_id'): 'offers',
+    ('friendships', 'user_id'): 'users',
+    ('friendships', 'friend_id'): 'users',
+    ('user_stats', 'user_id'): 'users',
+    ('requests', 'user_id'): 'users',
+    ('request_replies', 'request_id'): 'requests',
+    ('request_replies', 'user_id'): 'users',
+    ('request_likes', 'request_id'): 'requests',
+    ('request_likes', 'user_id'): 'users',
+    ('meetups', 'item_id'): 'items',
+    ('meetups', 'seller_id'): 'users',
+    ('meetups', 'buyer_id'): 'users',
+    ('notifications', 'user_id'): 'users',
+    ('referrals', 'referrer_id'): 'users',
+    ('referrals', 'referred_id'): 'users',
+    ('reputation_history', 'user_id'): 'users',
+}
+
+# Tables keyed by something other than `id`
+PRIMARY_KEYS = {'user_stats': 'user_id'}
+
+# Generated tsvector columns -> the text columns they index
+TEXT_SEARCH_SOURCES = {('items', 'search_vector'): ('title', 'description')}
+
+
+def _split_top_level(text, sep=','):
+    """Split on `sep` outside parentheses and double quotes."""
+    parts, depth, quoted, current = [], 0, False, []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == '\\' and quoted and i + 1 < len(text):
+            current.append(text[i:i + 2])
+            i += 2
+            continue
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        if char == sep and depth == 0 and not quoted:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    tail = ''.join(current).strip()
+    if tail:
+        parts.append(tail)
+    return parts
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    return value
+
+
+def _parse_logic(text):
+    """Parse a PostgREST logic tree ("a.eq.1,and(b.lt.2,c.is.null)")."""
+    conditions = []
+    for part in _split_top_level(text):
+        for tree in ('and', 'or'):
+            if part.startswith(tree + '(') and part.endswith(')'):
+                conditions.append((tree, _parse_logic(part[len(tree) + 1:-1])))
+                break
+        else:
+            column, op, value = part.split('.', 2)
+            negate = op == 'not'
+            if negate:
+                op, value = value.split('.', 1)
+            if op == 'in':
+                value = [_unquote(v) for v in _split_top_level(value.strip('()'))]
+            else:
+                value = _unquote(value)
+            conditions.append(('filter', (column, op, value, negate)))
+    return conditions
+
+
+def _coerce(value, like):
+    """Turn a filter value sent as text into the type stored in the row."""
+    if not isinstance(value, str):
+        return value
+    if value == 'null':
+        return None
+    if isinstance(like, bool):
+        return value.lower() == 'true'
+    if isinstance(like, (int, float)):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _compare(stored, op, value):
+    if op == 'is':
+        value = _coerce(value, True) if value in ('true', 'false') else _coerce(value, None)
+        return stored is value or stored == value
+    if op == 'in':
+        return stored in [_coerce(v, stored) for v in value]
+    value = _coerce(value, stored)
+    if op == 'eq':
+        return stored == value
+    if op == 'neq':
+        return stored != value
+    if stored is None or value is None:
+        return False
+    if op in ('like', 'ilike'):
+        pattern = '^' + re.escape(value).replace('%', '.*').replace('_', '.') + '$'
+        return re.match(pattern, str(stored), re.I if op == 'ilike' else 0) is not None
+    try:
+        if op == 'gt':
+            return stored > value
+        if op == 'gte':
+            return stored >= value
+        if op == 'lt':
+            return stored < value
+        if op == 'lte':
+            return stored <= value
+    except TypeError:
+        return False
+    raise FakeAPIError(f"Unsupported operator: {op}")
+
+
+def _matches_tree(row, conditions, combine=all):
+    def check(condition):
+        kind, body = condition
+        if kind == 'and':
+            return _matches_tree(row, body, all)
+        if kind == 'or':
+            return _matches_tree(row, body, any)
+        column, op, value, negate = body
+        return _compare(row.get(column), op, value) != negate
+    return combine(check(condition) for condition in conditions)
+
+
+def websearch_matches(text, query):
+    """Rough websearch_to_tsquery: words must all appear ("or" separates
+    alternatives, a leading '-' excludes, quotes keep a phrase together)."""
+    text = (text or '').lower()
+    groups, current = [], []
+    for token in re.findall(r'-?"[^"]*"|\S+', query.lower()):
+        if token == 'or':
+            groups.append(current)
+            current = []
+        else:
+            current.append(token)
+    groups.append(current)
+
+    def group_matches(tokens):
+        for token in tokens:
+            negate = token.startswith('-')
+            word = token.lstrip('-').strip('"')
+            if word and (word in text) == negate:
+                return False
+        return True
+
+    return any(group_matches(tokens) for tokens in groups if tokens)
+
+
+class FakeQuery:
+    """One postgrest request being built; `execute()` runs it."""
+
+    def __init__(self, db, table):
+        self._db = db
+        self._table = table
+        self._op = 'select'
+        self._columns = '*'
+        self._count = None
+        self._values = None
+        self._on_conflict = None
+        self._filters = []
+        self._order = []
+        self._limit = None
+        self._offset = 0
+        self._single = False
+        self._maybe_single = False
+
+    # -- operations ---------------------------------------------------------
+    def select(self, columns='*', count=None, **_):
+        if self._op == 'select':
+            self._columns = columns
+        self._count = count
+        return self
+
+    def insert(self, values, **_):
+        self._op, self._values = 'insert', values
+        return self
+
+    def upsert(self, values, on_conflict=None, **_):
+        self._op, self._values, self._on_conflict = 'upsert', values, on_conflict
+        return self
+
+    def update(self, values, **_):
+        self._op, self._values = 'update', values
+        return self
+
+    def delete(self, **_):
+        self._op = 'delete'
+        return self
+
+    # -- filters ------------------------------------------------------------
+    def _filter(self, column, op, value, negate=False):
+        self._filters.append(('filter', (column, op, value, negate)))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column, value):
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column, value):
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column, value):
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column, value):
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column, value):
+        return self._filter(column, 'lte', value)
+
+    def like(self, column, pattern):
+        return self._filter(column, 'like', pattern)
+
+    def ilike(self, column, pattern):
+        return self._filter(column, 'ilike', pattern)
+
+    def is_(self, column, value):
+        return self._filter(column, 'is', 'null' if value is None else str(value).lower())
+
+    def in_(self, column, values):
+        return self._filter(column, 'in', list(values))
+
+    def or_(self, filters, reference_table=None):
+        self._filters.append(('or', _parse_logic(filters)))
+        return self
+
+    def text_search(self, column, query, options=None):
+        sources = TEXT_SEARCH_SOURCES.get((self._table, column), (column,))
+        self._filters.append(('search', (sources, query)))
+        return self
+
+    # -- modifiers ----------------------------------------------------------
+    def order(self, column, desc=False, nullsfirst=None, **_):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size, **_):
+        self._limit = size
+        return self
+
+    def range(self, start, end, **_):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    def maybe_single(self):
+        self._maybe_single = True
+        return self
+
+    # -- execution ----------------------------------------------------------
+    def _matches(self, row):
+        for kind, body in self._filters:
+            if kind == 'filter':
+                column, op, value, negate = body
+                if _compare(row.get(column), op, value) == negate:
+                    return False
+            elif kind == 'or':
+                if not _matches_tree(row, body, any):
+                    return False
+            elif kind == 'search':
+                sources, query = body
+                if not websearch_matches(' '.join(str(row.get(c) or '') for c in sources), query):
+                    return False
+        return True
+
+    def _candidates(self):
+        # Use the first top-level equality filter as an index lookup
+        for kind, body in self._filters:
+            if kind == 'filter' and body[1] == 'eq' and not body[3]:
+                return self._db.lookup(self._table, body[0], body[2])
+        return self._db.rows(self._table)
+
+    def _matching_rows(self):
+        return [row for row in self._candidates() if self._matches(row)]
+
+    def execute(self):
+        self._db.round_trip()
+        with self._db.lock:
+            return getattr(self, f'_execute_{self._op}')()
+
+    def _execute_select(self):
+        rows = self._matching_rows()
+        count = len(rows) if self._count else None
+
+        for column, desc in reversed(self._order):
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column) if r.get(column) is not None else 0),
+                      reverse=desc)
+        if self._offset:
+            rows = rows[self._offset:]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+
+        spec = self._db.parse_select(self._columns)
+        data = [self._db.project(self._table, row, spec) for row in rows]
+        return self._shape(data, count)
+
+    def _shape(self, data, count=None):
+        if self._single:
+            if len(data) != 1:
+                raise FakeAPIError(f"JSON object requested, multiple (or no) rows returned ({len(data)})")
+            return FakeResponse(data[0], count)
+        if self._maybe_single:
+            return FakeResponse(data[0] if data else None, count)
+        return FakeResponse(data, count)
+
+    def _execute_insert(self):
+        values = self._values if isinstance(self._values, list) else [self._values]
+        inserted = [self._db.insert(self._table, dict(row)) for row in values]
+        return self._shape([dict(row) for row in inserted])
+
+    def _execute_upsert(self):
+        key = self._on_conflict or PRIMARY_KEYS.get(self._table, 'id')
+        values = self._values if isinstance(self._values, list) else [self._values]
+        written = []
+        for row in values:
+            existing = self._db.lookup(self._table, key, row.get(key)) if row.get(key) is not None else []
+            if existing:
+                existing[0].update(row)
+                self._db.touch(self._table)
+                written.append(existing[0])
+            else:
+                written.append(self._db.insert(self._table, dict(row)))
+        return self._shape([dict(row) for row in written])
+
+    def _execute_update(self):
+        rows = self._matching_rows()
+        for row in rows:
+            row.update(self._values)
+        self._db.touch(self._table)
+        return self._shape([dict(row) for row in rows])
+
+    def _execute_delete(self):
+        rows = self._matching_rows()
+        self._db.remove(self._table, rows)
+        return self._shape([dict(row) for row in rows])
+
+
+class FakeRpc:
+    def __init__(self, db, fn, params):
+        self._db = db
+        self._fn = fn
+        self._params = params or {}
+
+    def execute(self):
+        self._db.round_trip()
+        implementation = self._db.rpcs.get(self._fn)
+        if implementation is None:
+            raise FakeAPIError(f"Could not find the function public.{self._fn}")
+        with self._db.lock:
+            return FakeResponse(implementation(self._db, self._params))
+
+
+class FakeAuth:
+    def get_user(self, token):
+        raise FakeAPIError("The stand-in has no auth server; set SUPABASE_JWT_SECRET to verify tokens locally")
+
+
+class FakeSupabase:
+    """Drop-in for the `supabase.Client` the app talks to.
+
+        db = FakeSupabase(latency=0.02, jitter=0.005, seed=42)
+        seed_database(db, users=2000, items=5000, messages=20000)
+        set_supabase(db)
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.tables = {}
+        self.rpcs = dict(RPCS)
+        self.lock = threading.RLock()
+        self.auth = FakeAuth()
+        self.round_trips = 0
+        self._random = random.Random(seed)
+        self._indexes = {}
+        self._select_cache = {}
+
+    # -- client API -----------------------------------------------------------
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, fn, params=None, **_):
+        return FakeRpc(self, fn, params)
+
+    # -- storage --------------------------------------------------------------
+    def round_trip(self):
+        with self.lock:
+            self.round_trips += 1
+            delay = self.latency + (self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def rows(self, table):
+        return self.tables.setdefault(table, [])
+
+    def lookup(self, table, column, value):
+        """Rows whose `column` equals `value`, through a lazily built hash index."""
+        index = self._indexes.get((table, column))
+        if index is None:
+            index = {}
+            for row in self.rows(table):
+                try:
+                    index.setdefault(row.get(column), []).append(row)
+                except TypeError:
+                    # Unhashable column (arrays): fall back to a scan
+                    return [row for row in self.rows(table) if row.get(column) == value]
+            self._indexes[(table, column)] = index
+        try:
+            return list(index.get(value, ()))
+        except TypeError:
+            return []
+
+    def touch(self, table):
+        """Forget the indexes of a table after its rows changed."""
+        for key in [key for key in self._indexes if key[0] == table]:
+            del self._indexes[key]
+
+    def insert(self, table, row):
+        key = PRIMARY_KEYS.get(table, 'id')
+        if key == 'id':
+            row.setdefault('id', str(uuid.uuid4()))
+        row.setdefault('created_at', now_iso())
+        self.rows(table).append(row)
+        self.touch(table)
+        return row
+
+    def load(self, table, rows):
+        """Bulk insert seeded rows as-is."""
+        self.rows(table).extend(rows)
+        self.touch(table)
+
+    def remove(self, table, rows):
+        doomed = {id(row) for row in rows}
+        self.tables[table] = [row for row in self.rows(table) if id(row) not in doomed]
+        self.touch(table)
+
+    # -- select projection ----------------------------------------------------
+    _EMBED = re.compile(r'^(?:(\w+):)?(\w+)(?:!(\w+))?\((.*)\)$', re.S)
+
+    def parse_select(self, columns):
+        spec = self._select_cache.get(columns)
+        if spec is None:
+            plain, embeds = [], []
+            for part in _split_top_level(columns or '*'):
+                embed = self._EMBED.match(part)
+                if embed:
+                    alias, target, hint, inner = embed.groups()
+                    embeds.append((alias or target, target, hint, self.parse_select(inner)))
+                else:
+                    plain.append(part.split(':')[-1].strip())
+            spec = self._select_cache[columns] = (plain, embeds)
+        return spec
+
+    def project(self, table, row, spec):
+        plain, embeds = spec
+        out = dict(row) if '*' in plain else {column: row.get(column) for column in plain}
+        for alias, target, hint, inner in embeds:
+            out[alias] = self._embed(table, row, target, hint, inner)
+        return out
+
+    def _embed(self, table, row, target, hint, inner):
+        column = None
+        if hint:
+            match = re.match(rf'^{table}_(\w+)_fkey$', hint)
+            column = match.group(1) if match else None
+        else:
+            forward = [c for (t, c), ref in FOREIGN_KEYS.items() if t == table and ref == target]
+            column = forward[0] if len(forward) == 1 else None
+
+        if column is not None:
+            # Many-to-one: the row points at one `target` row
+            value = row.get(column)
+            found = self.lookup(target, PRIMARY_KEYS.get(target, 'id'), value) if value is not None else []
+            return self.project(target, found[0], inner) if found else None
+
+        # One-to-many: `target` rows pointing back at this row
+        backward = [c for (t, c), ref in FOREIGN_KEYS.items() if t == target and ref == table]
+        if not backward:
+            raise FakeAPIError(f"Could not find a relationship between '{table}' and '{target}'")
+        children = self.lookup(target, backward[0], row.get(PRIMARY_KEYS.get(table, 'id')))
+        return [self.project(target, child, inner) for child in children]
+
+
+# ----------------------------------------------------------------------------
+# RPC functions (datas/*.sql), reimplemented over the in-memory tables
+# ----------------------------------------------------------------------------
+
+def _user_name(db, user_id):
+    found = db.lookup('users', 'id', user_id)
+    return (found[0].get('first_name'), found[0].get('last_name')) if found else (None, None)
+
+
+def rpc_get_board_feed(db, params):
+    viewer_id = params.get('viewer_id')
+    requests = sorted(db.lookup('requests', 'status', 'active'),
+                      key=lambda r: r.get('created_at') or '', reverse=True)
+    feed = []
+    for request in requests[:params.get('page_limit') or 100]:
+        likes = db.lookup('request_likes', 'request_id', request['id'])
+        first_name, last_name = _user_name(db, request.get('user_id'))
+        feed.append({
+            **request,
+            'user_first_name': first_name,
+            'user_last_name': last_name,
+            'reply_count': len(db.lookup('request_replies', 'request_id', request['id'])),
+            'like_count': len(likes),
+            'liked_by_me': viewer_id is not None and any(l.get('user_id') == viewer_id for l in likes),
+        })
+    return feed
+
+
+def rpc_get_inbox(db, params):
+    user_id = params['p_user_id']
+    latest = {}
+    for message in db.lookup('messages', 'sender_id', user_id) + db.lookup('messages', 'receiver_id', user_id):
+        partner = message['receiver_id'] if message['sender_id'] == user_id else message['sender_id']
+        if partner not in latest or message['created_at'] > latest[partner]['created_at']:
+            latest[partner] = message
+    unread = Counter(m['sender_id'] for m in db.lookup('messages', 'receiver_id', user_id) if not m.get('is_read'))
+
+    rows = []
+    for partner, message in latest.items():
+        found = db.lookup('users', 'id', partner)
+        user = found[0] if found else {}
+        rows.append({
+            'other_user_id': partner,
+            'last_message': message.get('message'),
+            'last_message_time': message['created_at'],
+            'first_name': user.get('first_name'),
+            'last_name': user.get('last_name'),
+            'profile_picture': user.get('profile_picture'),
+            'unread_count': unread.get(partner, 0),
+        })
+    rows.sort(key=lambda r: (r['last_message_time'], r['other_user_id']), reverse=True)
+
+    before_time, before_partner = params.get('before_time'), params.get('before_partner')
+    if before_time:
+        rows = [r for r in rows if (r['last_message_time'], r['other_user_id']) < (before_time, before_partner or '')]
+    # LIMIT NULL (an explicit null page_limit) returns every row, as in Postgres
+    page_limit = params.get('page_limit', 20)
+    return rows if page_limit is None else rows[:page_limit]
+
+
+def _search_user_rows(db, q, course, year, exclude_id):
+    term = (q or '').strip().lower()
+    results = []
+    for user in db.rows('users'):
+        if exclude_id and user['id'] == exclude_id:
+            continue
+        if course and user.get('course') != course:
+            continue
+        if year and user.get('current_year') != year:
+            continue
+        names = [(user.get(c) or '').lower() for c in ('first_name', 'last_name', 'email')]
+        prefix = any(name.startswith(term) for name in names)
+        if term and len(term) < 3 and not prefix:
+            continue
+        haystack = ' '.join(names + [(user.get('course') or '').lower()])
+        if term and len(term) >= 3 and term not in haystack:
+            continue
+        rank = 0.0 if not term else (1.0 if prefix else 0.0) + len(term) / max(len(haystack), 1)
+        results.append((rank, user))
+    results.sort(key=lambda pair: (-pair[0], pair[1].get('first_name') or '', pair[1].get('last_name') or '', pair[1]['id']))
+    return results
+
+
+def rpc_search_users(db, params):
+    columns = ('id', 'first_name', 'last_name', 'email', 'course', 'current_year', 'block_section',
+               'profile_picture', 'profile_completed', 'reputation_score')
+    rows = _search_user_rows(db, params.get('q'), params.get('p_course'), params.get('p_year'), params.get('exclude_id'))
+    limit = params.get('page_limit')
+    return [{**{c: user.get(c) for c in columns}, 'rank': rank} for rank, user in rows[:limit]]
+
+
+def _facet(values):
+    return [{'value': value, 'count': n}
+            for value, n in sorted(Counter(values).items(), key=lambda pair: (-pair[1], str(pair[0])))]
+
+
+def rpc_search_user_facets(db, params):
+    matches = [user for _, user in _search_user_rows(db, params.get('q'), None, None, params.get('exclude_id'))]
+    course, year = params.get('p_course'), params.get('p_year')
+    years = Counter(u.get('current_year') for u in matches if not course or u.get('course') == course)
+    return {
+        'courses': _facet(u.get('course') for u in matches if not year or u.get('current_year') == year),
+        'years': [{'value': value, 'count': n} for value, n in sorted(years.items(), key=lambda p: str(p[0]))],
+    }
+
+
+def rpc_marketplace_facets(db, params):
+    q = (params.get('q') or '').strip()
+    matches = [item for item in db.lookup('items', 'status', 'active')
+               if not q or websearch_matches(f"{item.get('title') or ''} {item.get('description') or ''}", q)]
+    filters = {
+        'category': params.get('p_category'),
+        'subcategory': params.get('p_subcategory'),
+        'condition': params.get('p_condition'),
+        'size': params.get('p_size'),
+    }
+    min_price, max_price = params.get('p_min_price'), params.get('p_max_price')
+
+    def passes(item, skip, check_price=True):
+        for column, value in filters.items():
+            if column != skip and value is not None and item.get(column) != value:
+                return False
+        if check_price:
+            if min_price is not None and float(item.get('price') or 0) < min_price:
+                return False
+            if max_price is not None and float(item.get('price') or 0) > max_price:
+                return False
+        return True
+
+    def facet(column, skip_nulls=False):
+        return _facet(item.get(column) for item in matches
+                      if passes(item, column) and not (skip_nulls and item.get(column) is None))
+
+    prices = [float(item.get('price') or 0) for item in matches if passes(item, None, check_price=False)]
+    return {
+        'categories': facet('category'),
+        'subcategories': facet('subcategory', True),
+        'conditions': facet('condition'),
+        'sizes': facet('size', True),
+        'price': {'min': min(prices) if prices else None, 'max': max(prices) if prices else None},
+    }
+
+
+def compute_user_stats(db, user_id):
+    items = db.lookup('items', 'seller_id', user_id)
+    sales = [m for m in db.lookup('meetups', 'seller_id', user_id) if m.get('status') == 'completed']
+    bought = [m for m in db.lookup('meetups', 'buyer_id', user_id) if m.get('status') == 'completed']
+    posts = db.lookup('requests', 'user_id', user_id)
+    post_likes = sum(len(db.lookup('request_likes', 'request_id', post['id'])) for post in posts)
+    views = sum(item.get('view_count') or 0 for item in items)
+    earnings = 0.0
+    for meetup in sales:
+        sold = db.lookup('items', 'id', meetup.get('item_id'))
+        earnings += float(sold[0].get('price') or 0) if sold else 0
+    deals = len(sales) + len(bought)
+    engagement = round(100.0 * (deals + post_likes) / max(len(posts) + views, 1), 1)
+    return {
+        'user_id': user_id,
+        'active_listings': sum(1 for item in items if item.get('status') == 'active'),
+        'total_sales': len(sales),
+        'total_earnings': earnings,
+        'completed_deals': deals,
+        'total_posts': len(posts),
+        'total_post_likes': post_likes,
+        'total_views': views,
+        'engagement_rate': min(engagement, 100.0),
+        'updated_at': now_iso(),
+    }
+
+
+def rpc_rebuild_user_stats(db, params):
+    user_ids = [params['p_user_id']] if params.get('p_user_id') else [u['id'] for u in db.rows('users')]
+    existing = {row['user_id']: row for row in db.rows('user_stats')}
+    for user_id in user_ids:
+        stats = compute_user_stats(db, user_id)
+        if user_id in existing:
+            existing[user_id].update(stats)
+        else:
+            db.rows('user_stats').append(stats)
+    db.touch('user_stats')
+    return len(user_ids)
+
+
+def rpc_apply_reputation_changes(db, params):
+    results = []
+    used = {row.get('idempotency_key') for row in db.rows('reputation_history') if row.get('idempotency_key')}
+    for change in params.get('changes') or []:
+        found = db.lookup('users', 'id', change['user_id'])
+        applied = bool(found) and change.get('idempotency_key') not in used
+        if applied:
+            found[0]['reputation_score'] = (found[0].get('reputation_score') or 0) + change['amount']
+            db.insert('reputation_history', {
+                'user_id': change['user_id'],
+                'meetup_id': change.get('meetup_id'),
+                'change_amount': change['amount'],
+                'reason': change['reason'],
+                'idempotency_key': change.get('idempotency_key'),
+            })
+            used.add(change.get('idempotency_key'))
+        results.append({
+            'user_id': change['user_id'],
+            'applied': applied,
+            'reputation_score': found[0].get('reputation_score') if found else None,
+        })
+    return results
+
+
+def rpc_reconcile_request_counters(db, params):
+    fixed = 0
+    for request in db.rows('requests'):
+        replies = len(db.lookup('request_replies', 'request_id', request['id']))
+        likes = len(db.lookup('request_likes', 'request_id', request['id']))
+        if request.get('reply_count') != replies or request.get('like_count') != likes:
+            request['reply_count'], request['like_count'] = replies, likes
+            fixed += 1
+    return fixed
+
+
+def rpc_generate_referral_code(db, params):
+    prefix = ((params.get('user_first_name') or 'X')[:1] + (params.get('user_last_name') or 'X')[:1]).upper()
+    return f"{prefix}{uuid.uuid4().hex[:6].upper()}"
+
+
+def rpc_process_referral_reward(db, params):
+    found = db.lookup('users', 'id', params['referrer_uuid'])
+    if found:
+        found[0]['total_referrals'] = (found[0].get('total_referrals') or 0) + 1
+    db.insert('referrals', {
+        'referrer_id': params['referrer_uuid'],
+        'referred_id': params['referred_uuid'],
+        'referral_code': params.get('ref_code'),
+        'reward_given': True,
+    })
+    return True
+
+
+RPCS = {
+    'get_board_feed': rpc_get_board_feed,
+    'get_inbox': rpc_get_inbox,
+    'search_users': rpc_search_users,
+    'search_user_facets': rpc_search_user_facets,
+    'marketplace_facets': rpc_marketplace_facets,
+    'rebuild_user_stats': rpc_rebuild_user_stats,
+    'apply_reputation_changes': rpc_apply_reputation_changes,
+    'reconcile_request_counters': rpc_reconcile_request_counters,
+    'generate_referral_code': rpc_generate_referral_code,
+    'process_referral_reward': rpc_process_referral_reward,
+}
@@ -0,0 +1,409 @@
+"""Load test: weighted campus user journeys against the app under gunicorn.
+
+    cd backend
+    pip install -r requirements.txt
+    # Start gunicorn on the seeded stand-in, run for 2 minutes, stop it
+    python -m benchmarks.loadtest --spawn --concurrency 100 --ramp-up 30 --duration 120
+
+    # Or target a server you started yourself (same BENCH_* settings/seed)
+    gunicorn benchmarks.serve:app --worker-class gevent --workers 1 --worker-connections 1000 -b 127.0.0.1:8000
+    python -m benchmarks.loadtest --target http://127.0.0.1:8000
+
+Each virtual user signs in as one of the seeded users and loops over
+journeys picked by weight (--weights browse=40,board=20,...), pausing for
+an exponentially distributed think time between steps. The report gives
+throughput, error rates and latency percentiles per route, counted over the
+steady-state window after ramp-up.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import quote, urlsplit
+
+from benchmarks.run import BENCH_SECRET, percentile, sign_token
+
+SEARCH_TERMS = ['calculator', 'book', 'lab gown', 'uniform', 'reviewer', 'laptop', 'drafting', 'novel']
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Recorder:
+    """Thread-safe sample store: (finished_at, route, latency ms, status)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []
+
+    def record(self, route, latency_ms, status):
+        with self._lock:
+            self.samples.append((time.monotonic(), route, latency_ms, status))
+
+    def summarize(self, window_start, window_end):
+        window = max(window_end - window_start, 1e-9)
+        by_route = defaultdict(list)
+        per_second = defaultdict(int)
+        for finished_at, route, latency_ms, status in self.samples:
+            if window_start <= finished_at <= window_end:
+                by_route[route].append((latency_ms, status))
+                per_second[int(finished_at - window_start)] += 1
+
+        routes = {}
+        for route, samples in sorted(by_route.items()):
+            latencies = sorted(latency for latency, _ in samples)
+            errors = sum(1 for _, status in samples if status is None or status >= 500)
+            routes[route] = {
+                'requests': len(samples),
+                'rps': round(len(samples) / window, 2),
+                'client_errors': sum(1 for _, status in samples if status is not None and 400 <= status < 500),
+                'errors': errors,
+                'error_rate': round(errors / len(samples), 4),
+                'p50_ms': round(percentile(latencies, 50), 1),
+                'p95_ms': round(percentile(latencies, 95), 1),
+                'p99_ms': round(percentile(latencies, 99), 1),
+                'max_ms': round(latencies[-1], 1),
+            }
+
+        total = sum(r['requests'] for r in routes.values())
+        total_errors = sum(r['errors'] for r in routes.values())
+        return {
+            'window_s': round(window, 1),
+            'requests': total,
+            'rps': round(total / window, 2),
+            'peak_rps': max(per_second.values()) if per_second else 0,
+            'errors': total_errors,
+            'error_rate': round(total_errors / total, 4) if total else 0.0,
+            'routes': routes,
+        }
+
+
+class Session:
+    """One virtual user's keep-alive connection to the server."""
+
+    # Tokens are signed like benchmarks.serve expects (SUPABASE_JWT_SECRET)
+    secret = BENCH_SECRET
+
+    def __init__(self, target, recorder, rng, think_ms, timeout=30):
+        parts = urlsplit(target)
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self._netloc = parts.netloc
+        self._recorder = recorder
+        self._rng = rng
+        self._think_ms = think_ms
+        self._timeout = timeout
+        self._tokens = {}
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = self._connection_class(self._netloc, timeout=self._timeout)
+        return self._connection
+
+    def _token(self, user_id):
+        token = self._tokens.get(user_id)
+        if token is None:
+            token = self._tokens[user_id] = sign_token(user_id, self.secret)
+        return token
+
+    def request(self, route, method, path, user_id, body=None):
+        """Send one request; returns the decoded JSON body (or None)."""
+        headers = {'Authorization': f"Bearer {self._token(user_id)}"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+
+        started = time.perf_counter()
+        try:
+            try:
+                reused = self._connection is not None
+                response, raw = self._send(method, path, payload, headers)
+            except (ConnectionResetError, BrokenPipeError, http.client.RemoteDisconnected):
+                if not reused:
+                    raise
+                # The server closed the idle keep-alive connection (gunicorn's
+                # --keep-alive is 2s); reconnect and resend like a browser does
+                self.close()
+                started = time.perf_counter()
+                response, raw = self._send(method, path, payload, headers)
+        except (OSError, http.client.HTTPException):
+            self._recorder.record(route, (time.perf_counter() - started) * 1000, None)
+            self.close()
+            return None
+        self._recorder.record(route, (time.perf_counter() - started) * 1000, response.status)
+
+        if response.getheader('Content-Type', '').startswith('application/json') and raw:
+            try:
+                return json.loads(raw)
+            except ValueError:
+                return None
+        return None
+
+    def think(self):
+        if self._think_ms > 0:
+            time.sleep(self._rng.expovariate(1000 / self._think_ms))
+
+    def _send(self, method, path, payload, headers):
+        connection = self._connect()
+        connection.request(method, path, body=payload, headers=headers)
+        response = connection.getresponse()
+        return response, response.read()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+# ----------------------------------------------------------------------------
+# Journeys: (session, rng, me, pool) -> None, each a short sequence of the
+# calls the frontend makes for one user action
+# ----------------------------------------------------------------------------
+
+def browse_marketplace(s, rng, me, pool):
+    page = s.request('GET /api/marketplace/items', 'GET', '/api/marketplace/items?limit=20', me) or {}
+    if page.get('next_cursor') and rng.random() < 0.5:
+        s.think()
+        s.request('GET /api/marketplace/items', 'GET',
+                  f"/api/marketplace/items?limit=20&cursor={quote(page['next_cursor'])}", me)
+    s.think()
+    s.request('GET /api/marketplace/search', 'GET',
+              f"/api/marketplace/search?q={quote(rng.choice(SEARCH_TERMS))}", me)
+
+
+def open_board(s, rng, me, pool):
+    feed = (s.request('GET /api/board/request', 'GET', '/api/board/request', me) or {}).get('data') or []
+    if not feed:
+        return
+    post = rng.choice(feed[:20])
+    s.think()
+    s.request('GET /api/board/requests/<request_id>/replies', 'GET', f"/api/board/requests/{post['id']}/replies", me)
+    if rng.random() < 0.2:
+        s.request('POST /api/board/requests/<request_id>/like', 'POST', f"/api/board/requests/{post['id']}/like", me)
+
+
+def poll_notifications(s, rng, me, pool):
+    s.request('GET /api/notifications/', 'GET', '/api/notifications/', me)
+    s.request('GET /api/offer/unread-count', 'GET', '/api/offer/unread-count', me)
+
+
+def send_messages(s, rng, me, pool):
+    inbox = (s.request('GET /api/offer/conversations', 'GET', '/api/offer/conversations', me) or {})
+    conversations = inbox.get('conversations') or []
+    partner = conversations[0].get('other_user_id') if conversations and rng.random() < 0.7 else None
+    partner = partner or rng.choice([user for user in pool if user != me])
+    s.think()
+    thread = s.request('GET /api/offer/messages/<other_user_id>', 'GET', f"/api/offer/messages/{partner}", me) or {}
+    cursor = thread.get('sync_cursor')
+    s.think()
+    s.request('POST /api/offer/message/send', 'POST', '/api/offer/message/send', me,
+              {'receiver_id': partner, 'message': rng.choice(['Still available?', 'Can we meet tomorrow?', 'Thanks!'])})
+    if cursor:
+        # The open chat keeps polling for newer messages, mostly getting a 204
+        for _ in range(rng.randint(1, 3)):
+            synced = s.request('GET /api/offer/messages/<other_user_id>?after', 'GET',
+                               f"/api/offer/messages/{partner}?after={quote(cursor)}", me) or {}
+            cursor = synced.get('sync_cursor') or cursor
+            s.think()
+
+
+def make_offer(s, rng, me, pool):
+    items = (s.request('GET /api/marketplace/items', 'GET', '/api/marketplace/items?limit=20', me) or {}).get('data') or []
+    candidates = [item for item in items if item.get('seller_id') != me]
+    if not candidates:
+        return
+    item = rng.choice(candidates)
+    s.think()
+    s.request('POST /api/offer/create', 'POST', '/api/offer/create', me, {
+        'item_id': item['id'],
+        'offer_amount': round(float(item.get('price') or 100) * rng.uniform(0.6, 0.95), 2),
+        'message': 'Would you take this?',
+    })
+    s.request('GET /api/offer/received', 'GET', '/api/offer/received', item['seller_id'])
+
+
+def complete_meetup(s, rng, me, pool):
+    buyer = rng.choice([user for user in pool if user != me])
+    created = s.request('POST /api/meetup/create', 'POST', '/api/meetup/create', me, {
+        'buyer_id': buyer,
+        'title': 'Item handover',
+        'scheduled_date': time.strftime('%Y-%m-%d'),
+        'scheduled_time': '14:00:00',
+        'location_name': rng.choice(['Library', 'Canteen', 'Main Gate']),
+    }) or {}
+    rows = created.get('data') or []
+    meetup_id = rows[0].get('id') if isinstance(rows, list) and rows else None
+    if not meetup_id:
+        return
+    s.think()
+    s.request('PUT /api/meetup/<meetup_id>/accept', 'PUT', f"/api/meetup/{meetup_id}/accept", buyer)
+    s.think()
+    s.request('PUT /api/meetup/<meetup_id>/complete', 'PUT', f"/api/meetup/{meetup_id}/complete", buyer)
+    s.request('GET /api/meetup/my-meetups', 'GET', '/api/meetup/my-meetups', me)
+
+
+JOURNEYS = {
+    'browse': browse_marketplace,
+    'board': open_board,
+    'notifications': poll_notifications,
+    'messages': send_messages,
+    'offer': make_offer,
+    'meetup': complete_meetup,
+}
+
+DEFAULT_WEIGHTS = 'browse=35,board=20,notifications=25,messages=12,offer=5,meetup=3'
+
+
+def parse_weights(text):
+    weights = {}
+    for part in filter(None, text.split(',')):
+        name, _, weight = part.partition('=')
+        if name not in JOURNEYS:
+            raise SystemExit(f"Unknown journey '{name}'. Choose from: {', '.join(JOURNEYS)}")
+        weights[name] = float(weight)
+    return weights
+
+
+def user_pool(args):
+    """The seeded user ids, recomputed from the same seed the server used."""
+    from benchmarks.fake_supabase import FakeSupabase
+    from benchmarks.seed import seed_database
+
+    fixtures = seed_database(FakeSupabase(), users=args.users, items=0, messages=0, requests=0, seed=args.seed)
+    ids = fixtures['user_ids']
+    # Heavy users first: they are the ones with busy inboxes and listings
+    return (fixtures['heavy_users'] + ids)[:args.pool]
+
+
+def virtual_user(index, args, recorder, pool, weights, start_at, stop_at):
+    time.sleep(max(0.0, start_at - time.monotonic()))
+    rng = random.Random(args.seed * 1000 + index)
+    session = Session(args.target, recorder, rng, args.think_ms)
+    me = pool[index % len(pool)]
+    names, chances = list(weights), list(weights.values())
+    try:
+        while time.monotonic() < stop_at:
+            JOURNEYS[rng.choices(names, chances)[0]](session, rng, me, pool)
+            session.think()
+    finally:
+        session.close()
+
+
+def spawn_gunicorn(args):
+    """Start `gunicorn benchmarks.serve:app` like render.yaml does and wait until it answers."""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+
+    env = dict(os.environ,
+               BENCH_USERS=str(args.users), BENCH_SEED=str(args.seed),
+               BENCH_LATENCY_MS=str(args.latency_ms), BENCH_COLD='1' if args.cold else '0')
+    command = [sys.executable, '-m', 'gunicorn', 'benchmarks.serve:app',
+               '--bind', f'127.0.0.1:{port}', '--worker-class', 'gevent',
+               '--workers', str(args.workers), '--worker-connections', str(args.worker_connections),
+               '--log-level', 'warning']
+    print(f"Starting: {' '.join(command[2:])}")
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"gunicorn exited with code {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/')
+            if connection.getresponse().status == 200:
+                return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise SystemExit("gunicorn did not come up within 120s")
+
+
+def report(summary):
+    print(f"\nSteady state: {summary['window_s']}s, {summary['requests']} requests, "
+          f"{summary['rps']} req/s (peak {summary['peak_rps']}/s), "
+          f"{summary['errors']} errors ({summary['error_rate']:.2%})\n")
+    routes = summary['routes']
+    width = max((len(route) for route in routes), default=10)
+    header = (f"{'route':<{width}}  {'reqs':>6}  {'req/s':>7}  {'4xx':>5}  {'err%':>6}"
+              f"  {'p50':>7}  {'p95':>7}  {'p99':>7}  {'max':>7}")
+    print(header)
+    print('-' * len(header))
+    for route, r in routes.items():
+        print(f"{route:<{width}}  {r['requests']:>6}  {r['rps']:>7.2f}  {r['client_errors']:>5}  "
+              f"{r['error_rate']:>6.2%}  {r['p50_ms']:>7.1f}  {r['p95_ms']:>7.1f}  {r['p99_ms']:>7.1f}  {r['max_ms']:>7.1f}")
+    print("\nLatencies in ms. err% counts 5xx and connection failures; 4xx are listed separately.")
+
+
+def run(args):
+    weights = parse_weights(args.weights)
+    pool = user_pool(args)
+
+    process = None
+    if args.spawn:
+        process, args.target = spawn_gunicorn(args)
+    try:
+        recorder = Recorder()
+        started = time.monotonic()
+        steady_from = started + args.ramp_up
+        stop_at = steady_from + args.duration
+        print(f"{args.concurrency} virtual users against {args.target}: "
+              f"{args.ramp_up}s ramp-up, {args.duration}s steady state")
+
+        threads = [
+            threading.Thread(
+                target=virtual_user,
+                args=(n, args, recorder, pool, weights, started + args.ramp_up * n / args.concurrency, stop_at),
+                daemon=True,
+            )
+            for n in range(args.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        summary = recorder.summarize(steady_from, stop_at)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    report(summary)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'settings': vars(args), 'summary': summary}, f, indent=2)
+        print(f"Saved to {args.json}")
+    return 1 if summary['error_rate'] > args.max_error_rate else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', default='http://127.0.0.1:8000')
+    parser.add_argument('--spawn', action='store_true', help='start gunicorn on benchmarks.serve:app for the run')
+    parser.add_argument('--workers', type=int, default=1, help='gunicorn workers with --spawn')
+    parser.add_argument('--worker-connections', type=int, default=1000, help='gunicorn connections per worker with --spawn')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='stand-in round trip latency with --spawn')
+    parser.add_argument('--cold', action='store_true', help='disable the app caches with --spawn')
+    parser.add_argument('--concurrency', type=int, default=50, help='virtual users')
+    parser.add_argument('--ramp-up', type=float, default=10.0, help='seconds to start all virtual users')
+    parser.add_argument('--duration', type=float, default=60.0, help='steady-state seconds after ramp-up')
+    parser.add_argument('--think-ms', type=float, default=500.0, help='mean pause between steps')
+    parser.add_argument('--weights', default=DEFAULT_WEIGHTS)
+    parser.add_argument('--users', type=int, default=2000, help='must match the server (BENCH_USERS)')
+    parser.add_argument('--seed', type=int, default=42, help='must match the server (BENCH_SEED)')
+    parser.add_argument('--pool', type=int, default=200, help='distinct seeded users to act as')
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help='exit 1 above this error rate')
+    parser.add_argument('--json', help='write the summary to this file')
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
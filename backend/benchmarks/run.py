@@ -0,0 +1,231 @@
+"""Endpoint benchmarks against the in-memory Supabase stand-in.
+
+    cd backend
+    python -m benchmarks.run                       # defaults below
+    python -m benchmarks.run --latency-ms 40 --only offer,board
+    python -m benchmarks.run --json before.json    # save a baseline...
+    python -m benchmarks.run --compare before.json # ...and diff against it
+
+The Flask app runs in-process through its test client, with every
+Supabase call served by benchmarks/fake_supabase.py after a simulated
+network round trip. Numbers are reproducible for a given --seed.
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+import sys
+import time
+
+BENCH_SECRET = 'benchmark-jwt-secret'
+
+# (blueprint, method, path, json body). Placeholders are filled from the
+# ids returned by seed_database(); every request is made as the seeded
+# `viewer`, one of the heaviest users.
+ENDPOINTS = [
+    ('user', 'GET', '/api/user/dashboard', None),
+    ('user', 'GET', '/api/user/profile', None),
+    ('user', 'GET', '/api/user/profile/completion', None),
+    ('user', 'GET', '/api/user/profile/{other_user}', None),
+    ('user', 'GET', '/api/user/search?q=mar', None),
+    ('marketplace', 'GET', '/api/marketplace/items', None),
+    ('marketplace', 'GET', '/api/marketplace/items?limit=20', None),
+    ('marketplace', 'GET', '/api/marketplace/search?q=calculator&sort=price_asc', None),
+    ('marketplace', 'GET', '/api/marketplace/search?category=Books&min_price=100&max_price=1500', None),
+    ('item', 'GET', '/items/user/me', None),
+    ('board', 'GET', '/api/board/request', None),
+    ('board', 'GET', '/api/board/requests/{request_id}/replies', None),
+    ('board', 'POST', '/api/board/requests/{request_id}/like', None),
+    ('meetup', 'GET', '/api/meetup/my-meetups', None),
+    ('meetup', 'GET', '/api/meetup/search-users?q=mar', None),
+    ('referral', 'GET', '/api/referral/stats', None),
+    ('referral', 'GET', '/api/referral/validate/{referral_code}', None),
+    ('referral', 'GET', '/api/referral/leaderboard', None),
+    ('offer', 'GET', '/api/offer/received', None),
+    ('offer', 'GET', '/api/offer/sent', None),
+    ('offer', 'GET', '/api/offer/conversations', None),
+    ('offer', 'GET', '/api/offer/messages/{partner}', None),
+    ('offer', 'GET', '/api/offer/unread-count', None),
+    ('offer', 'POST', '/api/offer/message/send', {'receiver_id': '{partner}', 'message': 'Is this still available?'}),
+    ('notifications', 'GET', '/api/notifications/', None),
+    ('friends', 'GET', '/api/friends/requests', None),
+    ('friends', 'GET', '/api/friends/list', None),
+    ('friends', 'GET', '/api/friends/status/{other_user}', None),
+]
+
+_SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def sign_token(user_id, secret=BENCH_SECRET, ttl=86400, role='authenticated'):
+    """An HS256 access token shaped like the ones Supabase issues."""
+    def b64(raw):
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    header = b64(json.dumps({'alg': 'HS256', 'typ': 'JWT'}).encode())
+    claims = b64(json.dumps({'sub': user_id, 'aud': 'authenticated', 'role': role,
+                             'exp': int(time.time()) + ttl}).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{claims}".encode(), hashlib.sha256).digest()
+    return f"{header}.{claims}.{b64(signature)}"
+
+
+def round_trips(response):
+    """Database round trips the app reported for this request (Server-Timing)."""
+    match = _SERVER_TIMING_QUERIES.search(response.headers.get('Server-Timing', ''))
+    return int(match.group(1)) if match else None
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def configure_environment(cold=False):
+    """Point the app at the stand-in. Must run before `app` is imported."""
+    # create_client() only validates these; nothing ever connects to them
+    os.environ['SUPABASE_URL'] = 'http://127.0.0.1:54321'
+    os.environ['SUPABASE_KEY'] = sign_token('service_role', ttl=10 * 365 * 86400, role='service_role')
+    os.environ['SUPABASE_JWT_SECRET'] = BENCH_SECRET
+    # Local media storage; the stand-in runs nothing durable anyway
+    os.environ.setdefault('FLASK_ENV', 'development')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('SLOW_REQUEST_MS', '100000')
+    os.environ.setdefault('SLOW_QUERY_MS', '100000')
+    if cold:
+        # Measure every request as a cache miss
+        os.environ['FEED_CACHE_BACKEND'] = 'none'
+        os.environ['PROFILE_CACHE_TTL'] = '0'
+
+
+def build_app(latency, jitter, seed, volumes):
+    from app import create_app
+    from app.extensions import set_supabase
+    from benchmarks.fake_supabase import FakeSupabase
+    from benchmarks.seed import seed_database
+
+    db = FakeSupabase(latency=latency, jitter=jitter, seed=seed)
+    fixtures = seed_database(db, seed=seed, **volumes)
+    set_supabase(db)
+    return create_app(), db, fixtures
+
+
+def _fill(value, fixtures):
+    if isinstance(value, str):
+        return value.format(**fixtures)
+    if isinstance(value, dict):
+        return {key: _fill(item, fixtures) for key, item in value.items()}
+    return value
+
+
+def bench_endpoint(client, headers, method, path, body, iterations, warmup):
+    timings, trips, statuses = [], [], {}
+    for n in range(warmup + iterations):
+        started = time.perf_counter()
+        response = client.open(path, method=method, headers=headers, json=body)
+        elapsed = time.perf_counter() - started
+        response.get_data()
+        if n < warmup:
+            continue
+        timings.append(elapsed * 1000)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        count = round_trips(response)
+        if count is not None:
+            trips.append(count)
+
+    timings.sort()
+    return {
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'mean_ms': round(sum(timings) / len(timings), 2),
+        'round_trips': round(sum(trips) / len(trips), 2) if trips else None,
+        'statuses': {str(code): n for code, n in sorted(statuses.items())},
+    }
+
+
+def run(args):
+    configure_environment(cold=args.cold)
+    volumes = {'users': args.users, 'items': args.items, 'messages': args.messages, 'requests': args.requests}
+    app, db, fixtures = build_app(args.latency_ms / 1000, args.jitter_ms / 1000, args.seed, volumes)
+
+    only = set(filter(None, (args.only or '').split(',')))
+    client = app.test_client()
+    headers = {'Authorization': f"Bearer {sign_token(fixtures['viewer'])}"}
+
+    print(f"Seeded: {', '.join(f'{table}={n}' for table, n in sorted(fixtures['counts'].items()))}")
+    print(f"Round trip latency: {args.latency_ms} ms ± {args.jitter_ms} ms, "
+          f"{args.iterations} iterations after {args.warmup} warm-up, caches {'off' if args.cold else 'on'}\n")
+
+    results = {}
+    for blueprint, method, path, body in ENDPOINTS:
+        if only and blueprint not in only:
+            continue
+        name = f"{method} {path}"
+        results[name] = {'blueprint': blueprint, **bench_endpoint(
+            client, headers, method, _fill(path, fixtures), _fill(body, fixtures), args.iterations, args.warmup
+        )}
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    report(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+        print(f"\nSaved to {args.json}")
+
+    errors = [name for name, result in results.items() if any(code >= '500' for code in result['statuses'])]
+    if errors:
+        print(f"\n{len(errors)} endpoint(s) returned 5xx: {', '.join(errors)}")
+        return 1
+    return 0
+
+
+def report(results, baseline=None):
+    width = max(len(name) for name in results) if results else 20
+    header = f"{'endpoint':<{width}}  {'p50 ms':>8}  {'p95 ms':>8}  {'trips':>6}  status"
+    if baseline:
+        header += '  (p50 vs baseline)'
+    print(header)
+    print('-' * len(header))
+
+    blueprint = None
+    for name, result in results.items():
+        if result['blueprint'] != blueprint:
+            blueprint = result['blueprint']
+            print(f"[{blueprint}]")
+        trips = '-' if result['round_trips'] is None else f"{result['round_trips']:g}"
+        statuses = ','.join(f"{code}x{n}" for code, n in result['statuses'].items())
+        line = f"{name:<{width}}  {result['p50_ms']:>8.1f}  {result['p95_ms']:>8.1f}  {trips:>6}  {statuses}"
+        before = (baseline or {}).get(name)
+        if before:
+            change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0
+            line += f"  {change:+.0f}% ({before['round_trips']} -> {result['round_trips']} trips)"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=1000, help='request board posts')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='simulated time per Supabase round trip')
+    parser.add_argument('--jitter-ms', type=float, default=5.0)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cold', action='store_true', help='disable the feed and profile caches')
+    parser.add_argument('--only', help='comma separated blueprints, e.g. offer,board')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='results file from an earlier run to compare against')
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
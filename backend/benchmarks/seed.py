@@ -0,0 +1,252 @@
+"""Deterministic seed data for the benchmark stand-in.
+
+Volumes are shaped like a busy campus deployment: a few heavy users
+(the benchmark's `viewer` among them) account for much of the traffic,
+everyone else has a little history.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.fake_supabase import compute_user_stats
+
+FIRST_NAMES = ['Ana', 'Ben', 'Carla', 'Dan', 'Ella', 'Franco', 'Gia', 'Hugo', 'Isa', 'Jose',
+               'Kim', 'Leo', 'Mara', 'Nico', 'Olive', 'Paolo', 'Rina', 'Sam', 'Tess', 'Vince']
+LAST_NAMES = ['Reyes', 'Santos', 'Cruz', 'Bautista', 'Garcia', 'Mendoza', 'Rivera', 'Torres',
+              'Flores', 'Ramos', 'Aquino', 'Castro', 'Dela Cruz', 'Navarro', 'Villanueva']
+COURSES = ['BSCS', 'BSIT', 'BSEd', 'BSN', 'BSA', 'BSBA', 'BSCE', 'BSME', 'AB Psych', 'BS Bio']
+YEARS = ['1st Year', '2nd Year', '3rd Year', '4th Year']
+CATEGORIES = {
+    'Books': ['Textbooks', 'Reviewers', 'Novels'],
+    'Electronics': ['Calculators', 'Laptops', 'Accessories'],
+    'Uniforms': ['PE Uniform', 'Lab Gown', 'Polo'],
+    'Supplies': ['Drafting', 'Art', 'Lab'],
+}
+CONDITIONS = ['New', 'Like New', 'Good', 'Fair']
+SIZES = ['XS', 'S', 'M', 'L', 'XL']
+NOUNS = ['calculus book', 'scientific calculator', 'lab gown', 'drafting table', 'physics reviewer',
+         'laptop charger', 'PE uniform', 'anatomy atlas', 'graphing calculator', 'art set',
+         'accounting textbook', 'USB hub', 'chemistry kit', 'T-square', 'novel']
+PHRASES = ['Barely used', 'Complete set', 'Selling because I graduated', 'Some highlights inside',
+           'Meetup at the library', 'Price negotiable', 'With original box', 'Good as new']
+
+
+def _timestamp(rng, now, days=90):
+    moment = now - timedelta(seconds=rng.randint(0, days * 86400), microseconds=rng.randint(0, 999999))
+    return moment.isoformat(timespec='microseconds')
+
+
+def _skewed(rng, population, heavy):
+    # One pick in three goes to the heavy users, the rest spread evenly
+    return rng.choice(heavy) if rng.random() < 1 / 3 else rng.choice(population)
+
+
+def seed_database(db, users=2000, items=5000, messages=20000, requests=1000, seed=42):
+    """Fill `db` and return the ids the benchmark endpoints are pointed at."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+
+    def new_id():
+        return str(uuid.UUID(int=rng.getrandbits(128)))
+
+    user_rows = []
+    for n in range(users):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        user_rows.append({
+            'id': new_id(),
+            'email': f"{first.lower()}.{last.lower().replace(' ', '')}{n}@campus.edu",
+            'first_name': first,
+            'last_name': last,
+            'course': rng.choice(COURSES),
+            'current_year': rng.choice(YEARS),
+            'block_section': f"{rng.randint(1, 4)}-{rng.choice('ABCD')}",
+            'phone_number': f"09{rng.randint(100000000, 999999999)}",
+            'address': None,
+            'profile_picture': None,
+            'profile_completed': rng.random() < 0.8,
+            'reputation_score': rng.randint(0, 200),
+            'referral_code': f"REF{n:05d}",
+            'referred_by': None,
+            'total_referrals': 0,
+            'created_at': _timestamp(rng, now, 365),
+            'updated_at': _timestamp(rng, now, 30),
+        })
+    db.load('users', user_rows)
+    ids = [u['id'] for u in user_rows]
+    heavy = ids[:max(1, users // 100)]
+    viewer, partner = heavy[0], heavy[1 % len(heavy)]
+
+    item_rows = []
+    for _ in range(items):
+        category = rng.choice(list(CATEGORIES))
+        noun = rng.choice(NOUNS)
+        item_rows.append({
+            'id': new_id(),
+            'seller_id': _skewed(rng, ids, heavy),
+            'title': f"{rng.choice(CONDITIONS)} {noun}",
+            'description': f"{rng.choice(PHRASES)}. {noun.capitalize()} for {rng.choice(COURSES)} students.",
+            'price': round(rng.uniform(20, 5000), 2),
+            'category': category,
+            'subcategory': rng.choice(CATEGORIES[category]),
+            'condition': rng.choice(CONDITIONS),
+            'size': rng.choice(SIZES) if category == 'Uniforms' else None,
+            'images': [f"https://picsum.photos/seed/{rng.randint(1, 10 ** 6)}/600/600"],
+            'status': 'active' if rng.random() < 0.85 else 'sold',
+            'is_sold': False,
+            'view_count': rng.randint(0, 300),
+            'created_at': _timestamp(rng, now),
+            'updated_at': _timestamp(rng, now, 10),
+        })
+    db.load('items', item_rows)
+
+    message_rows = []
+    for _ in range(messages):
+        sender = _skewed(rng, ids, heavy)
+        receiver = _skewed(rng, ids, heavy)
+        if sender == receiver:
+            continue
+        if rng.random() < 0.05:
+            # A long-running thread between the viewer and one partner
+            sender, receiver = rng.sample([viewer, partner], 2)
+        message_rows.append({
+            'id': new_id(),
+            'sender_id': sender,
+            'receiver_id': receiver,
+            'item_id': None,
+            'offer_id': None,
+            'message': rng.choice(PHRASES),
+            'is_read': rng.random() < 0.7,
+            'created_at': _timestamp(rng, now, 30),
+        })
+    db.load('messages', message_rows)
+
+    offer_rows = []
+    for item in rng.sample(item_rows, min(len(item_rows), items // 5)):
+        buyer = _skewed(rng, ids, heavy)
+        if buyer == item['seller_id']:
+            continue
+        offer_rows.append({
+            'id': new_id(),
+            'item_id': item['id'],
+            'buyer_id': buyer,
+            'seller_id': item['seller_id'],
+            'offer_amount': round(item['price'] * rng.uniform(0.6, 1.0), 2),
+            'message': rng.choice(PHRASES),
+            'status': rng.choice(['pending', 'accepted', 'rejected', 'countered']),
+            'created_at': _timestamp(rng, now, 30),
+        })
+    db.load('offers', offer_rows)
+
+    meetup_rows = []
+    for offer in offer_rows[:len(offer_rows) // 2]:
+        meetup_rows.append({
+            'id': new_id(),
+            'item_id': offer['item_id'],
+            'seller_id': offer['seller_id'],
+            'buyer_id': offer['buyer_id'],
+            'title': 'Item handover',
+            'scheduled_date': (now + timedelta(days=rng.randint(-30, 14))).date().isoformat(),
+            'scheduled_time': f"{rng.randint(8, 17):02d}:00:00",
+            'location_name': rng.choice(['Library', 'Canteen', 'Main Gate', 'Gym']),
+            'status': rng.choice(['pending', 'confirmed', 'completed', 'completed', 'cancelled_by_buyer']),
+            'created_at': _timestamp(rng, now, 30),
+        })
+    db.load('meetups', meetup_rows)
+
+    request_rows, reply_rows, like_rows = [], [], []
+    for _ in range(requests):
+        category = rng.choice(list(CATEGORIES))
+        request_rows.append({
+            'id': new_id(),
+            'user_id': _skewed(rng, ids, heavy),
+            'title': f"Looking for {rng.choice(NOUNS)}",
+            'description': rng.choice(PHRASES),
+            'category': category,
+            'subcategory': rng.choice(CATEGORIES[category]),
+            'budget': rng.randint(50, 3000),
+            'status': 'active' if rng.random() < 0.9 else 'closed',
+            'created_at': _timestamp(rng, now, 60),
+        })
+    for request in request_rows:
+        for _ in range(rng.randint(0, 6)):
+            reply_rows.append({
+                'id': new_id(),
+                'request_id': request['id'],
+                'user_id': rng.choice(ids),
+                'content': rng.choice(PHRASES),
+                'message': None,
+                'created_at': _timestamp(rng, now, 60),
+            })
+        for liker in {rng.choice(ids) for _ in range(rng.randint(0, 10))}:
+            like_rows.append({'id': new_id(), 'request_id': request['id'], 'user_id': liker,
+                              'created_at': _timestamp(rng, now, 60)})
+    db.load('requests', request_rows)
+    db.load('request_replies', reply_rows)
+    db.load('request_likes', like_rows)
+    for request in request_rows:
+        request['reply_count'] = len(db.lookup('request_replies', 'request_id', request['id']))
+        request['like_count'] = len(db.lookup('request_likes', 'request_id', request['id']))
+
+    friendship_rows, seen = [], set()
+    for user_id in ids:
+        friends = rng.sample(ids, min(len(ids), 40 if user_id in heavy else 5))
+        for friend_id in friends:
+            pair = frozenset((user_id, friend_id))
+            if friend_id == user_id or pair in seen:
+                continue
+            seen.add(pair)
+            friendship_rows.append({
+                'id': new_id(),
+                'user_id': user_id,
+                'friend_id': friend_id,
+                'status': 'active' if rng.random() < 0.8 else 'pending',
+                'created_at': _timestamp(rng, now, 180),
+            })
+    db.load('friendships', friendship_rows)
+
+    notification_rows = []
+    for _ in range(messages // 2):
+        notification_rows.append({
+            'id': new_id(),
+            'user_id': _skewed(rng, ids, heavy),
+            'type': rng.choice(['offer', 'message', 'meetup', 'friend_request']),
+            'title': 'Update',
+            'message': rng.choice(PHRASES),
+            'related_id': None,
+            'is_read': rng.random() < 0.6,
+            'created_at': _timestamp(rng, now, 30),
+        })
+    db.load('notifications', notification_rows)
+
+    referral_rows = []
+    for referred in rng.sample(ids, min(len(ids), users // 10)):
+        referrer = _skewed(rng, ids, heavy)
+        if referrer == referred:
+            continue
+        referral_rows.append({
+            'id': new_id(),
+            'referrer_id': referrer,
+            'referred_id': referred,
+            'referral_code': None,
+            'reward_given': True,
+            'created_at': _timestamp(rng, now, 180),
+        })
+    db.load('referrals', referral_rows)
+    for user in user_rows:
+        user['total_referrals'] = len(db.lookup('referrals', 'referrer_id', user['id']))
+
+    db.load('user_stats', [compute_user_stats(db, user_id) for user_id in ids])
+    db.load('reputation_history', [])
+
+    viewer_items = db.lookup('items', 'seller_id', viewer)
+    return {
+        'viewer': viewer,
+        'heavy_users': heavy,
+        'user_ids': ids,
+        'partner': partner,
+        'other_user': ids[-1],
+        'request_id': max(request_rows, key=lambda r: r['created_at'])['id'] if request_rows else None,
+        'item_id': viewer_items[0]['id'] if viewer_items else (item_rows[0]['id'] if item_rows else None),
+        'referral_code': next(u['referral_code'] for u in user_rows if u['id'] == viewer),
+        'counts': {table: len(rows) for table, rows in db.tables.items()},
+    }
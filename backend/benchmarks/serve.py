@@ -0,0 +1,33 @@
+"""WSGI entry point: the app on the seeded in-memory stand-in, for load tests.
+
+    cd backend
+    BENCH_LATENCY_MS=20 gunicorn benchmarks.serve:app --worker-class gevent --workers 1 --worker-connections 1000
+
+Settings come from the environment (defaults match benchmarks.run):
+BENCH_USERS, BENCH_ITEMS, BENCH_MESSAGES, BENCH_REQUESTS, BENCH_SEED,
+BENCH_LATENCY_MS, BENCH_JITTER_MS and BENCH_COLD=1 to disable caches.
+Each gunicorn worker seeds its own copy of the data, so writes made
+through one worker are not visible to the others.
+"""
+import os
+
+from benchmarks.run import build_app, configure_environment
+
+
+def _env(name, default, cast=int):
+    return cast(os.getenv(name, default))
+
+
+configure_environment(cold=os.getenv('BENCH_COLD') == '1')
+
+app, db, fixtures = build_app(
+    latency=_env('BENCH_LATENCY_MS', '20', float) / 1000,
+    jitter=_env('BENCH_JITTER_MS', '5', float) / 1000,
+    seed=_env('BENCH_SEED', '42'),
+    volumes={
+        'users': _env('BENCH_USERS', '2000'),
+        'items': _env('BENCH_ITEMS', '5000'),
+        'messages': _env('BENCH_MESSAGES', '20000'),
+        'requests': _env('BENCH_REQUESTS', '1000'),
+    },
+)
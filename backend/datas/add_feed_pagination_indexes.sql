@@ -0,0 +1,23 @@
+-- ============================================
+-- Indexes for keyset (cursor) paginated feeds
+-- ============================================
+-- Run this in your Supabase SQL Editor
+--
+-- The marketplace feed and "My Listings" page are paged by
+-- (created_at, id). These composite indexes let Postgres seek straight
+-- to the next page instead of sorting every active item on each request.
+
+-- Marketplace feed: active items, newest first
+CREATE INDEX IF NOT EXISTS idx_items_status_created_id
+ON items(status, created_at DESC, id DESC);
+
+-- A user's own listings, newest first
+CREATE INDEX IF NOT EXISTS idx_items_seller_created_id
+ON items(seller_id, created_at DESC, id DESC);
+
+-- ============================================
+-- SETUP COMPLETE!
+-- ============================================
+-- ✅ Composite indexes for GET /api/marketplace/items?limit=&cursor=
+-- ✅ Composite indexes for GET /items/user/me?limit=&cursor=
+-- ============================================
@@ -0,0 +1,147 @@
+-- ============================================
+-- Denormalized reply/like counters on requests
+-- ============================================
+-- Run this in your Supabase SQL Editor (after create_board_feed.sql)
+--
+-- Counting request_replies / request_likes on every board load and after
+-- every like gets slower as those tables grow. Instead each request keeps
+-- its own reply_count and like_count, maintained by triggers on write.
+
+-- ============================================
+-- 1. COUNTER COLUMNS
+-- ============================================
+ALTER TABLE requests ADD COLUMN IF NOT EXISTS reply_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE requests ADD COLUMN IF NOT EXISTS like_count INTEGER NOT NULL DEFAULT 0;
+
+-- ============================================
+-- 2. TRIGGERS TO KEEP THEM UP TO DATE
+-- ============================================
+-- SECURITY DEFINER: a user liking or replying to someone else's request
+-- must be able to bump that request's counter despite RLS on requests.
+CREATE OR REPLACE FUNCTION sync_request_reply_count()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE requests SET reply_count = reply_count + 1 WHERE id = NEW.request_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE requests SET reply_count = GREATEST(reply_count - 1, 0) WHERE id = OLD.request_id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION sync_request_like_count()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE requests SET like_count = like_count + 1 WHERE id = NEW.request_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE requests SET like_count = GREATEST(like_count - 1, 0) WHERE id = OLD.request_id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_sync_request_reply_count ON request_replies;
+CREATE TRIGGER trigger_sync_request_reply_count
+    AFTER INSERT OR DELETE ON request_replies
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_request_reply_count();
+
+DROP TRIGGER IF EXISTS trigger_sync_request_like_count ON request_likes;
+CREATE TRIGGER trigger_sync_request_like_count
+    AFTER INSERT OR DELETE ON request_likes
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_request_like_count();
+
+-- ============================================
+-- 3. RECONCILIATION
+-- ============================================
+-- Recomputes every counter from the source tables and fixes the ones that
+-- drifted. Returns how many requests were corrected. Run it from the
+-- backend with:  flask --app api rebuild-counters
+CREATE OR REPLACE FUNCTION reconcile_request_counters()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    fixed INTEGER;
+BEGIN
+    WITH actual AS (
+        SELECT r.id,
+               (SELECT COUNT(*) FROM request_replies rr WHERE rr.request_id = r.id) AS replies,
+               (SELECT COUNT(*) FROM request_likes rl WHERE rl.request_id = r.id) AS likes
+        FROM requests r
+    )
+    UPDATE requests r
+    SET reply_count = actual.replies,
+        like_count = actual.likes
+    FROM actual
+    WHERE r.id = actual.id
+      AND (r.reply_count <> actual.replies OR r.like_count <> actual.likes);
+
+    GET DIAGNOSTICS fixed = ROW_COUNT;
+    RETURN fixed;
+END;
+$$;
+
+-- Backfill existing requests
+SELECT reconcile_request_counters();
+
+-- ============================================
+-- 4. BOARD FEED READS THE COUNTERS
+-- ============================================
+-- Same contract as in create_board_feed.sql; reply_count/like_count now
+-- come straight from the row via to_jsonb(r).
+CREATE OR REPLACE FUNCTION get_board_feed(viewer_id UUID DEFAULT NULL, page_limit INTEGER DEFAULT 100)
+RETURNS SETOF JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT to_jsonb(r) || jsonb_build_object(
+        'user_first_name', u.first_name,
+        'user_last_name', u.last_name,
+        'liked_by_me', viewer_id IS NOT NULL AND EXISTS (
+            SELECT 1 FROM request_likes rl
+            WHERE rl.request_id = r.id AND rl.user_id = viewer_id
+        )
+    )
+    FROM requests r
+    LEFT JOIN users u ON u.id = r.user_id
+    WHERE r.status = 'active'
+    ORDER BY r.created_at DESC
+    LIMIT page_limit;
+$$;
+
+-- ============================================
+-- 5. PERMISSIONS
+-- ============================================
+-- SECURITY DEFINER functions bypass RLS, and Postgres lets PUBLIC execute
+-- new functions (Supabase also grants anon/authenticated). Only the
+-- backend, connected with the service_role key, may call these.
+REVOKE EXECUTE ON FUNCTION reconcile_request_counters() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION sync_request_reply_count() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION sync_request_like_count() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION reconcile_request_counters() TO service_role;
+GRANT EXECUTE ON FUNCTION sync_request_reply_count() TO service_role;
+GRANT EXECUTE ON FUNCTION sync_request_like_count() TO service_role;
+
+-- ============================================
+-- SETUP COMPLETE!
+-- ============================================
+-- ✅ reply_count / like_count columns on requests
+-- ✅ Triggers keep them in sync on every reply/like insert and delete
+-- ✅ reconcile_request_counters() to rebuild them in bulk
+-- ✅ get_board_feed now reads the counters instead of counting
+-- ✅ Counter functions callable by service_role only
+-- ============================================
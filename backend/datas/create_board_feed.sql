@@ -0,0 +1,55 @@
+-- ============================================
+-- Request Board feed in a single query
+-- ============================================
+-- Run this in your Supabase SQL Editor
+--
+-- The board page used to issue up to 4 queries per request (poster name,
+-- reply count, like count, "did I like it"). get_board_feed returns every
+-- active request with all of that attached in one round trip.
+
+-- ============================================
+-- 1. INDEXES
+-- ============================================
+CREATE INDEX IF NOT EXISTS idx_requests_status_created_at ON requests(status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_request_replies_request_id ON request_replies(request_id);
+CREATE INDEX IF NOT EXISTS idx_request_likes_request_user ON request_likes(request_id, user_id);
+
+-- ============================================
+-- 2. FEED FUNCTION
+-- ============================================
+-- Returns one JSON object per request: all request columns plus
+-- user_first_name, user_last_name, reply_count, like_count and liked_by_me.
+-- viewer_id may be NULL for anonymous visitors (liked_by_me is then false).
+CREATE OR REPLACE FUNCTION get_board_feed(viewer_id UUID DEFAULT NULL, page_limit INTEGER DEFAULT 100)
+RETURNS SETOF JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT to_jsonb(r) || jsonb_build_object(
+        'user_first_name', u.first_name,
+        'user_last_name', u.last_name,
+        'reply_count', (SELECT COUNT(*) FROM request_replies rr WHERE rr.request_id = r.id),
+        'like_count', (SELECT COUNT(*) FROM request_likes rl WHERE rl.request_id = r.id),
+        'liked_by_me', viewer_id IS NOT NULL AND EXISTS (
+            SELECT 1 FROM request_likes rl
+            WHERE rl.request_id = r.id AND rl.user_id = viewer_id
+        )
+    )
+    FROM requests r
+    LEFT JOIN users u ON u.id = r.user_id
+    WHERE r.status = 'active'
+    ORDER BY r.created_at DESC
+    LIMIT page_limit;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_board_feed(UUID, INTEGER) TO anon, authenticated;
+
+-- ============================================
+-- SETUP COMPLETE!
+-- ============================================
+-- ✅ Indexes for request status, replies and likes
+-- ✅ get_board_feed(viewer_id, page_limit) used by GET /api/board/request
+--
+-- Test it:
+-- SELECT * FROM get_board_feed(NULL, 5);
+-- ============================================
@@ -0,0 +1,90 @@
+-- ============================================
+-- Conversation inbox in a single query
+-- ============================================
+-- Run this in your Supabase SQL Editor (after create_offers_messages.sql)
+--
+-- The inbox used to download every message a user ever sent or received,
+-- group them in Python, then run a profile query and an unread-count query
+-- per conversation partner. get_inbox returns one row per partner: the
+-- latest message, the partner's profile card and the unread count, newest
+-- conversation first, one page at a time.
+
+-- ============================================
+-- 1. INDEXES
+-- ============================================
+CREATE INDEX IF NOT EXISTS idx_messages_sender_created ON messages(sender_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_messages_receiver_created ON messages(receiver_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_messages_receiver_unread ON messages(receiver_id, sender_id) WHERE is_read = FALSE;
+
+-- ============================================
+-- 2. INBOX FUNCTION
+-- ============================================
+-- Pass before_time/before_partner (taken from the last row of the previous
+-- page) to fetch the next page; leave them NULL for the first page. A NULL
+-- page_limit returns every conversation.
+CREATE OR REPLACE FUNCTION get_inbox(
+    p_user_id UUID,
+    page_limit INTEGER DEFAULT 20,
+    before_time TIMESTAMPTZ DEFAULT NULL,
+    before_partner UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    other_user_id UUID,
+    last_message TEXT,
+    last_message_time TIMESTAMPTZ,
+    first_name TEXT,
+    last_name TEXT,
+    profile_picture TEXT,
+    unread_count BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH latest AS (
+        SELECT DISTINCT ON (partner_id) partner_id, message, created_at
+        FROM (
+            SELECT receiver_id AS partner_id, message, created_at
+            FROM messages WHERE sender_id = p_user_id
+            UNION ALL
+            SELECT sender_id AS partner_id, message, created_at
+            FROM messages WHERE receiver_id = p_user_id
+        ) m
+        ORDER BY partner_id, created_at DESC
+    ),
+    unread AS (
+        SELECT sender_id AS partner_id, COUNT(*) AS n
+        FROM messages
+        WHERE receiver_id = p_user_id AND is_read = FALSE
+        GROUP BY sender_id
+    )
+    SELECT l.partner_id,
+           l.message,
+           l.created_at,
+           u.first_name::TEXT,
+           u.last_name::TEXT,
+           u.profile_picture,
+           COALESCE(un.n, 0)
+    FROM latest l
+    LEFT JOIN users u ON u.id = l.partner_id
+    LEFT JOIN unread un ON un.partner_id = l.partner_id
+    WHERE before_time IS NULL
+       OR (l.created_at, l.partner_id) < (before_time, before_partner)
+    ORDER BY l.created_at DESC, l.partner_id DESC
+    LIMIT page_limit;
+$$;
+
+-- ============================================
+-- 3. PERMISSIONS
+-- ============================================
+-- get_inbox reads any p_user_id's messages, so clients must not call it
+-- directly. Only the backend, connected with the service_role key, may.
+REVOKE EXECUTE ON FUNCTION get_inbox(UUID, INTEGER, TIMESTAMPTZ, UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_inbox(UUID, INTEGER, TIMESTAMPTZ, UUID) TO service_role;
+
+-- ============================================
+-- SETUP COMPLETE!
+-- ============================================
+-- ✅ Indexes for per-user message lookups and unread counts
+-- ✅ get_inbox(...) used by GET /api/offer/conversations?limit=&cursor=
+-- ✅ get_inbox callable by service_role only
+-- ============================================
@@ -0,0 +1,134 @@
+-- ============================================
+-- Marketplace full-text search and facets
+-- ============================================
+-- Run this in your Supabase SQL Editor (after add_feed_pagination_indexes.sql)
+--
+-- GET /api/marketplace/search filters active items on the server:
+-- full-text search over title/description, category / subcategory /
+-- condition / size filters, a price range and several sort orders. Facet
+-- counts for the sidebar come from marketplace_facets().
+
+-- ============================================
+-- 1. FULL-TEXT SEARCH
+-- ============================================
+-- Title matches weigh more than description matches
+ALTER TABLE items ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_items_search_vector
+ON items USING GIN (search_vector);
+
+-- ============================================
+-- 2. FILTER AND SORT INDEXES
+-- ============================================
+CREATE INDEX IF NOT EXISTS idx_items_status_category
+ON items(status, category, subcategory);
+
+CREATE INDEX IF NOT EXISTS idx_items_status_condition
+ON items(status, condition);
+
+CREATE INDEX IF NOT EXISTS idx_items_status_size
+ON items(status, size);
+
+-- Price sorts are keyset paginated by (price, id) like the feed
+CREATE INDEX IF NOT EXISTS idx_items_status_price_id
+ON items(status, price, id);
+
+-- ============================================
+-- 3. FACET COUNTS
+-- ============================================
+-- Counts per category, subcategory, condition and size for the active
+-- items matching a search, plus the matching price range. Each facet
+-- ignores its own filter so the UI can show the other options.
+-- Returns {"categories": [{"value", "count"}], "subcategories": [...],
+--          "conditions": [...], "sizes": [...], "price": {"min", "max"}}
+CREATE OR REPLACE FUNCTION marketplace_facets(
+    q TEXT DEFAULT NULL,
+    p_category TEXT DEFAULT NULL,
+    p_subcategory TEXT DEFAULT NULL,
+    p_condition TEXT DEFAULT NULL,
+    p_size TEXT DEFAULT NULL,
+    p_min_price NUMERIC DEFAULT NULL,
+    p_max_price NUMERIC DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH matches AS (
+        SELECT category, subcategory, condition, size, price
+        FROM items
+        WHERE status = 'active'
+          AND (NULLIF(trim(q), '') IS NULL
+               OR search_vector @@ websearch_to_tsquery('english', q))
+    ),
+    counts AS (
+        SELECT 'categories' AS facet, category AS value, COUNT(*) AS n
+        FROM matches
+        WHERE (p_subcategory IS NULL OR subcategory = p_subcategory)
+          AND (p_condition IS NULL OR condition = p_condition)
+          AND (p_size IS NULL OR size = p_size)
+          AND (p_min_price IS NULL OR price >= p_min_price)
+          AND (p_max_price IS NULL OR price <= p_max_price)
+        GROUP BY category
+        UNION ALL
+        SELECT 'subcategories', subcategory, COUNT(*)
+        FROM matches
+        WHERE subcategory IS NOT NULL
+          AND (p_category IS NULL OR category = p_category)
+          AND (p_condition IS NULL OR condition = p_condition)
+          AND (p_size IS NULL OR size = p_size)
+          AND (p_min_price IS NULL OR price >= p_min_price)
+          AND (p_max_price IS NULL OR price <= p_max_price)
+        GROUP BY subcategory
+        UNION ALL
+        SELECT 'conditions', condition, COUNT(*)
+        FROM matches
+        WHERE (p_category IS NULL OR category = p_category)
+          AND (p_subcategory IS NULL OR subcategory = p_subcategory)
+          AND (p_size IS NULL OR size = p_size)
+          AND (p_min_price IS NULL OR price >= p_min_price)
+          AND (p_max_price IS NULL OR price <= p_max_price)
+        GROUP BY condition
+        UNION ALL
+        SELECT 'sizes', size, COUNT(*)
+        FROM matches
+        WHERE size IS NOT NULL
+          AND (p_category IS NULL OR category = p_category)
+          AND (p_subcategory IS NULL OR subcategory = p_subcategory)
+          AND (p_condition IS NULL OR condition = p_condition)
+          AND (p_min_price IS NULL OR price >= p_min_price)
+          AND (p_max_price IS NULL OR price <= p_max_price)
+        GROUP BY size
+    ),
+    price_range AS (
+        SELECT MIN(price) AS min_price, MAX(price) AS max_price
+        FROM matches
+        WHERE (p_category IS NULL OR category = p_category)
+          AND (p_subcategory IS NULL OR subcategory = p_subcategory)
+          AND (p_condition IS NULL OR condition = p_condition)
+          AND (p_size IS NULL OR size = p_size)
+    )
+    SELECT jsonb_build_object(
+        'categories', COALESCE((SELECT jsonb_agg(jsonb_build_object('value', value, 'count', n) ORDER BY n DESC, value)
+                                FROM counts WHERE facet = 'categories'), '[]'::JSONB),
+        'subcategories', COALESCE((SELECT jsonb_agg(jsonb_build_object('value', value, 'count', n) ORDER BY n DESC, value)
+                                   FROM counts WHERE facet = 'subcategories'), '[]'::JSONB),
+        'conditions', COALESCE((SELECT jsonb_agg(jsonb_build_object('value', value, 'count', n) ORDER BY n DESC, value)
+                                FROM counts WHERE facet = 'conditions'), '[]'::JSONB),
+        'sizes', COALESCE((SELECT jsonb_agg(jsonb_build_object('value', value, 'count', n) ORDER BY n DESC, value)
+                           FROM counts WHERE facet = 'sizes'), '[]'::JSONB),
+        'price', (SELECT jsonb_build_object('min', min_price, 'max', max_price) FROM price_range)
+    );
+$$;
+
+-- ============================================
+-- SETUP COMPLETE!
+-- ============================================
+-- ✅ items.search_vector with a GIN index
+-- ✅ Indexes for category / condition / size filters and price sorts
+-- ✅ marketplace_facets(...) for sidebar counts
+-- ============================================
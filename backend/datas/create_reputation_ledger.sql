@@ -0,0 +1,125 @@
+-- ============================================
+-- Atomic reputation ledger
+-- ============================================
+-- Run this in your Supabase SQL Editor (after create_meetups_table.sql)
+--
+-- Reputation changes used to be applied from the backend as
+-- read score -> add in Python -> write score -> insert history, three round
+-- trips per user, and two meetups finishing at the same time could
+-- overwrite each other's update. apply_reputation_changes() increments the
+-- score and writes the history row in one transaction, for any number of
+-- users per call, and skips changes whose idempotency key was already used.
+
+-- ============================================
+-- 1. IDEMPOTENCY KEYS
+-- ============================================
+-- e.g. 'meetup:<meetup_id>:completed:seller'. NULL for changes that don't
+-- need deduplication (referral rewards, manual adjustments, ...)
+ALTER TABLE reputation_history ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reputation_history_idempotency_key
+ON reputation_history(idempotency_key)
+WHERE idempotency_key IS NOT NULL;
+
+-- ============================================
+-- 2. APPLY CHANGES
+-- ============================================
+-- changes: [{"user_id": uuid, "amount": int, "reason": text,
+--            "meetup_id": uuid|null, "idempotency_key": text|null}, ...]
+-- Returns one entry per change: {"user_id", "applied", "reputation_score"}.
+-- Penalties never take a score below 0.
+CREATE OR REPLACE FUNCTION apply_reputation_changes(changes JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    change JSONB;
+    history_id UUID;
+    new_score INTEGER;
+    results JSONB := '[]'::JSONB;
+BEGIN
+    -- Lock users in a fixed order so concurrent calls can't deadlock
+    FOR change IN
+        SELECT value FROM jsonb_array_elements(changes) ORDER BY value->>'user_id'
+    LOOP
+        history_id := NULL;
+        new_score := NULL;
+
+        INSERT INTO reputation_history (user_id, meetup_id, change_amount, reason, idempotency_key)
+        VALUES (
+            (change->>'user_id')::UUID,
+            NULLIF(change->>'meetup_id', '')::UUID,
+            (change->>'amount')::INTEGER,
+            change->>'reason',
+            change->>'idempotency_key'
+        )
+        ON CONFLICT (idempotency_key) WHERE idempotency_key IS NOT NULL DO NOTHING
+        RETURNING id INTO history_id;
+
+        IF history_id IS NOT NULL THEN
+            UPDATE users
+            SET reputation_score = CASE
+                WHEN (change->>'amount')::INTEGER < 0
+                    THEN GREATEST(0, COALESCE(reputation_score, 0) + (change->>'amount')::INTEGER)
+                ELSE COALESCE(reputation_score, 0) + (change->>'amount')::INTEGER
+            END
+            WHERE id = (change->>'user_id')::UUID
+            RETURNING reputation_score INTO new_score;
+        ELSE
+            SELECT reputation_score INTO new_score FROM users WHERE id = (change->>'user_id')::UUID;
+        END IF;
+
+        results := results || jsonb_build_object(
+            'user_id', change->>'user_id',
+            'applied', history_id IS NOT NULL,
+            'reputation_score', new_score
+        );
+    END LOOP;
+
+    RETURN results;
+END;
+$$;
+
+-- Single-change convenience wrapper
+CREATE OR REPLACE FUNCTION apply_reputation_change(
+    p_user_id UUID,
+    p_amount INTEGER,
+    p_reason TEXT,
+    p_meetup_id UUID DEFAULT NULL,
+    p_idempotency_key TEXT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT apply_reputation_changes(jsonb_build_array(jsonb_build_object(
+        'user_id', p_user_id,
+        'amount', p_amount,
+        'reason', p_reason,
+        'meetup_id', p_meetup_id,
+        'idempotency_key', p_idempotency_key
+    ))) -> 0;
+$$;
+
+-- ============================================
+-- 3. PERMISSIONS
+-- ============================================
+-- SECURITY DEFINER functions bypass RLS, and Postgres lets PUBLIC execute
+-- new functions (Supabase also grants anon/authenticated). Only the
+-- backend, connected with the service_role key, may call these.
+REVOKE EXECUTE ON FUNCTION apply_reputation_changes(JSONB) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION apply_reputation_change(UUID, INTEGER, TEXT, UUID, TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION apply_reputation_changes(JSONB) TO service_role;
+GRANT EXECUTE ON FUNCTION apply_reputation_change(UUID, INTEGER, TEXT, UUID, TEXT) TO service_role;
+
+-- ============================================
+-- SETUP COMPLETE!
+-- ============================================
+-- ✅ reputation_history.idempotency_key (unique when set)
+-- ✅ apply_reputation_changes(changes) - batched, atomic, idempotent
+-- ✅ apply_reputation_change(...) - single change wrapper
+-- ✅ Both functions callable by service_role only
+-- ============================================
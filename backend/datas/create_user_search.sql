@@ -0,0 +1,157 @@
+-- ============================================
+-- Indexed, ranked user search
+-- ============================================
+-- Run this in your Supabase SQL Editor
+--
+-- User search used to be ilike '%q%' on first_name, last_name and email,
+-- which scans the whole users table on every keystroke. This adds trigram
+-- and prefix indexes and two functions used by /api/user/search and
+-- /api/meetup/search-users:
+--   search_users(...)       ranked matches (prefixes first, then similarity)
+--   search_user_facets(...) course / year counts for the same search
+
+-- ============================================
+-- 1. INDEXES
+-- ============================================
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Lower-cased "first last email", kept in sync by Postgres
+ALTER TABLE users ADD COLUMN IF NOT EXISTS search_text TEXT
+    GENERATED ALWAYS AS (
+        lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(email, ''))
+    ) STORED;
+
+-- Substring / fuzzy matches for queries of 3+ characters
+CREATE INDEX IF NOT EXISTS idx_users_search_text_trgm
+ON users USING GIN (search_text gin_trgm_ops);
+
+-- Prefix matches for 1-2 character queries (trigrams need 3)
+CREATE INDEX IF NOT EXISTS idx_users_first_name_prefix ON users (lower(first_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_last_name_prefix ON users (lower(last_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_prefix ON users (lower(email) text_pattern_ops);
+
+-- Facet filters
+CREATE INDEX IF NOT EXISTS idx_users_course_year ON users (course, current_year);
+
+-- ============================================
+-- 2. RANKED SEARCH
+-- ============================================
+-- Rank: 1 point for a name/email prefix match, plus trigram similarity.
+-- An empty query just filters by course / year.
+CREATE OR REPLACE FUNCTION search_users(
+    q TEXT DEFAULT '',
+    p_course TEXT DEFAULT NULL,
+    p_year TEXT DEFAULT NULL,
+    exclude_id UUID DEFAULT NULL,
+    page_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id UUID,
+    first_name TEXT,
+    last_name TEXT,
+    email TEXT,
+    course TEXT,
+    current_year TEXT,
+    block_section TEXT,
+    profile_picture TEXT,
+    profile_completed BOOLEAN,
+    reputation_score INTEGER,
+    rank REAL
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    term TEXT := lower(trim(coalesce(q, '')));
+    pattern TEXT;
+BEGIN
+    -- Treat user input literally inside LIKE patterns
+    pattern := replace(replace(replace(term, '\', '\\'), '%', '\%'), '_', '\_');
+
+    RETURN QUERY
+    SELECT u.id, u.first_name::TEXT, u.last_name::TEXT, u.email::TEXT, u.course::TEXT,
+           u.current_year::TEXT, u.block_section::TEXT, u.profile_picture::TEXT,
+           u.profile_completed, u.reputation_score,
+           CASE WHEN term = '' THEN 0::REAL ELSE (
+               CASE WHEN lower(u.first_name) LIKE pattern || '%'
+                      OR lower(u.last_name) LIKE pattern || '%'
+                      OR lower(u.email) LIKE pattern || '%'
+                    THEN 1 ELSE 0 END
+               + similarity(u.search_text, term)
+           )::REAL END AS rank
+    FROM users u
+    WHERE (exclude_id IS NULL OR u.id <> exclude_id)
+      AND (p_course IS NULL OR u.course = p_course)
+      AND (p_year IS NULL OR u.current_year = p_year)
+      AND (
+          term = ''
+          OR (length(term) < 3 AND (
+                 lower(u.first_name) LIKE pattern || '%'
+              OR lower(u.last_name) LIKE pattern || '%'
+              OR lower(u.email) LIKE pattern || '%'))
+          OR (length(term) >= 3 AND (
+                 u.search_text LIKE '%' || pattern || '%'
+              OR u.search_text % term))
+      )
+    ORDER BY rank DESC, u.first_name, u.last_name, u.id
+    LIMIT page_limit;  -- NULL = no limit
+END;
+$$;
+
+-- ============================================
+-- 3. FACETS
+-- ============================================
+-- Counts per course and per year for the same query. Each facet ignores
+-- its own filter so the picker can show the alternatives.
+-- Returns {"courses": [{"value", "count"}], "years": [{"value", "count"}]}
+CREATE OR REPLACE FUNCTION search_user_facets(
+    q TEXT DEFAULT '',
+    p_course TEXT DEFAULT NULL,
+    p_year TEXT DEFAULT NULL,
+    exclude_id UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH matches AS (
+        SELECT s.course, s.current_year
+        FROM search_users(q, NULL, NULL, exclude_id, NULL) s
+    )
+    SELECT jsonb_build_object(
+        'courses', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('value', course, 'count', n) ORDER BY n DESC, course)
+            FROM (SELECT course, COUNT(*) AS n FROM matches
+                  WHERE p_year IS NULL OR current_year = p_year
+                  GROUP BY course) c
+        ), '[]'::JSONB),
+        'years', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('value', current_year, 'count', n) ORDER BY current_year)
+            FROM (SELECT current_year, COUNT(*) AS n FROM matches
+                  WHERE p_course IS NULL OR course = p_course
+                  GROUP BY current_year) y
+        ), '[]'::JSONB)
+    );
+$$;
+
+-- ============================================
+-- 4. PERMISSIONS
+-- ============================================
+-- search_users returns every matching user's email. Postgres lets PUBLIC
+-- execute new functions (Supabase also grants anon/authenticated), which
+-- would let anyone with the anon key page through the whole directory.
+-- Only the backend, connected with the service_role key, may call these.
+REVOKE EXECUTE ON FUNCTION search_users(TEXT, TEXT, TEXT, UUID, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION search_user_facets(TEXT, TEXT, TEXT, UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION search_users(TEXT, TEXT, TEXT, UUID, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION search_user_facets(TEXT, TEXT, TEXT, UUID) TO service_role;
+
+-- ============================================
+-- SETUP COMPLETE!
+-- ============================================
+-- ✅ pg_trgm + users.search_text with a trigram index
+-- ✅ Prefix indexes for short queries
+-- ✅ search_users(q, p_course, p_year, exclude_id, page_limit)
+-- ✅ search_user_facets(q, p_course, p_year, exclude_id)
+-- ✅ Search functions callable by service_role only
+-- ============================================
@@ -0,0 +1,322 @@
+-- ============================================
+-- Materialized per-user dashboard stats
+-- ============================================
+-- Run this in your Supabase SQL Editor (after add_request_counters.sql)
+--
+-- The dashboard used to run ~8 queries on every load (counting listings,
+-- summing earnings, scanning view counts, ...). user_stats keeps those
+-- numbers in one row per user. Triggers apply small deltas whenever items,
+-- meetups, board posts or likes change, and rebuild_user_stats() can
+-- recompute everything from scratch.
+
+-- ============================================
+-- 1. USER_STATS TABLE
+-- ============================================
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    active_listings INTEGER NOT NULL DEFAULT 0,
+    total_sales INTEGER NOT NULL DEFAULT 0,          -- completed meetups as seller
+    total_earnings DECIMAL(12, 2) NOT NULL DEFAULT 0, -- sale amounts of those sales
+    completed_deals INTEGER NOT NULL DEFAULT 0,      -- completed meetups as seller or buyer
+    total_posts INTEGER NOT NULL DEFAULT 0,          -- request board posts
+    total_post_likes INTEGER NOT NULL DEFAULT 0,     -- likes across those posts
+    total_views INTEGER NOT NULL DEFAULT 0,          -- view_count across own items
+    engagement_rate DECIMAL(5, 1) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE user_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own stats"
+ON user_stats FOR SELECT
+USING (user_id = auth.uid());
+
+-- ============================================
+-- 2. ENGAGEMENT RATE
+-- ============================================
+-- Every completed deal = 10 pts, 4 likes = 1 pt, post = 5 pts,
+-- 10 views = 1 pt. 200 pts = 100% (capped).
+CREATE OR REPLACE FUNCTION compute_engagement_rate(deals INTEGER, likes INTEGER, posts INTEGER, views INTEGER)
+RETURNS DECIMAL(5, 1)
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT ROUND(LEAST(
+        (deals * 10 + likes / 4.0 + posts * 5 + views / 10.0) / 200.0 * 100.0,
+        100.0
+    ), 1)::DECIMAL(5, 1);
+$$;
+
+-- ============================================
+-- 3. INCREMENTAL UPDATES
+-- ============================================
+-- Adds the given deltas to a user's row (creating it if needed)
+CREATE OR REPLACE FUNCTION bump_user_stats(
+    p_user_id UUID,
+    d_active INTEGER DEFAULT 0,
+    d_sales INTEGER DEFAULT 0,
+    d_earnings DECIMAL DEFAULT 0,
+    d_deals INTEGER DEFAULT 0,
+    d_posts INTEGER DEFAULT 0,
+    d_likes INTEGER DEFAULT 0,
+    d_views INTEGER DEFAULT 0
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF p_user_id IS NULL OR NOT EXISTS (SELECT 1 FROM users WHERE id = p_user_id) THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO user_stats AS s (user_id, active_listings, total_sales, total_earnings,
+                                 completed_deals, total_posts, total_post_likes, total_views,
+                                 engagement_rate)
+    VALUES (p_user_id, GREATEST(d_active, 0), GREATEST(d_sales, 0), GREATEST(d_earnings, 0),
+            GREATEST(d_deals, 0), GREATEST(d_posts, 0), GREATEST(d_likes, 0), GREATEST(d_views, 0),
+            compute_engagement_rate(GREATEST(d_deals, 0), GREATEST(d_likes, 0),
+                                    GREATEST(d_posts, 0), GREATEST(d_views, 0)))
+    ON CONFLICT (user_id) DO UPDATE SET
+        active_listings = GREATEST(s.active_listings + d_active, 0),
+        total_sales = GREATEST(s.total_sales + d_sales, 0),
+        total_earnings = GREATEST(s.total_earnings + d_earnings, 0),
+        completed_deals = GREATEST(s.completed_deals + d_deals, 0),
+        total_posts = GREATEST(s.total_posts + d_posts, 0),
+        total_post_likes = GREATEST(s.total_post_likes + d_likes, 0),
+        total_views = GREATEST(s.total_views + d_views, 0),
+        engagement_rate = compute_engagement_rate(
+            GREATEST(s.completed_deals + d_deals, 0),
+            GREATEST(s.total_post_likes + d_likes, 0),
+            GREATEST(s.total_posts + d_posts, 0),
+            GREATEST(s.total_views + d_views, 0)
+        ),
+        updated_at = NOW();
+END;
+$$;
+
+-- Items: active listings and views
+CREATE OR REPLACE FUNCTION user_stats_on_items()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_user_stats(OLD.seller_id,
+            d_active => CASE WHEN OLD.status = 'active' THEN -1 ELSE 0 END,
+            d_views => -COALESCE(OLD.view_count, 0));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_user_stats(NEW.seller_id,
+            d_active => CASE WHEN NEW.status = 'active' THEN 1 ELSE 0 END,
+            d_views => COALESCE(NEW.view_count, 0));
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_user_stats_items ON items;
+CREATE TRIGGER trigger_user_stats_items
+    AFTER INSERT OR DELETE OR UPDATE OF status, view_count ON items
+    FOR EACH ROW
+    EXECUTE FUNCTION user_stats_on_items();
+
+-- Meetups: the sale amount is fixed when the meetup completes, so a later
+-- price edit on the item can't change what gets taken back off earnings
+ALTER TABLE meetups ADD COLUMN IF NOT EXISTS sale_amount DECIMAL(10, 2);
+
+UPDATE meetups m SET sale_amount = i.price
+FROM items i
+WHERE i.id = m.item_id AND m.status = 'completed' AND m.sale_amount IS NULL;
+
+CREATE OR REPLACE FUNCTION set_meetup_sale_amount()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF NEW.status = 'completed' AND (TG_OP = 'INSERT' OR OLD.status IS DISTINCT FROM 'completed') THEN
+        SELECT price INTO NEW.sale_amount FROM items WHERE id = NEW.item_id;
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_meetup_sale_amount ON meetups;
+CREATE TRIGGER trigger_meetup_sale_amount
+    BEFORE INSERT OR UPDATE OF status ON meetups
+    FOR EACH ROW
+    EXECUTE FUNCTION set_meetup_sale_amount();
+
+-- Meetups: sales, earnings and completed deals
+CREATE OR REPLACE FUNCTION user_stats_on_meetups()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'completed' THEN
+        PERFORM bump_user_stats(OLD.seller_id, d_sales => -1,
+                                d_earnings => -COALESCE(OLD.sale_amount, 0), d_deals => -1);
+        PERFORM bump_user_stats(OLD.buyer_id, d_deals => -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'completed' THEN
+        PERFORM bump_user_stats(NEW.seller_id, d_sales => 1,
+                                d_earnings => COALESCE(NEW.sale_amount, 0), d_deals => 1);
+        PERFORM bump_user_stats(NEW.buyer_id, d_deals => 1);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_user_stats_meetups ON meetups;
+CREATE TRIGGER trigger_user_stats_meetups
+    AFTER INSERT OR DELETE OR UPDATE OF status ON meetups
+    FOR EACH ROW
+    EXECUTE FUNCTION user_stats_on_meetups();
+
+-- Request board posts (a deleted post also takes its likes with it)
+CREATE OR REPLACE FUNCTION user_stats_on_requests()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_user_stats(NEW.user_id, d_posts => 1);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM bump_user_stats(OLD.user_id, d_posts => -1, d_likes => -COALESCE(OLD.like_count, 0));
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_user_stats_requests ON requests;
+CREATE TRIGGER trigger_user_stats_requests
+    AFTER INSERT OR DELETE ON requests
+    FOR EACH ROW
+    EXECUTE FUNCTION user_stats_on_requests();
+
+-- Likes on request board posts, credited to the post's author. When the
+-- post itself is being deleted it no longer exists here and was already
+-- accounted for by user_stats_on_requests.
+CREATE OR REPLACE FUNCTION user_stats_on_request_likes()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    author_id UUID;
+BEGIN
+    SELECT user_id INTO author_id FROM requests
+    WHERE id = CASE WHEN TG_OP = 'INSERT' THEN NEW.request_id ELSE OLD.request_id END;
+
+    IF author_id IS NOT NULL THEN
+        PERFORM bump_user_stats(author_id, d_likes => CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_user_stats_request_likes ON request_likes;
+CREATE TRIGGER trigger_user_stats_request_likes
+    AFTER INSERT OR DELETE ON request_likes
+    FOR EACH ROW
+    EXECUTE FUNCTION user_stats_on_request_likes();
+
+-- ============================================
+-- 4. FULL REBUILD
+-- ============================================
+-- Recomputes user_stats from the source tables for one user, or for
+-- everyone when p_user_id is NULL. Returns the number of rows written.
+-- Run it from the backend with:  flask --app api rebuild-user-stats
+CREATE OR REPLACE FUNCTION rebuild_user_stats(p_user_id UUID DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    written INTEGER;
+BEGIN
+    WITH base AS (
+        SELECT u.id AS user_id,
+            (SELECT COUNT(*) FROM items i WHERE i.seller_id = u.id AND i.status = 'active') AS active_listings,
+            (SELECT COUNT(*) FROM meetups m WHERE m.seller_id = u.id AND m.status = 'completed') AS total_sales,
+            (SELECT COALESCE(SUM(COALESCE(m.sale_amount, i.price)), 0)
+             FROM meetups m LEFT JOIN items i ON i.id = m.item_id
+             WHERE m.seller_id = u.id AND m.status = 'completed') AS total_earnings,
+            (SELECT COUNT(*) FROM meetups m
+             WHERE (m.seller_id = u.id OR m.buyer_id = u.id) AND m.status = 'completed') AS completed_deals,
+            (SELECT COUNT(*) FROM requests r WHERE r.user_id = u.id) AS total_posts,
+            (SELECT COUNT(*) FROM request_likes rl JOIN requests r ON r.id = rl.request_id
+             WHERE r.user_id = u.id) AS total_post_likes,
+            (SELECT COALESCE(SUM(i.view_count), 0) FROM items i WHERE i.seller_id = u.id) AS total_views
+        FROM users u
+        WHERE p_user_id IS NULL OR u.id = p_user_id
+    )
+    INSERT INTO user_stats (user_id, active_listings, total_sales, total_earnings, completed_deals,
+                            total_posts, total_post_likes, total_views, engagement_rate, updated_at)
+    SELECT user_id, active_listings, total_sales, total_earnings, completed_deals,
+           total_posts, total_post_likes, total_views,
+           compute_engagement_rate(completed_deals::INTEGER, total_post_likes::INTEGER,
+                                   total_posts::INTEGER, total_views::INTEGER),
+           NOW()
+    FROM base
+    ON CONFLICT (user_id) DO UPDATE SET
+        active_listings = EXCLUDED.active_listings,
+        total_sales = EXCLUDED.total_sales,
+        total_earnings = EXCLUDED.total_earnings,
+        completed_deals = EXCLUDED.completed_deals,
+        total_posts = EXCLUDED.total_posts,
+        total_post_likes = EXCLUDED.total_post_likes,
+        total_views = EXCLUDED.total_views,
+        engagement_rate = EXCLUDED.engagement_rate,
+        updated_at = NOW();
+
+    GET DIAGNOSTICS written = ROW_COUNT;
+    RETURN written;
+END;
+$$;
+
+-- Backfill every existing user
+SELECT rebuild_user_stats();
+
+-- ============================================
+-- 5. PERMISSIONS
+-- ============================================
+-- SECURITY DEFINER functions bypass RLS, and Postgres lets PUBLIC execute
+-- new functions (Supabase also grants anon/authenticated). Only the
+-- backend, connected with the service_role key, may call these.
+REVOKE EXECUTE ON FUNCTION bump_user_stats(UUID, INTEGER, INTEGER, DECIMAL, INTEGER, INTEGER, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION rebuild_user_stats(UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION user_stats_on_items() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION set_meetup_sale_amount() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION user_stats_on_meetups() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION user_stats_on_requests() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION user_stats_on_request_likes() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION bump_user_stats(UUID, INTEGER, INTEGER, DECIMAL, INTEGER, INTEGER, INTEGER, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION rebuild_user_stats(UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION user_stats_on_items() TO service_role;
+GRANT EXECUTE ON FUNCTION set_meetup_sale_amount() TO service_role;
+GRANT EXECUTE ON FUNCTION user_stats_on_meetups() TO service_role;
+GRANT EXECUTE ON FUNCTION user_stats_on_requests() TO service_role;
+GRANT EXECUTE ON FUNCTION user_stats_on_request_likes() TO service_role;
+
+-- ============================================
+-- SETUP COMPLETE!
+-- ============================================
+-- ✅ user_stats table (one row per user)
+-- ✅ Triggers on items, meetups, requests and request_likes
+-- ✅ meetups.sale_amount records the price each completed sale was made at
+-- ✅ rebuild_user_stats() for a full or single-user rebuild
+-- ✅ GET /api/user/dashboard is now a single-row read
+-- ✅ Stats functions callable by service_role only
+-- ============================================
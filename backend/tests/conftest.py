@@ -0,0 +1,76 @@
+"""Shared fixtures: the app on the seeded in-memory stand-in, and query budgets.
+
+    cd backend
+    pip install -r requirements.txt pytest
+    python -m pytest -q
+
+Tests run the real routes and services against benchmarks.fake_supabase,
+with the caches off so every request reaches the stand-in. Keep an
+endpoint within a query budget with:
+
+    def test_board_feed(client, auth, query_budget):
+        with query_budget(max_queries=3):
+            client.get('/api/board/request', headers=auth())
+
+The block fails the test when more than `max_queries` Supabase round trips
+run inside it, or when one query shape is issued from the same line more
+than `max_repeats` times (N_PLUS_ONE_THRESHOLD by default). The failure
+lists every query with its call site.
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from benchmarks.run import build_app, configure_environment, sign_token
+
+# Config reads the environment on import, so this runs before `app` is loaded
+configure_environment(cold=True)
+
+from app.config import Config  # noqa: E402
+from app.utils.instrumentation import QueryLog  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def seeded():
+    """(app, db, fixtures) on a small seeded stand-in with no added latency."""
+    return build_app(latency=0, jitter=0, seed=42, volumes={
+        'users': 200, 'items': 400, 'messages': 1500, 'requests': 80,
+    })
+
+
+@pytest.fixture(scope='session')
+def fixtures(seeded):
+    return seeded[2]
+
+
+@pytest.fixture
+def client(seeded):
+    return seeded[0].test_client()
+
+
+@pytest.fixture
+def auth(fixtures):
+    """Authorization headers for a seeded user (the benchmark viewer by default)."""
+    def headers(user_id=None):
+        return {'Authorization': f"Bearer {sign_token(user_id or fixtures['viewer'])}"}
+    return headers
+
+
+@pytest.fixture
+def query_budget():
+    @contextmanager
+    def budget(max_queries=None, max_repeats=None):
+        with QueryLog() as log:
+            yield log
+
+        limit = Config.N_PLUS_ONE_THRESHOLD if max_repeats is None else max_repeats
+        problems = []
+        if max_queries is not None and log.count > max_queries:
+            problems.append(f"Query budget exceeded: {log.count} queries (budget {max_queries})")
+        for signature, site, count in log.repeated(limit):
+            problems.append(f"Possible N+1: {count} x {signature} at {site} (max {limit})")
+
+        if problems:
+            pytest.fail('\n'.join(problems + ['', log.summary()]), pytrace=False)
+
+    return budget
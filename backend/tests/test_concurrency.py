@@ -0,0 +1,24 @@
+import pytest
+
+from app.utils import concurrency
+from app.utils.concurrency import gather
+
+pytest.importorskip('gevent')
+
+
+@pytest.fixture(params=[False, True], ids=['threads', 'gevent'])
+def backend(request, monkeypatch):
+    monkeypatch.setattr(concurrency, '_gevent_patched', lambda: request.param)
+    return request.param
+
+
+def test_results_come_back_in_order(backend):
+    assert gather(lambda: 1, lambda: 2, lambda: 3) == [1, 2, 3]
+
+
+def test_first_error_is_raised(backend):
+    def fail(message):
+        raise ValueError(message)
+
+    with pytest.raises(ValueError, match='first'):
+        gather(lambda: 1, lambda: fail('first'), lambda: fail('second'))
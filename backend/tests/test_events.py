@@ -0,0 +1,28 @@
+import pytest
+
+from app.utils import events
+from app.utils.events import EventBroker, InProcessBroker
+
+
+def test_brokers_must_implement_the_interface():
+    class PublishOnly(EventBroker):
+        def publish(self, channel, event):
+            return 0
+
+    with pytest.raises(TypeError):
+        PublishOnly()
+
+
+def test_in_process_broker_delivers_to_subscribers():
+    broker = InProcessBroker()
+    subscription = broker.subscribe('user-1')
+
+    assert broker.publish('user-1', {'type': 'ping'}) == 1
+    assert subscription.get(timeout=1) == {'type': 'ping'}
+    subscription.close()
+    assert broker.stats() == {'channels': 0, 'subscribers': 0}
+
+
+def test_configured_broker_must_be_an_event_broker():
+    with pytest.raises(TypeError, match='not an EventBroker'):
+        events._load_broker('collections:OrderedDict')
@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.mark.parametrize('path', [
+    '/api/marketplace/items',
+    '/api/marketplace/search?q=calculator',
+    '/api/board/requests/{request_id}/replies',
+])
+def test_public_feeds_always_revalidate(client, auth, fixtures, path):
+    response = client.get(path.format(**fixtures), headers=auth())
+
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'public, no-cache'
+
+    etag = response.headers['ETag']
+    again = client.get(path.format(**fixtures), headers={**auth(), 'If-None-Match': etag})
+    assert again.status_code == 304
@@ -0,0 +1,51 @@
+import hashlib
+import io
+import time
+
+import pytest
+
+from app.services import image_service
+from app.services.image_service import ImageService
+from app.utils import media_storage
+from app.utils.media_storage import LocalStorage
+
+Image = pytest.importorskip('PIL.Image')
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    local = LocalStorage(str(tmp_path))
+    monkeypatch.setattr(media_storage, '_storage', local)
+    monkeypatch.setattr(image_service, '_rendered', {})
+    return local
+
+
+def _png():
+    out = io.BytesIO()
+    Image.new('RGB', (800, 600), (30, 120, 200)).save(out, 'PNG')
+    return out.getvalue()
+
+
+def test_variants_are_linked_only_once_rendered(storage):
+    data = _png()
+    key = f"items/{hashlib.sha256(data).hexdigest()}.png"
+    # An image stored before variants existed: nothing rendered yet
+    storage.put(key, data, 'image/png')
+    url = storage.url(key)
+
+    assert ImageService.variant_url(url, 'card') == url
+
+    # The lookup queued a backfill; once it lands the variant is linked
+    deadline = time.monotonic() + 10
+    while image_service._rendered.get(key.rsplit('.', 1)[0]) is not True and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert ImageService.variant_url(url, 'card') == storage.url(image_service.variant_key(key, 'card'))
+    assert ImageService.add_thumbnails([{'images': [url]}], 'thumb')[0]['thumbnail'] == \
+        storage.url(image_service.variant_key(key, 'thumb'))
+
+
+def test_external_images_are_left_alone(storage):
+    url = 'https://picsum.photos/seed/1/600/600'
+
+    assert ImageService.add_thumbnails([{'images': [url]}])[0]['thumbnail'] == url
@@ -0,0 +1,21 @@
+import pytest
+
+from app.config import Config
+from app.utils.media_storage import check_media_config
+
+
+def test_local_media_is_refused_outside_development(monkeypatch):
+    monkeypatch.setattr(Config, 'IS_DEVELOPMENT', False)
+    monkeypatch.setattr(Config, 'MEDIA_BACKEND', 'local')
+    monkeypatch.setattr(Config, 'MEDIA_BASE_URL', 'https://example.com/media')
+
+    with pytest.raises(RuntimeError, match='only for development'):
+        check_media_config()
+
+
+def test_media_base_url_is_required(monkeypatch):
+    monkeypatch.setattr(Config, 'MEDIA_BACKEND', 'local')
+    monkeypatch.setattr(Config, 'MEDIA_BASE_URL', None)
+
+    with pytest.raises(RuntimeError, match='MEDIA_BASE_URL'):
+        check_media_config()
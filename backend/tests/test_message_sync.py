@@ -0,0 +1,34 @@
+from app.extensions import get_supabase
+from app.utils.pagination import encode_cursor
+
+
+def test_non_uuid_partner_is_rejected(client, auth):
+    crafted = 'x),and(sender_id.neq.null'
+
+    assert client.get(f'/api/offer/messages/{crafted}', headers=auth()).status_code == 400
+    assert client.get(f'/api/offer/messages/{crafted}?after=abc', headers=auth()).status_code == 400
+
+
+def test_sync_pages_through_messages_sharing_a_timestamp(client, auth, fixtures):
+    viewer, partner = fixtures['viewer'], fixtures['partner']
+    stamp = '2099-01-01T00:00:00.000000+00:00'
+    burst = [{
+        'id': f'00000000-0000-4000-8000-{n:012d}', 'sender_id': partner, 'receiver_id': viewer,
+        'item_id': None, 'offer_id': None, 'message': f'burst {n}', 'is_read': True, 'created_at': stamp,
+    } for n in range(5)]
+    supabase = get_supabase()
+    supabase.table('messages').insert(burst).execute()
+    try:
+        cursor = encode_cursor({'created_at': '2098-12-31T00:00:00.000000+00:00', 'id': ''})
+        seen = []
+        while True:
+            response = client.get(f'/api/offer/messages/{partner}?after={cursor}&limit=2', headers=auth())
+            if response.status_code == 204:
+                break
+            body = response.get_json()
+            seen.extend(m['id'] for m in body['messages'])
+            cursor = body['sync_cursor']
+
+        assert seen == [row['id'] for row in burst]
+    finally:
+        supabase.table('messages').delete().in_('id', [row['id'] for row in burst]).execute()
@@ -0,0 +1,18 @@
+from app.config import Config
+
+
+def test_metrics_are_hidden_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(Config, 'METRICS_TOKEN', None)
+
+    assert client.get('/metrics').status_code == 404
+
+
+def test_metrics_require_the_configured_token(client, monkeypatch):
+    monkeypatch.setattr(Config, 'METRICS_TOKEN', 'scrape-me')
+
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-me'})
+    assert response.status_code == 200
+    assert b'acadswap_http_requests_total' in response.data
@@ -0,0 +1,23 @@
+from app.config import Config
+
+
+def test_stream_opens_with_a_ticket_not_an_access_token(client, auth, fixtures):
+    token = auth()['Authorization'].split(' ', 1)[1]
+    assert client.get(f'/api/notifications/stream?access_token={token}').status_code == 401
+
+    ticket = client.post('/api/notifications/stream-ticket', headers=auth()).get_json()['ticket']
+    response = client.get(f'/api/notifications/stream?ticket={ticket}')
+    try:
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        assert next(response.response)  # retry hint
+    finally:
+        response.close()
+
+
+def test_expired_or_forged_tickets_are_rejected(client, auth, monkeypatch):
+    ticket = client.post('/api/notifications/stream-ticket', headers=auth()).get_json()['ticket']
+    monkeypatch.setattr(Config, 'STREAM_TICKET_TTL', -1)
+
+    assert client.get(f'/api/notifications/stream?ticket={ticket}').status_code == 401
+    assert client.get(f'/api/notifications/stream?ticket={ticket[:-2]}xx').status_code == 401
@@ -0,0 +1,30 @@
+from app.config import Config
+from app.extensions import get_supabase
+from app.services.notification_service import NotificationService
+
+
+def _stored_message(notification_id):
+    rows = get_supabase().table('notifications').select('message').eq('id', notification_id).execute().data
+    return rows[0]['message']
+
+
+def test_item_title_is_not_substituted(fixtures, monkeypatch):
+    monkeypatch.setattr(Config, 'NOTIFY_ASYNC', False)
+    seller, buyer = fixtures['user_ids'][:2]
+
+    result = NotificationService.create_offer_notification(seller, buyer, '{actor_name} {0} }{', 'offer-1')
+
+    assert result['success'] and result['queued'] is False
+    message = _stored_message(result['notification_id'])
+    assert message.startswith('New offer from ')
+    assert message.endswith(' on {actor_name} {0} }{')
+    assert '{actor_name}' not in message[:-len(' on {actor_name} {0} }{')]
+
+
+def test_async_result_says_queued(fixtures, monkeypatch):
+    monkeypatch.setattr(Config, 'NOTIFY_ASYNC', True)
+    seller, buyer = fixtures['user_ids'][:2]
+
+    result = NotificationService.create_friend_request_notification(seller, buyer, 'request-1')
+
+    assert result == {"success": True, "queued": True, "notification_id": result['notification_id']}
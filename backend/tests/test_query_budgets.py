@@ -0,0 +1,48 @@
+"""Round trips per request for the hot endpoints.
+
+Each budget is the query count the endpoint needs today. A change that
+brings back a per-row lookup (an N+1) fails here with the offending call
+site listed, instead of showing up later as a slow page.
+"""
+import pytest
+
+from app.extensions import get_supabase
+
+BUDGETS = [
+    ('/api/marketplace/items', 2),
+    ('/api/marketplace/items?limit=20', 2),
+    ('/api/user/dashboard', 1),
+    ('/api/board/request', 2),
+    ('/api/offer/conversations', 1),
+    ('/api/offer/messages/{partner}', 2),
+    ('/api/offer/received', 1),
+    ('/api/notifications/', 1),
+    ('/api/friends/list', 1),
+    ('/api/meetup/my-meetups', 3),
+]
+
+
+@pytest.mark.parametrize('path, max_queries', BUDGETS)
+def test_endpoint_query_budget(client, auth, fixtures, query_budget, path, max_queries):
+    with query_budget(max_queries=max_queries):
+        response = client.get(path.format(**fixtures), headers=auth())
+
+    assert response.status_code == 200
+
+
+def test_query_budget_flags_per_row_lookups(fixtures, query_budget):
+    supabase = get_supabase()
+
+    with pytest.raises(pytest.fail.Exception, match='Possible N\\+1'):
+        with query_budget():
+            for user_id in fixtures['user_ids'][:10]:
+                supabase.table('users').select('id').eq('id', user_id).execute()
+
+
+def test_query_budget_flags_too_many_queries(fixtures, query_budget):
+    supabase = get_supabase()
+
+    with pytest.raises(pytest.fail.Exception, match='Query budget exceeded'):
+        with query_budget(max_queries=1):
+            supabase.table('users').select('id').limit(1).execute()
+            supabase.table('items').select('id').limit(1).execute()
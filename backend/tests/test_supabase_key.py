@@ -0,0 +1,25 @@
+import pytest
+
+from app.config import Config
+from app.extensions import check_supabase_key
+from benchmarks.run import sign_token
+
+
+def test_service_role_key_is_accepted(monkeypatch):
+    monkeypatch.setattr(Config, 'SUPABASE_KEY', sign_token('service_role', role='service_role'))
+    check_supabase_key()
+
+    monkeypatch.setattr(Config, 'SUPABASE_KEY', 'sb_secret_abc123')
+    check_supabase_key()
+
+
+@pytest.mark.parametrize('key', [
+    sign_token('anon', role='anon'),
+    'sb_publishable_abc123',
+    'not-a-key',
+])
+def test_other_keys_are_refused(monkeypatch, key):
+    monkeypatch.setattr(Config, 'SUPABASE_KEY', key)
+
+    with pytest.raises(RuntimeError, match='service_role'):
+        check_supabase_key()